@@ -1,4 +1,5 @@
 import os
+import socket
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,5 +12,19 @@ class Settings:
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     JWT_SECRET: str = os.getenv("JWT_SECRET", "supersecret")
     JWT_ALGORITHM: str = "HS256"
+    IMPORT_WORKERS: int = int(os.getenv("IMPORT_WORKERS", "2"))
+    # Process-pool size for parallel imports (parse + normalize); capped per request
+    IMPORT_PROCESS_WORKERS: int = int(os.getenv("IMPORT_PROCESS_WORKERS", str(os.cpu_count() or 1)))
+    # Names this API host across restarts; import jobs record it so a restart can reclaim its own jobs.
+    # Set it when several containers share a hostname.
+    INSTANCE_ID: str = os.getenv("INSTANCE_ID", socket.gethostname())
+    MAX_UPLOAD_BYTES: int = int(os.getenv("MAX_UPLOAD_MB", "200")) * 1024 * 1024
+    # Search result cache (0 entries disables it); SEARCH_CACHE_DB shares it across workers
+    SEARCH_CACHE_SIZE: int = int(os.getenv("SEARCH_CACHE_SIZE", "512"))
+    SEARCH_CACHE_TTL: int = int(os.getenv("SEARCH_CACHE_TTL", "300"))
+    SEARCH_CACHE_DB: str = os.getenv("SEARCH_CACHE_DB", "")
+    # search_icp(mode="scored"): candidates scored per search and feature weights ("role=4,recency=0")
+    SEARCH_SCORE_POOL: int = int(os.getenv("SEARCH_SCORE_POOL", "20000"))
+    SEARCH_SCORE_WEIGHTS: str = os.getenv("SEARCH_SCORE_WEIGHTS", "")
 
 settings = Settings()
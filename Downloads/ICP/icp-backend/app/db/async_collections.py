@@ -0,0 +1,39 @@
+from app.db.async_mongodb import get_async_collection
+
+# Motor counterparts of app/db/collections.py (same collection names), for async code
+
+def get_async_user_collection():
+    return get_async_collection("users")
+
+def get_async_company_collection():
+    return get_async_collection("companies")
+
+def get_async_people_collection():
+    return get_async_collection("people")
+
+def get_async_leads_collection():
+    return get_async_collection("leads")
+
+def get_async_conversations_collection():
+    return get_async_collection("conversations")
+
+def get_async_activity_logs_collection():
+    return get_async_collection("activity_logs")
+
+def get_async_icp_sessions_collection():
+    return get_async_collection("icp_sessions")
+
+def get_async_prospect_lists_collection():
+    return get_async_collection("prospect_lists")
+
+def get_async_refresh_tokens_collection():
+    return get_async_collection("refresh_tokens")
+
+def get_async_import_jobs_collection():
+    return get_async_collection("import_jobs")
+
+def get_async_facet_stats_collection():
+    return get_async_collection("facet_stats")
+
+def get_async_prospects_collection():
+    return get_async_collection("prospects")
@@ -0,0 +1,32 @@
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core.config import settings
+
+# Motor (asyncio) client for the async routes, next to the pymongo client in
+# app/db/mongodb.py that imports, scripts and the sync routes keep using.
+# Created on first use so it binds to the server's event loop, not import time.
+_client: AsyncIOMotorClient | None = None
+
+def get_async_client() -> AsyncIOMotorClient:
+    global _client
+    if _client is None:
+        _client = AsyncIOMotorClient(settings.MONGO_URI)
+    return _client
+
+def get_async_db():
+    return get_async_client()[settings.DB_NAME]
+
+async def test_async_connection():
+    try:
+        await get_async_client().admin.command("ping")
+        print("✅ MongoDB (async) connected")
+    except Exception as e:
+        print("❌ MongoDB (async) connection error:", e)
+
+def close_async_client():
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+def get_async_collection(name: str):
+    return get_async_db()[name]
@@ -27,7 +27,11 @@ def get_prospect_lists_collection():
 def get_refresh_tokens_collection():
     return get_collection("refresh_tokens")
 
+def get_import_jobs_collection():
+    return get_collection("import_jobs")
 
+def get_facet_stats_collection():
+    return get_collection("facet_stats")
 
-
-
+def get_prospects_collection():
+    return get_collection("prospects")
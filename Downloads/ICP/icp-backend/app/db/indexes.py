@@ -0,0 +1,229 @@
+from typing import Any, Dict, List, Optional, Tuple
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from app.db.mongodb import db as default_db
+
+# ======================= Registry =======================
+# One entry per collection, derived from the query shapes the services run.
+# Applied idempotently at startup (app/main.py) and by scripts/manage_indexes.py.
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True),
+    ],
+    # Scoped search filters on owner $in ["global", uid] (app/db/owner.py), so the
+    # search indexes lead with owner: two index seeks, then the filter field.
+    "companies": [
+        IndexModel([("company_id", ASCENDING)], unique=True),
+        # import-time company resolution: normalized name $in within one owner
+        IndexModel([("owner", ASCENDING), ("company_name_norm", ASCENDING)]),
+        IndexModel([("owner", ASCENDING), ("industry_norm", ASCENDING)]),
+        IndexModel([("owner", ASCENDING), ("country_code", ASCENDING)]),
+        IndexModel([("owner", ASCENDING), ("subdivision_code", ASCENDING)]),
+        # fallback for geography values geo.py can't resolve
+        IndexModel([("owner", ASCENDING), ("country_norm", ASCENDING)]),
+        IndexModel([("owner", ASCENDING), ("employee_count", ASCENDING)]),
+    ],
+    "people": [
+        IndexModel([("person_id", ASCENDING)], unique=True),
+        # the company -> people joins; _id keeps each company's people in keyset order
+        IndexModel([("employment.company_id", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("owner", ASCENDING), ("role_ids", ASCENDING)]),
+        IndexModel([("owner", ASCENDING), ("title_tokens", ASCENDING)]),
+        IndexModel([("owner", ASCENDING), ("country_code", ASCENDING)]),
+    ],
+    "prospects": [
+        IndexModel([("prospect_id", ASCENDING)], unique=True),
+        IndexModel([("person_id", ASCENDING)]),
+        IndexModel([("company_id", ASCENDING)]),
+        # search_icp(mode="prospects"): equality/$in fields first, the size range last
+        IndexModel([("owner", ASCENDING), ("industry_norm", ASCENDING), ("country_code", ASCENDING),
+                    ("role_ids", ASCENDING), ("employee_count", ASCENDING)]),
+        # ICPs without an industry (role-only, geo-only, size-only) and each branch of
+        # the geography $or, which the compound above can only serve by its owner prefix
+        IndexModel([("owner", ASCENDING), ("role_ids", ASCENDING)]),
+        IndexModel([("owner", ASCENDING), ("country_code", ASCENDING)]),
+        IndexModel([("owner", ASCENDING), ("subdivision_code", ASCENDING)]),
+        IndexModel([("owner", ASCENDING), ("country_norm", ASCENDING)]),
+        IndexModel([("owner", ASCENDING), ("employee_count", ASCENDING)]),
+    ],
+    "conversations": [
+        IndexModel([("conversation_id", ASCENDING), ("user_id", ASCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("last_fetched_at", DESCENDING)]),
+    ],
+    "icp_sessions": [
+        IndexModel([("conversation_id", ASCENDING)]),
+    ],
+    "prospect_lists": [
+        IndexModel([("prospect_list_id", ASCENDING), ("user_id", ASCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)]),
+    ],
+    "refresh_tokens": [
+        IndexModel([("token", ASCENDING)]),
+    ],
+    "activity_logs": [
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)]),
+        IndexModel([("action", ASCENDING)]),
+    ],
+    "leads": [
+        IndexModel([("user_id", ASCENDING)]),
+    ],
+    "import_jobs": [
+        IndexModel([("job_id", ASCENDING)], unique=True),
+        IndexModel([("status", ASCENDING)]),
+        IndexModel([("files.sha256", ASCENDING), ("kind", ASCENDING), ("user_id", ASCENDING)]),
+    ],
+    "facet_stats": [
+        IndexModel([("facet", ASCENDING), ("scope", ASCENDING), ("value", ASCENDING)], unique=True),
+    ],
+}
+
+# Index options that make two indexes on the same keys different
+_COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+# ======================= Canonical queries =======================
+# (service, collection, filter, sort) for every hot query. check_query_plans()
+# explains each one and reports any that would scan the whole collection or
+# whose index scan is bounded by the owner prefix alone.
+
+_UID = "000000000000000000000000"
+_SCOPE = {"owner": {"$in": ["global", _UID]}}
+# _geo_cond() for "California, Germany, Atlantis": codes geo.py resolved plus the country_norm fallback
+_GEO_OR = {"$or": [{"country_code": {"$in": ["DE"]}}, {"subdivision_code": {"$in": ["US-CA"]}},
+                   {"country_norm": {"$in": ["atlantis"]}}]}
+
+CANONICAL_QUERIES: List[Tuple[str, str, Dict[str, Any], Optional[List[Tuple[str, int]]]]] = [
+    ("user_service", "users", {"email": "a@b.c"}, None),
+    ("token_service", "refresh_tokens", {"token": "t", "revoked": False}, None),
+    ("conversation_service", "conversations", {"conversation_id": "c", "user_id": _UID}, None),
+    ("conversation_service", "conversations", {"user_id": _UID}, [("last_fetched_at", DESCENDING)]),
+    ("icp_service", "icp_sessions", {"conversation_id": "c"}, None),
+    ("prospect_service", "prospect_lists", {"prospect_list_id": "p", "user_id": _UID}, None),
+    ("prospect_service", "prospect_lists", {"user_id": _UID}, [("created_at", DESCENDING)]),
+    ("activity_log_service", "activity_logs", {"user_id": _UID}, [("created_at", DESCENDING)]),
+    ("activity_log_service", "activity_logs", {"action": "send_message"}, None),
+    ("lead_service", "leads", {"user_id": _UID}, None),
+    ("company_resolver", "companies", {"owner": "global", "company_name_norm": {"$in": ["acme"]}}, None),
+    ("import_service", "people", {"person_id": {"$in": ["p"]}}, None),
+    ("import_job_service", "import_jobs", {"job_id": "j"}, None),
+    ("search_service", "companies", {"$and": [{"industry_norm": {"$in": ["software"]}}, _SCOPE]}, None),
+    ("search_service", "companies", {"$and": [{"country_code": {"$in": ["IN", "US"]}}, _SCOPE]}, None),
+    ("search_service", "companies", {"$and": [{"subdivision_code": {"$in": ["US-CA"]}}, _SCOPE]}, None),
+    ("search_service", "companies", {"$and": [{"employee_count": {"$gte": 51, "$lte": 200}}, _SCOPE]}, None),
+    ("search_service", "people", {"$and": [{"role_ids": {"$in": ["cto", "vp:sales"]}}, _SCOPE]}, None),
+    ("search_service", "people", {"$and": [{"title_tokens": {"$all": ["growth", "hacker"]}}, _SCOPE]}, None),
+    ("facet_service", "facet_stats", {"facet": {"$in": ["industry"]}, "scope": {"$in": ["global", _UID]}, "count": {"$gt": 0}}, None),
+    ("search_service", "prospects", {"$and": [{"industry_norm": {"$in": ["software"]}}, {"country_code": {"$in": ["IN"]}},
+                                              {"role_ids": {"$in": ["cto"]}}, _SCOPE]}, None),
+    # prospects / estimate_icp people counts for ICPs without an industry
+    ("search_service", "prospects", {"$and": [{"role_ids": {"$in": ["cto"]}}, _SCOPE]}, None),
+    ("search_service", "prospects", {"$and": [{"country_code": {"$in": ["IN"]}}, _SCOPE]}, None),
+    ("search_service", "prospects", {"$and": [{"employee_count": {"$gte": 51, "$lte": 200}}, _SCOPE]}, None),
+    ("search_service", "prospects", {"$and": [_GEO_OR, {"role_ids": {"$in": ["cto"]}}, _SCOPE]}, None),
+    ("search_service", "companies", {"$and": [_GEO_OR, _SCOPE]}, None),
+    ("prospect_view", "prospects", {"person_id": {"$in": ["p"]}, "prospect_id": {"$nin": ["p:c"]}}, None),
+    # $lookup side of the people -> companies join (one probe per person)
+    ("search_service", "companies", {"$and": [{"company_id": "c"}, _SCOPE]}, None),
+]
+
+# ======================= Apply / drift / explain =======================
+
+def _key(spec) -> Tuple[Tuple[str, Any], ...]:
+    # Servers may report directions as doubles (1.0); compare as ints
+    return tuple((k, int(v) if isinstance(v, (int, float)) else v) for k, v in spec)
+
+def _options(info: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: info[k] for k in _COMPARED_OPTIONS if info.get(k) not in (None, False)}
+
+def ensure_indexes(database=None) -> Dict[str, List[str]]:
+    """Create every registered index (no-op for ones that already exist). Returns errors per collection."""
+    database = database if database is not None else default_db
+    errors: Dict[str, List[str]] = {}
+    for coll_name, models in INDEXES.items():
+        coll = database[coll_name]
+        for model in models:
+            try:
+                coll.create_indexes([model])
+            except OperationFailure as e:
+                # e.g. duplicates blocking a unique index, or an existing index with other options
+                name = model.document["name"]
+                print(f"⚠️ Index {coll_name}.{name} not created: {e}")
+                errors.setdefault(coll_name, []).append(f"{name}: {e}")
+    return errors
+
+def index_drift(database=None) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Compare live indexes with the registry. For each collection reports
+    indexes that are `missing`, `extra` (live but not registered) or
+    `changed` (same keys, different options).
+    """
+    database = database if database is not None else default_db
+    drift: Dict[str, Dict[str, List[str]]] = {}
+    for coll_name, models in INDEXES.items():
+        live = {
+            _key(info["key"]): (name, _options(info))
+            for name, info in database[coll_name].index_information().items()
+            if name != "_id_"
+        }
+        wanted = {_key(m.document["key"].items()): (m.document["name"], _options(m.document)) for m in models}
+
+        report = {
+            "missing": [name for k, (name, _) in wanted.items() if k not in live],
+            "extra": [name for k, (name, _) in live.items() if k not in wanted],
+            "changed": [name for k, (name, opts) in wanted.items() if k in live and live[k][1] != opts],
+        }
+        if any(report.values()):
+            drift[coll_name] = report
+    return drift
+
+def drop_extra_indexes(database=None) -> List[str]:
+    """Drop live indexes that are not in the registry."""
+    database = database if database is not None else default_db
+    dropped = []
+    for coll_name, report in index_drift(database).items():
+        for name in report["extra"]:
+            database[coll_name].drop_index(name)
+            dropped.append(f"{coll_name}.{name}")
+    return dropped
+
+# indexBounds of a key the scan doesn't narrow
+_FULL_RANGE = ["[MinKey, MaxKey]"]
+
+def _plan_stages(plan: Dict[str, Any]):
+    """Walk an explain() plan tree and yield every stage."""
+    if not isinstance(plan, dict):
+        return
+    if "stage" in plan:
+        yield plan
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+def _owner_prefix_only(scan: Dict[str, Any]) -> bool:
+    """True when owner is the only key an index scan narrows (it reads the whole scope)."""
+    bounded = {k for k, b in scan.get("indexBounds", {}).items() if list(b) != _FULL_RANGE}
+    return bounded == {"owner"}
+
+def check_query_plans(database=None) -> List[Dict[str, Any]]:
+    """
+    explain() every canonical query; returns the ones whose winning plan has a
+    COLLSCAN or an index scan bounded only by owner, with the `problem`.
+    """
+    database = database if database is not None else default_db
+    failures = []
+    for service, coll_name, query, sort in CANONICAL_QUERIES:
+        cursor = database[coll_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = cursor.explain().get("queryPlanner", {}).get("winningPlan", {})
+        stages = list(_plan_stages(plan))
+        if any(st["stage"] == "COLLSCAN" for st in stages):
+            problem = "COLLSCAN"
+        elif any(st["stage"] == "IXSCAN" and _owner_prefix_only(st) for st in stages):
+            problem = "owner prefix only"
+        else:
+            continue
+        failures.append({"service": service, "collection": coll_name, "query": query, "sort": sort, "problem": problem})
+    return failures
@@ -0,0 +1,19 @@
+from typing import Any, Dict, List
+
+# Every company and person carries an always-present `owner` key: "global" for
+# Vault data, or the uploading user's id as a string. Scoped reads are then one
+# $in over at most two values, served by the (owner, ...) compound indexes in
+# app/db/indexes.py, instead of an $or over missing / null / str / ObjectId user_id.
+
+GLOBAL_OWNER = "global"
+
+def owner_of(user_id: Any) -> str:
+    """Owner value written for data uploaded by `user_id` (None -> global)."""
+    return str(user_id) if user_id else GLOBAL_OWNER
+
+def visible_owners(user_id: Any) -> List[str]:
+    """Owners whose data `user_id` can read: the global data plus their own."""
+    return [GLOBAL_OWNER, str(user_id)] if user_id else [GLOBAL_OWNER]
+
+def owner_scope(user_id: Any) -> Dict[str, Any]:
+    return {"owner": {"$in": visible_owners(user_id)}}
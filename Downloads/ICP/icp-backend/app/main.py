@@ -1,7 +1,9 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes import auth, chat, icp, data, admin, imports, prospects, search
-from app.db.collections import get_user_collection, get_people_collection
+from app.db.async_mongodb import close_async_client
+from app.db.indexes import ensure_indexes
+from app.services.import_job_service import recover_import_jobs
 
 app = FastAPI(title="ICP Builder API", version="1.0.0")
 
@@ -15,12 +17,16 @@ app.add_middleware(
 
 @app.on_event("startup")
 async def startup_event():
-    # Indexes for production
-    users = get_user_collection()
-    users.create_index("email", unique=True)
+    # Indexes for production (registry in app/db/indexes.py; idempotent)
+    # Unique company_id/person_id need legacy duplicates cleaned first: scripts/rekey_import_ids.py
+    ensure_indexes()
 
-    people = get_people_collection()
-    people.create_index([("seniority", 1), ("department", 1)])
+    # Pick up jobs left behind by a previous worker
+    recover_import_jobs()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    close_async_client()
 
 # Routers
 app.include_router(auth.router)
@@ -1,35 +1,95 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
-import shutil, os, uuid
-from app.services.import_service import import_vault_excel
+from typing import List
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Response
+from app.core.config import settings
+from app.services.import_job_service import create_import_job, find_completed_import
+from app.services.upload_service import save_upload, discard_upload, UploadTooLarge
 from app.core.permissions import require_admin
+from app.services.geo import country_from_filename
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+def _process_workers(workers: int | None) -> int:
+    if not workers:
+        return settings.IMPORT_PROCESS_WORKERS
+    return max(1, min(workers, settings.IMPORT_PROCESS_WORKERS))
 
-@router.post("/import-vault")
-def import_vault(file: UploadFile = File(...), admin=Depends(require_admin)):
+@router.post("/import-vault", status_code=202)
+def import_vault(response: Response, file: UploadFile = File(...), force: bool = False,
+                 workers: int | None = None, admin=Depends(require_admin)):
     """
     Admin-only endpoint to import Vault Excel data (India/USA).
+    The import runs in the background; poll GET /import/jobs/{job_id} for progress.
+    Re-uploading a file that was already imported is a no-op unless `force=true`.
+    `workers` > 1 parses the file's sheets / chunks in a process pool.
     """
+    upload = None
     try:
-        # Save uploaded file temporarily
-        temp_filename = f"{uuid.uuid4()}_{file.filename}"
-        temp_path = os.path.join(UPLOAD_DIR, temp_filename)
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Saved for the worker (it removes the file when done)
+        upload = save_upload(file)
 
-        # India file has no Country column, so set default
-        country_default = "India" if "India" in file.filename else None
+        if not force:
+            previous = find_completed_import(upload["sha256"], "vault", None)
+            if previous:
+                discard_upload(upload["path"])
+                response.status_code = 200
+                return {"msg": "Identical file already imported", "duplicate": True,
+                        "job_id": previous["job_id"], "job": previous}
 
-        # Run import service
-        result = import_vault_excel(temp_path, country_default=country_default)
+        upload.update(filename=file.filename, country_default=country_from_filename(file.filename))
+        job = create_import_job(
+            "vault", [upload],
+            requested_by=str(admin["_id"]),
+            workers=_process_workers(workers) if workers else None,
+        )
+        return {"msg": "Vault import queued", "job_id": job["job_id"], "job": job}
 
-        # Clean up temp file
-        os.remove(temp_path)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        if upload:
+            discard_upload(upload["path"])
+        raise HTTPException(status_code=500, detail=f"Import failed: {e}")
+
+@router.post("/import-vault/batch", status_code=202)
+def import_vault_batch(response: Response, files: List[UploadFile] = File(...), force: bool = False,
+                       workers: int | None = None, admin=Depends(require_admin)):
+    """
+    Admin-only endpoint to import several Vault files (e.g. India + USA) as one
+    background job, parsed in parallel by a process pool of `workers`
+    (default IMPORT_PROCESS_WORKERS). Files already imported are skipped unless `force=true`.
+    """
+    uploads, duplicates = [], []
+    try:
+        for file in files:
+            upload = save_upload(file)
+            try:
+                if not force and find_completed_import(upload["sha256"], "vault", None):
+                    discard_upload(upload["path"])
+                    duplicates.append(file.filename)
+                    continue
+                upload.update(filename=file.filename, country_default=country_from_filename(file.filename))
+            except Exception:
+                # Not in `uploads` yet, so the handlers below wouldn't discard it
+                discard_upload(upload["path"])
+                raise
+            uploads.append(upload)
+
+        if not uploads:
+            response.status_code = 200
+            return {"msg": "Identical files already imported", "duplicate": True, "skipped_files": duplicates}
 
-        return {"msg": "Vault data imported successfully", "summary": result}
+        job = create_import_job(
+            "vault", uploads,
+            requested_by=str(admin["_id"]),
+            workers=_process_workers(workers),
+        )
+        return {"msg": "Vault import queued", "job_id": job["job_id"], "job": job, "skipped_files": duplicates}
 
+    except UploadTooLarge as e:
+        for upload in uploads:
+            discard_upload(upload["path"])
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
+        for upload in uploads:
+            discard_upload(upload["path"])
         raise HTTPException(status_code=500, detail=f"Import failed: {e}")
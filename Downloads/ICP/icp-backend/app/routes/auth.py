@@ -1,15 +1,18 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from datetime import timedelta, datetime
 from app.models.user import User
-from app.services.user_service import create_user, get_user_by_email
+from app.services.user_service import create_user_async, get_user_by_email_async
 from app.core.security import (
     verify_password, get_password_hash,
     create_access_token, create_refresh_token, decode_token,
     ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS
 )
-from app.services.token_service import save_refresh_token, revoke_refresh_token, is_refresh_token_valid
+from app.services.token_service import (
+    save_refresh_token_async, revoke_refresh_token_async, is_refresh_token_valid_async,
+)
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -37,7 +40,7 @@ class RefreshRequest(BaseModel):
 
 # ======================= Helpers =======================
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     payload = decode_token(token)
     if not payload or payload.get("type") != "access":
         raise HTTPException(
@@ -46,32 +49,34 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = get_user_by_email(payload["email"])
+    user = await get_user_by_email_async(payload["email"])
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     return user
 
 @router.get("/me")
-def get_me(user=Depends(get_current_user)):
+async def get_me(user=Depends(get_current_user)):
     return {"id": str(user["_id"]), "email": user["email"], "name": user["name"]}
 
 # ======================= Routes =======================
 
 @router.post("/register")
-def register(data: RegisterRequest):
-    existing = get_user_by_email(data.email)
+async def register(data: RegisterRequest):
+    existing = await get_user_by_email_async(data.email)
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    user = User(name=data.name, email=data.email, password=get_password_hash(data.password))
-    create_user(user)
+    # bcrypt is deliberately slow; keep it off the event loop
+    hashed = await run_in_threadpool(get_password_hash, data.password)
+    user = User(name=data.name, email=data.email, password=hashed)
+    await create_user_async(user)
     return {"msg": "User registered successfully"}
 
 @router.post("/login", response_model=TokenResponse)
-def login(data: LoginRequest):
-    user = get_user_by_email(data.email)
-    if not user or not verify_password(data.password, user.get("password", "")):
+async def login(data: LoginRequest):
+    user = await get_user_by_email_async(data.email)
+    if not user or not await run_in_threadpool(verify_password, data.password, user.get("password", "")):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
     access_token = create_access_token(
@@ -84,13 +89,13 @@ def login(data: LoginRequest):
 
     # ✅ Save refresh token in DB
     expires_at = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    save_refresh_token(str(user["_id"]), refresh_token, expires_at)
+    await save_refresh_token_async(str(user["_id"]), refresh_token, expires_at)
 
     return {"access_token": access_token, "refresh_token": refresh_token}
 
 @router.post("/refresh", response_model=TokenResponse)
-def refresh_token(req: RefreshRequest):
-    if not is_refresh_token_valid(req.refresh_token):
+async def refresh_token(req: RefreshRequest):
+    if not await is_refresh_token_valid_async(req.refresh_token):
         raise HTTPException(status_code=401, detail="Invalid or revoked refresh token")
 
     payload = decode_token(req.refresh_token)
@@ -106,16 +111,16 @@ def refresh_token(req: RefreshRequest):
 
     # ✅ Save new refresh token, revoke old one
     expires_at = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    save_refresh_token(payload["sub"], new_refresh_token, expires_at)
-    revoke_refresh_token(req.refresh_token)
+    await save_refresh_token_async(payload["sub"], new_refresh_token, expires_at)
+    await revoke_refresh_token_async(req.refresh_token)
 
     return {"access_token": new_access_token, "refresh_token": new_refresh_token}
 
 @router.post("/logout")
-def logout(req: RefreshRequest, user=Depends(get_current_user)):
+async def logout(req: RefreshRequest, user=Depends(get_current_user)):
     """Logout by revoking the given refresh token"""
-    if not is_refresh_token_valid(req.refresh_token):
+    if not await is_refresh_token_valid_async(req.refresh_token):
         raise HTTPException(status_code=400, detail="Refresh token already invalidated")
 
-    revoke_refresh_token(req.refresh_token)
+    await revoke_refresh_token_async(req.refresh_token)
     return {"msg": "Logged out successfully"}
@@ -1,36 +1,65 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
-import shutil, os, uuid
-from app.services.import_service import import_user_excel
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Response
+from app.services.import_job_service import create_import_job, get_import_job, cancel_import_job, find_completed_import
+from app.services.upload_service import save_upload, discard_upload, UploadTooLarge
 from app.routes.auth import get_current_user
 
 router = APIRouter(prefix="/import", tags=["User Imports"])
 
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
-@router.post("/excel")
-def import_excel(file: UploadFile = File(...), user=Depends(get_current_user)):
+@router.post("/excel", status_code=202)
+def import_excel(response: Response, file: UploadFile = File(...), force: bool = False, user=Depends(get_current_user)):
     """
     User endpoint to import their own Excel data.
     Imported records are private and linked to their user_id.
+    The import runs in the background; poll GET /import/jobs/{job_id} for progress.
+    Re-uploading a file that was already imported is a no-op unless `force=true`.
     """
+    upload = None
+    user_id = str(user["_id"])
     try:
-        # Save uploaded file temporarily
-        temp_filename = f"{uuid.uuid4()}_{file.filename}"
-        temp_path = os.path.join(UPLOAD_DIR, temp_filename)
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        # Default country (if missing in file) can be passed in future
-        country_default = None
+        # Saved for the worker (it removes the file when done)
+        upload = save_upload(file)
 
-        # Run import service
-        result = import_user_excel(temp_path, str(user["_id"]), country_default=country_default)
+        if not force:
+            previous = find_completed_import(upload["sha256"], "user", user_id)
+            if previous:
+                discard_upload(upload["path"])
+                response.status_code = 200
+                return {"msg": "Identical file already imported", "duplicate": True,
+                        "job_id": previous["job_id"], "job": previous}
 
-        # Clean up temp file
-        os.remove(temp_path)
+        # Default country (if missing in file) can be passed in future
+        upload.update(filename=file.filename, country_default=None)
 
-        return {"msg": "User data imported successfully", "summary": result}
+        job = create_import_job(
+            "user", [upload],
+            requested_by=user_id,
+            user_id=user_id,
+        )
+        return {"msg": "User import queued", "job_id": job["job_id"], "job": job}
 
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
+        if upload:
+            discard_upload(upload["path"])
         raise HTTPException(status_code=500, detail=f"Import failed: {e}")
+
+# ======================= Job Endpoints =======================
+
+@router.get("/jobs/{job_id}")
+def fetch_import_job(job_id: str, user=Depends(get_current_user)):
+    """Progress of an import job: rows processed, rows/sec, ETA, skip counts, status."""
+    job = get_import_job(job_id, user)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found or not yours")
+    return job
+
+@router.delete("/jobs/{job_id}")
+def delete_import_job(job_id: str, user=Depends(get_current_user)):
+    """Cancel a queued or running import job."""
+    job = get_import_job(job_id, user)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found or not yours")
+    if job["status"] not in ("queued", "running"):
+        raise HTTPException(status_code=409, detail=f"Import job already {job['status']}")
+    return cancel_import_job(job_id, user)
@@ -1,8 +1,15 @@
 from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from app.routes.auth import get_current_user
-from app.services.search_service import search_icp
+from app.core.permissions import require_admin
+from app.services import company_names, search_cache
+from app.services.search_service import (
+    estimate_icp_async, search_icp_async, search_page_async, stream_search_async, SEARCH_KINDS,
+)
+from app.services.facet_service import get_facets, FACETS
 
 router = APIRouter(prefix="/search", tags=["Search"])
 
@@ -18,10 +25,72 @@ class SearchRequest(BaseModel):
     roles: Optional[List[str] | str] = None
     company_size: Optional[CompanySizeRange | str] = None
     limit: int = 50
+    mode: str = "filter"             # "filter" | "ranked" (BM25) | "prospects" (read model) | "scored" (relevance model)
+
+class SearchPageRequest(SearchRequest):
+    kind: str = "people"             # "people" | "companies"
+    cursor: Optional[str] = None     # next_cursor from the previous page
+
+class SearchStreamRequest(SearchRequest):
+    kinds: List[str] = list(SEARCH_KINDS)
+    limit: Optional[int] = None      # per kind; None streams every match
+
+def _filters(req: SearchRequest) -> Dict[str, Any]:
+    return req.dict(include={"industry", "geography", "roles", "company_size"}, exclude_none=True)
 
 @router.post("/")
-def search(req: SearchRequest, user=Depends(get_current_user)):
+async def search(req: SearchRequest, user=Depends(get_current_user)):
     # convert pydantic model to dict (keep only provided)
-    payload: Dict[str, Any] = {k: v for k, v in req.dict(exclude_none=True).items() if k != "limit"}
-    results = search_icp(payload, user_id=str(user["_id"]), limit=req.limit)
+    payload: Dict[str, Any] = {k: v for k, v in req.dict(exclude_none=True).items() if k not in ("limit", "mode")}
+    try:
+        results = await search_icp_async(payload, user_id=str(user["_id"]), limit=req.limit, mode=req.mode)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {"results": results}
+
+@router.post("/estimate")
+async def search_estimate(req: SearchRequest, user=Depends(get_current_user)):
+    """Approximate company / people counts for the filters, without running the search."""
+    return {"estimate": await estimate_icp_async(_filters(req), user_id=str(user["_id"]))}
+
+@router.post("/page")
+async def search_paged(req: SearchPageRequest, user=Depends(get_current_user)):
+    """Keyset-paginated results of one kind; pass `next_cursor` back to get the next page."""
+    try:
+        return await search_page_async(_filters(req), user_id=str(user["_id"]), kind=req.kind,
+                                       limit=max(1, min(req.limit, 1000)), cursor=req.cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/stream")
+async def search_stream(req: SearchStreamRequest, user=Depends(get_current_user)):
+    """All matches as NDJSON, one company/person per line, streamed as they are read."""
+    bad = [k for k in req.kinds if k not in SEARCH_KINDS]
+    if bad:
+        raise HTTPException(status_code=400, detail=f"Unknown kinds: {', '.join(bad)}")
+    rows = stream_search_async(_filters(req), user_id=str(user["_id"]), kinds=tuple(req.kinds), limit=req.limit)
+    return StreamingResponse(rows, media_type="application/x-ndjson")
+
+@router.get("/facets")
+async def search_facets(
+    facet: Optional[List[str]] = Query(None, description=f"Any of {', '.join(FACETS)}; all when omitted"),
+    limit: int = Query(20, ge=1, le=200),
+    user=Depends(get_current_user),
+):
+    """Most common industry / country / size / title-family values, for filter suggestions."""
+    return {"facets": await run_in_threadpool(get_facets, str(user["_id"]), facet, limit)}
+
+@router.get("/companies/similar")
+async def similar_companies(
+    name: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    user=Depends(get_current_user),
+):
+    """Companies whose names look like `name` ("Acme Technolgies" -> Acme Technologies Inc.), best match first."""
+    # The trigram index is in-process and may rebuild from Mongo first
+    return {"companies": await run_in_threadpool(company_names.similar_companies, name, str(user["_id"]), limit)}
+
+@router.get("/cache/stats")
+async def search_cache_stats(admin=Depends(require_admin)):
+    """Hit/miss counters, size and data versions of the search result cache."""
+    return search_cache.stats()
@@ -0,0 +1,127 @@
+import threading
+from array import array
+from typing import Any, Dict, List, Optional
+import numpy as np
+from app.db.collections import get_company_collection
+from app.db.owner import owner_of, visible_owners
+from app.services import search_cache
+from app.services.search_fields import company_name_norm
+
+# In-process trigram index over normalized company names, for fuzzy lookups
+# ("Acme Technolgies" -> Acme Technologies Inc.). Exact linking never needs it: companies
+# and people are joined on company_id, which is derived from the normalized
+# name key. Built lazily from Mongo, extended by imports in this process and
+# rebuilt when another worker imported (same data versions as search_cache).
+
+def trigrams(key: str) -> List[str]:
+    """Distinct character trigrams of a normalized name, padded so short names still match."""
+    padded = f"  {key} "
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+class TrigramIndex:
+    def __init__(self):
+        self._ids: List[str] = []
+        self._names: List[str] = []
+        self._seen: Dict[str, int] = {}
+        self._scope_codes: Dict[str, int] = {}
+        self._scopes = array("I")
+        self._sizes = array("I")
+        self._postings: Dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, company_id: str, name: str, scope: str):
+        key = company_name_norm(name)
+        if not key or company_id in self._seen:
+            return
+        slot = len(self._ids)
+        self._seen[company_id] = slot
+        self._ids.append(company_id)
+        self._names.append(name)
+        self._scopes.append(self._scope_codes.setdefault(scope, len(self._scope_codes)))
+        grams = trigrams(key)
+        self._sizes.append(len(grams))
+        for g in grams:
+            if g not in self._postings:
+                self._postings[g] = array("I")
+            self._postings[g].append(slot)
+
+    def search(self, name: str, scopes: List[str], k: int, threshold: float) -> List[Dict[str, Any]]:
+        """Companies whose trigram Jaccard similarity to `name` is at least `threshold`, best first."""
+        key = company_name_norm(name)
+        codes = [self._scope_codes[s] for s in scopes if s in self._scope_codes]
+        if not key or not codes or not self._ids:
+            return []
+        grams = trigrams(key)
+        lists = [np.frombuffer(self._postings[g], dtype=np.uint32) for g in grams if g in self._postings]
+        if not lists:
+            return []
+        shared = np.bincount(np.concatenate(lists), minlength=len(self._ids)).astype(np.float32)
+        sizes = np.frombuffer(self._sizes, dtype=np.uint32).astype(np.float32)
+        similarity = shared / (len(grams) + sizes - shared)
+        similarity[~np.isin(np.frombuffer(self._scopes, dtype=np.uint32), codes)] = 0
+
+        candidates = np.flatnonzero(similarity >= threshold)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-similarity[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-similarity[candidates], kind="stable")]
+        return [
+            {"company_id": self._ids[i], "name": self._names[i], "similarity": round(float(similarity[i]), 3)}
+            for i in candidates
+        ]
+
+# ======================= Module state =======================
+
+_lock = threading.RLock()
+_index = TrigramIndex()
+_built = False
+_versions: Dict[str, int] = {}
+
+def _owner(doc: dict) -> str:
+    return doc.get("owner") or owner_of(doc.get("user_id"))
+
+def rebuild():
+    global _index, _built
+    index = TrigramIndex()
+    for c in get_company_collection().find(
+        {"company_id": {"$exists": True}}, {"_id": 0, "company_id": 1, "name": 1, "owner": 1, "user_id": 1}, batch_size=1000,
+    ):
+        if c.get("name"):
+            index.add(c["company_id"], c["name"], _owner(c))
+    with _lock:
+        _index, _built = index, True
+        _versions.clear()
+    print(f"✅ Company name index built: {len(index)} companies")
+
+def ensure_current(user_id: Optional[str]):
+    current = search_cache.data_versions(user_id)[:2 if user_id else 1]
+    scopes = visible_owners(user_id)
+    with _lock:
+        if _built and all(_versions.setdefault(s, v) == v for s, v in zip(scopes, current)):
+            return
+    rebuild()
+    with _lock:
+        _versions.update(zip(scopes, current))
+
+def mark_current(user_id: Optional[str]):
+    version = search_cache.data_versions(user_id)[1 if user_id else 0]
+    with _lock:
+        if _built:
+            _versions[owner_of(user_id)] = version
+
+def index_companies(docs: List[dict]):
+    """Add companies created by an import (no-op until the index is first built)."""
+    with _lock:
+        if not _built:
+            return
+        for d in docs:
+            _index.add(d["company_id"], d["name"], _owner(d))
+
+def similar_companies(name: str, user_id: Optional[str] = None, limit: int = 10,
+                      threshold: float = 0.4) -> List[Dict[str, Any]]:
+    """Fuzzy company-name candidates in the global data and the user's own uploads."""
+    ensure_current(user_id)
+    scopes = visible_owners(user_id)
+    with _lock:
+        return _index.search(name, scopes, limit, threshold)
@@ -0,0 +1,111 @@
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+from pymongo import UpdateOne
+from app.db.collections import get_company_collection
+from app.db.owner import owner_of
+from app.services.search_fields import company_name_norm
+
+# Written only when a company is created: its identity (company_id, the name its
+# key was derived from) and provenance. Every other field of the import's
+# document is an attribute a re-import refreshes.
+INSERT_ONLY = ("company_id", "name", "fetched_from", "created_at")
+# Changes on every write, so never compared
+VOLATILE = ("updated_at",)
+
+def _key(name: str) -> str:
+    return company_name_norm(name) or name
+
+class CompanyResolver:
+    """
+    Maps company names to company_ids for the lifetime of one import.
+
+    Names are matched on their normalized key (company_name_norm), so "Acme Inc."
+    and "ACME Incorporated" resolve to the same company. Each chunk's distinct
+    keys are resolved with a single indexed `$in` query; missing companies are
+    created and existing ones whose attributes changed (industry, size, website,
+    ...) are updated with one unordered bulk upsert, so the number of round trips
+    grows with chunks, not rows.
+    """
+
+    def __init__(self, user_id: str | None):
+        self.user_id = user_id
+        self.owner = owner_of(user_id)
+        self.companies = get_company_collection()
+        self._ids: Dict[str, str] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return _key(name) in self._ids
+
+    def company_id(self, name: str) -> str | None:
+        return self._ids.get(_key(name))
+
+    def _load(self, keys: list[str]) -> Dict[str, dict]:
+        """Stored documents for these keys (first match per key); records their ids."""
+        stored: Dict[str, dict] = {}
+        for doc in self.companies.find({"owner": self.owner, "company_name_norm": {"$in": keys}}, {"_id": 0}):
+            if doc.get("company_id") and doc["company_name_norm"] not in stored:
+                stored[doc["company_name_norm"]] = doc
+                self._ids.setdefault(doc["company_name_norm"], doc["company_id"])
+        return stored
+
+    def _op(self, key: str, doc: dict) -> UpdateOne:
+        # Blank cells never erase a stored value: they are only written on insert
+        attrs = {k: v for k, v in doc.items() if k not in INSERT_ONLY}
+        on_insert = {k: doc[k] for k in INSERT_ONLY if k in doc}
+        on_insert.update({k: v for k, v in attrs.items() if v is None})
+        return UpdateOne(
+            {"owner": self.owner, "company_name_norm": key},
+            {"$set": {k: v for k, v in attrs.items() if v is not None}, "$setOnInsert": on_insert},
+            upsert=True,
+        )
+
+    def resolve(self, names: Iterable[str], build_doc: Callable[[str], dict]) -> Tuple[List[dict], List[Tuple[dict, dict]]]:
+        """
+        Make sure every name has a company_id and carries the attributes of this
+        import. `build_doc(name)` is called once per normalized key not yet seen
+        in this import, with the first spelling seen. Returns the documents it
+        inserted and (written document, previous stored document) for the
+        companies it updated.
+        """
+        first_name: Dict[str, str] = {}
+        for n in names:
+            k = _key(n)
+            if k not in self._ids:
+                first_name.setdefault(k, n)
+        if not first_name:
+            return [], []
+
+        stored = self._load(list(first_name))
+        docs: Dict[str, dict] = {}
+        for k, name in first_name.items():
+            doc = build_doc(name)
+            prev = stored.get(k)
+            if prev is not None and not _changed(prev, doc):
+                continue
+            if prev is not None:
+                doc = {**doc, "company_id": prev["company_id"]}
+            docs[k] = doc
+        if not docs:
+            return [], []
+
+        keys = list(docs)
+        result = self.companies.bulk_write([self._op(k, docs[k]) for k in keys], ordered=False)
+
+        created = result.upserted_ids or {}
+        for i in created:
+            self._ids[keys[i]] = docs[keys[i]]["company_id"]
+
+        # Keys that matched without being loaded were created concurrently; use the stored id.
+        raced = [k for k in keys if k not in self._ids]
+        if raced:
+            self._load(raced)
+
+        inserted = [docs[keys[i]] for i in sorted(created)]
+        updated = [({**stored[k], **_written(docs[k])}, stored[k]) for k in keys if k in stored]
+        return inserted, updated
+
+def _written(doc: dict) -> Dict[str, Any]:
+    """The fields _op() sets on an existing company."""
+    return {k: v for k, v in doc.items() if k not in INSERT_ONLY and v is not None}
+
+def _changed(stored: dict, doc: dict) -> bool:
+    return any(stored.get(k) != v for k, v in _written(doc).items() if k not in VOLATILE)
@@ -1,10 +1,29 @@
 from bson import ObjectId
+from app.db.owner import owner_of
+from app.services import prospect_view, search_cache
+from app.services.search_fields import company_search_fields, employee_count_value, size_range
 from app.db.collections import get_company_collection
 from app.models.company import Company
 
+def _employee_count(size) -> dict:
+    """employee_count from the size field; a bucket ("51-200") stores its lower bound as an estimate."""
+    n = employee_count_value(size)
+    if n is not None:
+        return {"employee_count": n, "employee_count_estimated": False}
+    rng = size_range(size)
+    if rng and rng.get("min") is not None:
+        return {"employee_count": rng["min"], "employee_count_estimated": True}
+    return {"employee_count": None}
+
 def create_company(company: Company) -> str:
     companies = get_company_collection()
-    result = companies.insert_one(company.dict(by_alias=True))
+    doc = company.dict(by_alias=True)
+    doc["owner"] = owner_of(doc.get("user_id"))
+    doc.update(company_search_fields(doc))
+    doc.update(_employee_count(doc.get("size")))
+    result = companies.insert_one(doc)
+    prospect_view.sync_company(doc)
+    search_cache.bump_data_version(doc.get("user_id"))
     return str(result.inserted_id)
 
 def get_company_by_id(company_id: str):
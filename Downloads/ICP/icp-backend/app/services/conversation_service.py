@@ -1,5 +1,12 @@
 from datetime import datetime
 from app.db.collections import get_conversations_collection
+from app.db.async_collections import get_async_conversations_collection
+
+# Conversation list: metadata plus the latest message as a preview, not the whole history
+CONVERSATION_LIST_FIELDS = {
+    "conversation_id": 1, "user_id": 1, "last_fetched_at": 1, "total_messages_count": 1,
+    "messages": {"$slice": -1},
+}
 
 def save_message(conversation_id: str, sender: str, text: str):
     conversations = get_conversations_collection()
@@ -23,7 +30,7 @@ def get_conversation(conversation_id: str):
 def list_user_conversations(user_id: str, limit: int = 20):
     conversations = get_conversations_collection()
     return list(
-        conversations.find({"user_id": user_id})
+        conversations.find({"user_id": user_id}, CONVERSATION_LIST_FIELDS)
         .sort("last_fetched_at", -1)
         .limit(limit)
     )
@@ -56,8 +63,39 @@ def get_conversation(conversation_id: str, user_id: str):
 def list_user_conversations(user_id: str, limit: int = 20):
     conversations = get_conversations_collection()
     return list(
-        conversations.find({"user_id": user_id})
+        conversations.find({"user_id": user_id}, CONVERSATION_LIST_FIELDS)
         .sort("last_fetched_at", -1)
         .limit(limit)
     )
 
+# ======================= Async (Motor) =======================
+
+async def save_message_async(conversation_id: str, sender: str, text: str, user_id: str | None = None):
+    conversations = get_async_conversations_collection()
+    update_fields = {
+        "$push": {"messages": {
+            "sender": sender,
+            "message_text": text,
+            "origin": "system" if sender == "assistant" else "user",
+            "sent_at": datetime.utcnow()
+        }},
+        "$inc": {"total_messages_count": 1},
+        "$set": {"last_fetched_at": datetime.utcnow()}
+    }
+    if user_id:
+        update_fields["$set"]["user_id"] = user_id
+
+    await conversations.update_one(
+        {"conversation_id": conversation_id},
+        update_fields,
+        upsert=True
+    )
+
+async def get_conversation_async(conversation_id: str, user_id: str):
+    conversations = get_async_conversations_collection()
+    return await conversations.find_one({"conversation_id": conversation_id, "user_id": user_id})
+
+async def list_user_conversations_async(user_id: str, limit: int = 20):
+    conversations = get_async_conversations_collection()
+    cursor = conversations.find({"user_id": user_id}, CONVERSATION_LIST_FIELDS).sort("last_fetched_at", -1).limit(limit)
+    return await cursor.to_list(length=limit)
@@ -0,0 +1,131 @@
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from pymongo import UpdateOne
+from app.db.collections import get_company_collection, get_people_collection, get_facet_stats_collection
+from app.db.owner import owner_of, visible_owners
+from app.services.geo import country_name
+
+# Precomputed value counts behind GET /search/facets (filter suggestions in the UI).
+# One document per (facet, scope, value); scope is the record's `owner` ("global"
+# for Vault data or the owning user's id, see app/db/owner.py). Imports add the companies/people they insert and move updated
+# ones from their previous buckets to their new ones (facet_deltas + apply_deltas);
+# rebuild_facets() recomputes everything from scratch.
+
+FACETS = ("industry", "country", "size", "title_family")
+
+BATCH = 1000
+
+def _owner(doc: Dict[str, Any]) -> str:
+    return doc.get("owner") or owner_of(doc.get("user_id"))
+
+def company_facets(c: Dict[str, Any]) -> Dict[str, Any]:
+    """facet -> (value, label) for one company document."""
+    return {
+        "industry": (c.get("industry_norm"), c.get("industry") or c.get("Industry")),
+        "country": (c.get("country_code"), country_name(c.get("country_code"))),
+        "size": (c.get("size"), c.get("size")),
+    }
+
+def person_facets(p: Dict[str, Any]) -> Dict[str, Any]:
+    # title_department is the role family derived from the title (search_fields.person_search_fields)
+    return {"title_family": (p.get("title_department"), p.get("title_department"))}
+
+def count_facets(companies: Iterable[Dict[str, Any]], people: Iterable[Dict[str, Any]],
+                 user_id: Any = None) -> Tuple[Counter, Dict[tuple, Any]]:
+    """
+    Count (facet, scope, value) over the given documents, plus a display label
+    per key. `user_id` overrides each document's own scope.
+    """
+    counts: Counter = Counter()
+    labels: Dict[tuple, Any] = {}
+    for docs, facets in ((companies, company_facets), (people, person_facets)):
+        for doc in docs:
+            scope = owner_of(user_id) if user_id is not None else _owner(doc)
+            for facet, (value, label) in facets(doc).items():
+                if value:
+                    key = (facet, scope, value)
+                    counts[key] += 1
+                    labels.setdefault(key, label or value)
+    return counts, labels
+
+def facet_deltas(companies: Iterable[Dict[str, Any]], people: Iterable[Dict[str, Any]],
+                 previous_companies: Iterable[Dict[str, Any]] = (),
+                 previous_people: Iterable[Dict[str, Any]] = ()) -> Tuple[Counter, Dict[tuple, Any]]:
+    """
+    Counts for written documents minus counts for the stored versions they
+    replaced, so an updated record moves from its old buckets to its new ones.
+    """
+    counts, labels = count_facets(companies, people)
+    before, _ = count_facets(previous_companies, previous_people)
+    counts.subtract(before)
+    return Counter({key: n for key, n in counts.items() if n}), labels
+
+def apply_deltas(counts: Counter, labels: Dict[tuple, Any]):
+    """Add counted values (negative to remove) to the stored facet stats (one bulk upsert)."""
+    if not counts:
+        return
+    now = datetime.now(timezone.utc)
+    ops = [
+        UpdateOne(
+            {"facet": facet, "scope": scope, "value": value},
+            {"$inc": {"count": n}, "$set": {"updated_at": now},
+             "$setOnInsert": {"label": labels.get((facet, scope, value), value)}},
+            upsert=True,
+        )
+        for (facet, scope, value), n in counts.items()
+    ]
+    get_facet_stats_collection().bulk_write(ops, ordered=False)
+
+def rebuild_facets() -> int:
+    """Recompute every facet from companies/people (full scan). Returns the number of facet values."""
+    companies = get_company_collection().find(
+        {}, {"_id": 0, "owner": 1, "user_id": 1, "industry_norm": 1, "industry": 1, "Industry": 1,
+             "country_code": 1, "size": 1},
+        batch_size=BATCH,
+    )
+    people = get_people_collection().find({}, {"_id": 0, "owner": 1, "user_id": 1, "title_department": 1}, batch_size=BATCH)
+    counts, labels = count_facets(companies, people)
+
+    now = datetime.now(timezone.utc)
+    coll = get_facet_stats_collection()
+    coll.delete_many({})
+    docs = [
+        {"facet": facet, "scope": scope, "value": value, "label": labels[(facet, scope, value)],
+         "count": n, "updated_at": now}
+        for (facet, scope, value), n in counts.items()
+    ]
+    for start in range(0, len(docs), BATCH):
+        coll.insert_many(docs[start:start + BATCH], ordered=False)
+    return len(docs)
+
+def get_facets(user_id: Optional[str] = None, facets: Optional[List[str]] = None, limit: int = 20) -> Dict[str, List[dict]]:
+    """Top values per facet over the global data plus the user's own uploads."""
+    wanted = [f for f in (facets or FACETS) if f in FACETS]
+    scopes = visible_owners(user_id)
+    merged: Dict[str, Dict[str, dict]] = {f: {} for f in wanted}
+    for d in get_facet_stats_collection().find(
+        {"facet": {"$in": wanted}, "scope": {"$in": scopes}, "count": {"$gt": 0}},
+        {"_id": 0, "facet": 1, "value": 1, "label": 1, "count": 1},
+    ):
+        entry = merged[d["facet"]].setdefault(d["value"], {"value": d["value"], "label": d.get("label"), "count": 0})
+        entry["count"] += d["count"]
+    return {
+        f: sorted(values.values(), key=lambda e: (-e["count"], e["value"]))[:limit]
+        for f, values in merged.items()
+    }
+
+def facet_share(user_id: Optional[str], facet: str, match: Callable[[Any], bool]) -> Optional[float]:
+    """
+    Share of the counted records (global + the user's) whose `facet` value
+    satisfies `match`; None when the facet has no stats yet.
+    """
+    scopes = visible_owners(user_id)
+    total = matched = 0
+    for d in get_facet_stats_collection().find(
+        {"facet": facet, "scope": {"$in": scopes}, "count": {"$gt": 0}}, {"_id": 0, "value": 1, "count": 1},
+    ):
+        total += d["count"]
+        if match(d["value"]):
+            matched += d["count"]
+    return matched / total if total else None
@@ -0,0 +1,239 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# Geography normalization: free-text locations ("Bengaluru, Karnataka",
+# "San Francisco, CA", "U.S.A.") are resolved to ISO 3166 codes at import time
+# and stored as country_code / subdivision_code. Search resolves the ICP's
+# geography the same way (regions such as "APAC" expand to their countries),
+# so a geography filter is one indexed $in on codes.
+
+# ISO 3166-1 alpha-2 -> (display name, aliases)
+COUNTRIES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "IN": ("India", ("india", "bharat", "ind")),
+    "US": ("United States", ("united states", "united states of america", "usa", "us", "america", "u s", "u s a")),
+    "GB": ("United Kingdom", ("united kingdom", "uk", "great britain", "britain", "england", "scotland", "wales",
+                              "northern ireland", "gbr")),
+    "CA": ("Canada", ("canada",)),
+    "AU": ("Australia", ("australia",)),
+    "NZ": ("New Zealand", ("new zealand",)),
+    "IE": ("Ireland", ("ireland", "republic of ireland")),
+    "DE": ("Germany", ("germany", "deutschland")),
+    "FR": ("France", ("france",)),
+    "NL": ("Netherlands", ("netherlands", "the netherlands", "holland")),
+    "BE": ("Belgium", ("belgium",)),
+    "LU": ("Luxembourg", ("luxembourg",)),
+    "CH": ("Switzerland", ("switzerland",)),
+    "AT": ("Austria", ("austria",)),
+    "ES": ("Spain", ("spain",)),
+    "PT": ("Portugal", ("portugal",)),
+    "IT": ("Italy", ("italy",)),
+    "SE": ("Sweden", ("sweden",)),
+    "NO": ("Norway", ("norway",)),
+    "DK": ("Denmark", ("denmark",)),
+    "FI": ("Finland", ("finland",)),
+    "IS": ("Iceland", ("iceland",)),
+    "PL": ("Poland", ("poland",)),
+    "CZ": ("Czechia", ("czechia", "czech republic")),
+    "RO": ("Romania", ("romania",)),
+    "GR": ("Greece", ("greece",)),
+    "UA": ("Ukraine", ("ukraine",)),
+    "TR": ("Turkey", ("turkey", "turkiye")),
+    "IL": ("Israel", ("israel",)),
+    "AE": ("United Arab Emirates", ("united arab emirates", "uae", "u a e", "emirates", "dubai", "abu dhabi")),
+    "SA": ("Saudi Arabia", ("saudi arabia", "ksa")),
+    "QA": ("Qatar", ("qatar",)),
+    "KW": ("Kuwait", ("kuwait",)),
+    "BH": ("Bahrain", ("bahrain",)),
+    "OM": ("Oman", ("oman",)),
+    "EG": ("Egypt", ("egypt",)),
+    "ZA": ("South Africa", ("south africa",)),
+    "NG": ("Nigeria", ("nigeria",)),
+    "KE": ("Kenya", ("kenya",)),
+    "SG": ("Singapore", ("singapore",)),
+    "MY": ("Malaysia", ("malaysia",)),
+    "ID": ("Indonesia", ("indonesia",)),
+    "TH": ("Thailand", ("thailand",)),
+    "VN": ("Vietnam", ("vietnam", "viet nam")),
+    "PH": ("Philippines", ("philippines",)),
+    "JP": ("Japan", ("japan",)),
+    "KR": ("South Korea", ("south korea", "korea", "republic of korea")),
+    "CN": ("China", ("china", "prc", "people s republic of china")),
+    "HK": ("Hong Kong", ("hong kong",)),
+    "TW": ("Taiwan", ("taiwan",)),
+    "PK": ("Pakistan", ("pakistan",)),
+    "BD": ("Bangladesh", ("bangladesh",)),
+    "LK": ("Sri Lanka", ("sri lanka",)),
+    "NP": ("Nepal", ("nepal",)),
+    "MX": ("Mexico", ("mexico",)),
+    "BR": ("Brazil", ("brazil", "brasil")),
+    "AR": ("Argentina", ("argentina",)),
+    "CL": ("Chile", ("chile",)),
+    "CO": ("Colombia", ("colombia",)),
+    "PE": ("Peru", ("peru",)),
+}
+
+# ISO 3166-2 subdivision -> aliases (state names and, for the US, postal abbreviations)
+SUBDIVISIONS: Dict[str, Tuple[str, ...]] = {
+    "US-AL": ("alabama", "al"), "US-AK": ("alaska", "ak"), "US-AZ": ("arizona", "az"),
+    "US-AR": ("arkansas", "ar"), "US-CA": ("california", "ca"), "US-CO": ("colorado", "co"),
+    "US-CT": ("connecticut", "ct"), "US-DE": ("delaware", "de"), "US-DC": ("district of columbia", "dc"),
+    "US-FL": ("florida", "fl"), "US-GA": ("georgia", "ga"), "US-HI": ("hawaii", "hi"),
+    "US-ID": ("idaho", "id"), "US-IL": ("illinois", "il"), "US-IN": ("indiana", "in"),
+    "US-IA": ("iowa", "ia"), "US-KS": ("kansas", "ks"), "US-KY": ("kentucky", "ky"),
+    "US-LA": ("louisiana", "la"), "US-ME": ("maine", "me"), "US-MD": ("maryland", "md"),
+    "US-MA": ("massachusetts", "ma"), "US-MI": ("michigan", "mi"), "US-MN": ("minnesota", "mn"),
+    "US-MS": ("mississippi", "ms"), "US-MO": ("missouri", "mo"), "US-MT": ("montana", "mt"),
+    "US-NE": ("nebraska", "ne"), "US-NV": ("nevada", "nv"), "US-NH": ("new hampshire", "nh"),
+    "US-NJ": ("new jersey", "nj"), "US-NM": ("new mexico", "nm"), "US-NY": ("new york", "ny"),
+    "US-NC": ("north carolina", "nc"), "US-ND": ("north dakota", "nd"), "US-OH": ("ohio", "oh"),
+    "US-OK": ("oklahoma", "ok"), "US-OR": ("oregon", "or"), "US-PA": ("pennsylvania", "pa"),
+    "US-RI": ("rhode island", "ri"), "US-SC": ("south carolina", "sc"), "US-SD": ("south dakota", "sd"),
+    "US-TN": ("tennessee", "tn"), "US-TX": ("texas", "tx"), "US-UT": ("utah", "ut"),
+    "US-VT": ("vermont", "vt"), "US-VA": ("virginia", "va"), "US-WA": ("washington", "wa"),
+    "US-WV": ("west virginia", "wv"), "US-WI": ("wisconsin", "wi"), "US-WY": ("wyoming", "wy"),
+    "IN-AP": ("andhra pradesh",), "IN-AS": ("assam",), "IN-BR": ("bihar",), "IN-CT": ("chhattisgarh",),
+    "IN-GA": ("goa",), "IN-GJ": ("gujarat",), "IN-HR": ("haryana",), "IN-HP": ("himachal pradesh",),
+    "IN-JH": ("jharkhand",), "IN-KA": ("karnataka",), "IN-KL": ("kerala",), "IN-MP": ("madhya pradesh",),
+    "IN-MH": ("maharashtra",), "IN-OR": ("odisha", "orissa"), "IN-PB": ("punjab",),
+    "IN-RJ": ("rajasthan",), "IN-TN": ("tamil nadu",), "IN-TG": ("telangana",),
+    "IN-UP": ("uttar pradesh",), "IN-UT": ("uttarakhand",), "IN-WB": ("west bengal",),
+    "IN-DL": ("delhi", "new delhi", "ncr", "delhi ncr"), "IN-CH": ("chandigarh",), "IN-JK": ("jammu and kashmir",),
+}
+
+# Cities common in the Vault exports -> subdivision
+CITIES: Dict[str, str] = {
+    "bangalore": "IN-KA", "bengaluru": "IN-KA", "mysore": "IN-KA", "mysuru": "IN-KA",
+    "mumbai": "IN-MH", "bombay": "IN-MH", "pune": "IN-MH", "nagpur": "IN-MH", "navi mumbai": "IN-MH",
+    "thane": "IN-MH", "gurgaon": "IN-HR", "gurugram": "IN-HR", "noida": "IN-UP", "lucknow": "IN-UP",
+    "hyderabad": "IN-TG", "chennai": "IN-TN", "madras": "IN-TN", "coimbatore": "IN-TN",
+    "kolkata": "IN-WB", "calcutta": "IN-WB", "ahmedabad": "IN-GJ", "vadodara": "IN-GJ",
+    "jaipur": "IN-RJ", "kochi": "IN-KL", "cochin": "IN-KL", "trivandrum": "IN-KL",
+    "thiruvananthapuram": "IN-KL", "indore": "IN-MP", "bhopal": "IN-MP", "bhubaneswar": "IN-OR",
+    "san francisco": "US-CA", "los angeles": "US-CA", "san jose": "US-CA", "san diego": "US-CA",
+    "palo alto": "US-CA", "mountain view": "US-CA", "sunnyvale": "US-CA", "santa clara": "US-CA",
+    "menlo park": "US-CA", "new york city": "US-NY", "nyc": "US-NY", "brooklyn": "US-NY",
+    "seattle": "US-WA", "redmond": "US-WA", "boston": "US-MA", "cambridge ma": "US-MA",
+    "austin": "US-TX", "dallas": "US-TX", "houston": "US-TX", "chicago": "US-IL",
+    "atlanta": "US-GA", "miami": "US-FL", "denver": "US-CO", "phoenix": "US-AZ",
+    "philadelphia": "US-PA", "pittsburgh": "US-PA", "washington dc": "US-DC", "detroit": "US-MI",
+    "minneapolis": "US-MN", "salt lake city": "US-UT", "raleigh": "US-NC", "charlotte": "US-NC",
+    "portland": "US-OR", "nashville": "US-TN", "las vegas": "US-NV",
+}
+
+# Regions a user may ask for -> member countries
+REGIONS: Dict[str, Tuple[str, ...]] = {
+    "north america": ("US", "CA"),
+    "latam": ("MX", "BR", "AR", "CL", "CO", "PE"),
+    "europe": ("GB", "IE", "DE", "FR", "NL", "BE", "LU", "CH", "AT", "ES", "PT", "IT", "SE", "NO", "DK", "FI",
+               "IS", "PL", "CZ", "RO", "GR", "UA"),
+    "dach": ("DE", "AT", "CH"),
+    "benelux": ("BE", "NL", "LU"),
+    "nordics": ("SE", "NO", "DK", "FI", "IS"),
+    "middle east": ("AE", "SA", "QA", "KW", "BH", "OM", "IL", "TR", "EG"),
+    "gcc": ("AE", "SA", "QA", "KW", "BH", "OM"),
+    "africa": ("ZA", "NG", "KE", "EG"),
+    "south asia": ("IN", "PK", "BD", "LK", "NP"),
+    "southeast asia": ("SG", "MY", "ID", "TH", "VN", "PH"),
+    "anz": ("AU", "NZ"),
+}
+REGIONS["latin america"] = REGIONS["south america"] = REGIONS["latam"]
+REGIONS["emea"] = REGIONS["europe"] + REGIONS["middle east"] + REGIONS["africa"]
+REGIONS["mena"] = REGIONS["middle east"]
+REGIONS["sea"] = REGIONS["asean"] = REGIONS["southeast asia"]
+REGIONS["apac"] = REGIONS["asia pacific"] = (
+    REGIONS["south asia"] + REGIONS["southeast asia"] + REGIONS["anz"] + ("JP", "KR", "CN", "HK", "TW")
+)
+
+_COUNTRY_BY_ALIAS = {alias: code for code, (_, aliases) in COUNTRIES.items() for alias in aliases}
+# Postal abbreviations ("ca", "in") collide with country names/codes; they only count after a comma
+_SUBDIVISION_BY_NAME = {a: code for code, aliases in SUBDIVISIONS.items() for a in aliases if len(a) > 2}
+_SUBDIVISION_BY_ABBR = {a: code for code, aliases in SUBDIVISIONS.items() for a in aliases if len(a) == 2}
+_SEPARATORS = re.compile(r"\s*(?:,|;|\||/|\s-\s)\s*")
+_NON_WORD = re.compile(r"[^\w\s,;|/-]")
+_WS = re.compile(r"\s+")
+
+def _clean(value: Any) -> Optional[str]:
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    s = str(value).casefold().replace(".", " ").replace("'", " ")
+    s = _WS.sub(" ", _NON_WORD.sub(" ", s)).strip(" ,;|/-")
+    return s or None
+
+def country_name(code: Optional[str]) -> Optional[str]:
+    return COUNTRIES[code][0] if code in COUNTRIES else None
+
+@lru_cache(maxsize=65536)
+def _resolve(s: str) -> Tuple[Optional[str], Optional[str]]:
+    parts = [p for p in _SEPARATORS.split(s) if p]
+    country: Optional[str] = _COUNTRY_BY_ALIAS.get(s)
+    subdivision: Optional[str] = _SUBDIVISION_BY_NAME.get(s) or CITIES.get(s)
+    # Least specific last: "Pune, Maharashtra, India"
+    for part in reversed(parts):
+        if country is None and part in _COUNTRY_BY_ALIAS:
+            country = _COUNTRY_BY_ALIAS[part]
+        elif subdivision is None:
+            subdivision = _SUBDIVISION_BY_NAME.get(part) or CITIES.get(part)
+    if subdivision is None and country is None and len(parts) > 1:
+        subdivision = _SUBDIVISION_BY_ABBR.get(parts[-1])  # "Austin, TX"
+    if subdivision and country and not subdivision.startswith(country + "-"):
+        subdivision = None
+    if subdivision and not country:
+        country = subdivision[:2]
+    return country, subdivision
+
+def resolve(value: Any) -> Tuple[Optional[str], Optional[str]]:
+    """(country_code, subdivision_code) for a free-text location; (None, None) if unknown."""
+    s = _clean(value)
+    return _resolve(s) if s else (None, None)
+
+def geo_fields(location: Any) -> Dict[str, Optional[str]]:
+    """Fields written on companies and people at import."""
+    country, subdivision = resolve(location)
+    return {"country_code": country, "subdivision_code": subdivision}
+
+def query_codes(values: List[Any]) -> Tuple[List[str], List[str], List[str]]:
+    """
+    (country codes, subdivision codes, unresolved values) for an ICP's
+    geography. Regions expand to their countries; a state or city narrows to
+    its subdivision; a country name matches the whole country.
+    """
+    countries: List[str] = []
+    subdivisions: List[str] = []
+    unresolved: List[str] = []
+    for v in values:
+        s = _clean(v)
+        if not s:
+            continue
+        if s in REGIONS:
+            countries.extend(REGIONS[s])
+            continue
+        country, subdivision = _resolve(s)
+        if subdivision and s not in _COUNTRY_BY_ALIAS:
+            subdivisions.append(subdivision)
+        elif country:
+            countries.append(country)
+        else:
+            unresolved.append(s)
+    return list(dict.fromkeys(countries)), list(dict.fromkeys(subdivisions)), list(dict.fromkeys(unresolved))
+
+def country_from_filename(filename: Optional[str]) -> Optional[str]:
+    """
+    Country named in an upload's filename ("Vault_data_India.xlsx" -> "India"),
+    used to fill blank countries. None when the filename names a region
+    ("Latin_America_leads.xlsx"): its rows span several countries.
+    """
+    words = _clean(re.sub(r"\.\w+$", "", filename or "").replace("_", " "))
+    if not words:
+        return None
+    tokens = words.split()
+    runs = {" ".join(tokens[i:i + n]) for n in (1, 2, 3) for i in range(len(tokens) - n + 1)}
+    if runs & REGIONS.keys():
+        return None
+    for n in (3, 2, 1):
+        for i in range(len(tokens) - n + 1):
+            code = _COUNTRY_BY_ALIAS.get(" ".join(tokens[i:i + n]))
+            # Two-letter aliases ("us", "uk") are too common inside filenames to trust
+            if code and (n > 1 or len(tokens[i]) > 2):
+                return country_name(code)
+    return None
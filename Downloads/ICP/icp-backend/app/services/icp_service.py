@@ -1,5 +1,6 @@
 from datetime import datetime
 from app.db.collections import get_icp_sessions_collection
+from app.db.async_collections import get_async_icp_sessions_collection
 from app.models.icp_session import ICPSession
 
 def save_icp(session: ICPSession) -> str:
@@ -15,3 +16,19 @@ def update_icp(conversation_id: str, updates: dict):
 def get_icp_by_conversation(conversation_id: str):
     sessions = get_icp_sessions_collection()
     return sessions.find_one({"conversation_id": conversation_id})
+
+# ======================= Async (Motor) =======================
+
+async def save_icp_async(session: ICPSession) -> str:
+    sessions = get_async_icp_sessions_collection()
+    result = await sessions.insert_one(session.dict(by_alias=True))
+    return str(result.inserted_id)
+
+async def update_icp_async(conversation_id: str, updates: dict):
+    sessions = get_async_icp_sessions_collection()
+    updates["updated_at"] = datetime.utcnow()
+    await sessions.update_one({"conversation_id": conversation_id}, {"$set": updates}, upsert=True)
+
+async def get_icp_by_conversation_async(conversation_id: str):
+    sessions = get_async_icp_sessions_collection()
+    return await sessions.find_one({"conversation_id": conversation_id})
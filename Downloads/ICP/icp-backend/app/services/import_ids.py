@@ -0,0 +1,25 @@
+import hashlib
+import json
+from app.db.owner import owner_of
+from app.services.search_fields import company_name_norm
+
+# Fields that don't describe the row's content and must not affect its fingerprint
+_VOLATILE_FIELDS = {"_id", "created_at", "updated_at", "row_fingerprint"}
+
+def _digest(*parts) -> str:
+    key = "\x1f".join(str(p or "").strip().casefold() for p in parts)
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+def company_id_for(name: str, user_id: str | None) -> str:
+    """Stable company_id: names with the same normalized key in the same scope share an id."""
+    return _digest("company", company_name_norm(name) or name, owner_of(user_id))
+
+def person_id_for(email: str, full_name: str, user_id: str | None) -> str:
+    """Stable person_id derived from normalized email + name + scope."""
+    return _digest("person", email, full_name, owner_of(user_id))
+
+def row_fingerprint(doc: dict) -> str:
+    """Content hash of a built document, used to skip unchanged rows on re-import."""
+    payload = {k: v for k, v in doc.items() if k not in _VOLATILE_FIELDS}
+    encoded = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
@@ -0,0 +1,214 @@
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+from pymongo import ReturnDocument
+from app.core.config import settings
+from app.db.collections import get_import_jobs_collection
+from app.services.import_reader import count_rows
+from app.services.upload_service import discard_upload
+from app.services.import_service import import_vault_files, import_user_files, ImportCancelled
+
+# Bounded pool: at most IMPORT_WORKERS imports run at once, the rest wait queued.
+_executor = ThreadPoolExecutor(max_workers=settings.IMPORT_WORKERS, thread_name_prefix="import")
+
+# A running job whose heartbeat is older than this belonged to a worker that died.
+# Only used for jobs of other instances; this instance's own are checked by pid.
+STALE_AFTER = timedelta(minutes=5)
+
+ACTIVE_STATUSES = ("queued", "running")
+
+# Never returned to clients
+_PRIVATE_FIELDS = {"_id": 0, "files.path": 0}
+
+def _now():
+    return datetime.now(timezone.utc)
+
+def _pid_alive(pid: int | None) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def find_completed_import(sha256: str, kind: str, user_id: str | None):
+    """An already completed import of byte-identical content into the same scope, if any."""
+    return get_import_jobs_collection().find_one(
+        {"files.sha256": sha256, "kind": kind, "user_id": user_id, "status": "completed"},
+        _PRIVATE_FIELDS,
+        sort=[("finished_at", -1)],
+    )
+
+def create_import_job(kind: str, uploads: list[dict], requested_by: str,
+                      user_id: str | None = None, workers: int | None = None) -> dict:
+    """
+    Persist a queued import job and hand it to the worker pool. Each upload is a
+    save_upload() result plus its "filename" and "country_default"; several
+    uploads (e.g. regional Vault files) are imported as one run.
+    `workers` > 1 parses the files in a process pool.
+    """
+    jobs = get_import_jobs_collection()
+    files = [
+        {
+            "path": u["path"],
+            "filename": u["filename"],
+            "sha256": u["sha256"],
+            "size_bytes": u["size_bytes"],
+            "country_default": u.get("country_default"),
+        }
+        for u in uploads
+    ]
+    job = {
+        "job_id": str(uuid.uuid4()),
+        "kind": kind,                    # "vault" | "user"
+        "status": "queued",
+        "filename": ", ".join(f["filename"] for f in files),
+        "files": files,
+        "workers": workers,
+        "requested_by": requested_by,
+        "user_id": user_id,              # owner of the imported records (None = global)
+        "rows_total": None,              # counted by the worker once it claims the job
+        "rows_processed": 0,
+        "companies_added": 0,
+        "people_added": 0,
+        "skipped": 0,
+        "skip_reasons": None,
+        "rows_per_sec": None,
+        "eta_seconds": None,
+        "cancel_requested": False,
+        "summary": None,
+        "error": None,
+        "created_at": _now(),
+        "started_at": None,
+        "heartbeat_at": None,
+        "instance": None,                # INSTANCE_ID and pid of the process running it
+        "pid": None,
+        "finished_at": None,
+    }
+    jobs.insert_one(job)
+    _executor.submit(_run_job, job["job_id"])
+    return get_import_job(job["job_id"])
+
+def get_import_job(job_id: str, user: dict | None = None):
+    """Fetch a job. When `user` is given, non-admins only see jobs they requested."""
+    query = {"job_id": job_id}
+    if user is not None and user.get("role") != "admin":
+        query["requested_by"] = str(user["_id"])
+    return get_import_jobs_collection().find_one(query, _PRIVATE_FIELDS)
+
+def cancel_import_job(job_id: str, user: dict):
+    """Flag an active job for cancellation; the worker stops after its current chunk."""
+    query = {"job_id": job_id, "status": {"$in": list(ACTIVE_STATUSES)}}
+    if user.get("role") != "admin":
+        query["requested_by"] = str(user["_id"])
+    jobs = get_import_jobs_collection()
+    jobs.update_one(query, {"$set": {"cancel_requested": True}})
+    # A job that never started can be closed right away.
+    jobs.update_one(
+        {"job_id": job_id, "status": "queued", "cancel_requested": True},
+        {"$set": {"status": "cancelled", "finished_at": _now()}},
+    )
+    return get_import_job(job_id, user)
+
+def _progress_callback(job_id: str, rows_total: int | None):
+    jobs = get_import_jobs_collection()
+
+    def on_progress(summary: dict):
+        rps = summary.get("rows_per_sec")
+        eta = None
+        if rows_total and rps:
+            eta = round(max(rows_total - summary["rows_processed"], 0) / rps, 1)
+        job = jobs.find_one_and_update(
+            {"job_id": job_id},
+            {"$set": {
+                "rows_processed": summary["rows_processed"],
+                "companies_added": summary["companies_added"],
+                "people_added": summary["people_added"],
+                "skipped": summary["skipped"],
+                "skip_reasons": summary.get("skip_reasons"),
+                "rows_per_sec": rps,
+                "eta_seconds": eta,
+                "heartbeat_at": _now(),
+            }},
+            projection={"cancel_requested": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        if job and job.get("cancel_requested"):
+            raise ImportCancelled()
+
+    return on_progress
+
+def _run_job(job_id: str):
+    jobs = get_import_jobs_collection()
+    # Atomic claim so a job is never run twice (e.g. after recovery on another worker).
+    job = jobs.find_one_and_update(
+        {"job_id": job_id, "status": "queued", "cancel_requested": False},
+        {"$set": {"status": "running", "started_at": _now(), "heartbeat_at": _now(),
+                  "instance": settings.INSTANCE_ID, "pid": os.getpid()}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if not job:
+        return
+
+    files = [(f["path"], f.get("country_default")) for f in job["files"]]
+    try:
+        # Counting reads every CSV / opens every workbook: done here, not in the request
+        counts = [count_rows(path) for path, _ in files]
+        rows_total = None if None in counts else sum(counts)
+        jobs.update_one({"job_id": job_id}, {"$set": {"rows_total": rows_total}})
+        on_progress = _progress_callback(job_id, rows_total)
+        if job["kind"] == "vault":
+            summary = import_vault_files(files, workers=job.get("workers"), on_progress=on_progress)
+        else:
+            summary = import_user_files(files, job["user_id"], workers=job.get("workers"), on_progress=on_progress)
+        update = {"status": "completed", "summary": summary, "eta_seconds": 0, **summary}
+    except ImportCancelled as e:
+        update = {"status": "cancelled", "summary": e.summary, **e.summary}
+    except Exception as e:
+        print(f"❌ Import job {job_id} failed: {e}")
+        update = {"status": "failed", "error": str(e)}
+    finally:
+        for path, _ in files:
+            discard_upload(path)
+
+    update["finished_at"] = _now()
+    jobs.update_one({"job_id": job_id}, {"$set": update})
+
+def _interrupt(jobs, job: dict, still: dict):
+    """Mark a running job interrupted (if it still matches `still`) and discard its staged uploads."""
+    result = jobs.update_one(
+        {"job_id": job["job_id"], "status": "running", **still},
+        {"$set": {"status": "interrupted", "finished_at": _now()}},
+    )
+    if result.modified_count:
+        # Interrupted jobs are never resumed: a new upload starts a new job
+        for f in job.get("files", []):
+            discard_upload(f.get("path"))
+
+def recover_import_jobs():
+    """
+    Called at startup. Running jobs whose process is gone are marked interrupted
+    (their progress stays on the job): on this instance, any whose pid no longer
+    runs (or is ours: we have no jobs yet); elsewhere, any that stopped
+    heartbeating for STALE_AFTER. Their staged uploads are discarded.
+    Queued jobs are re-submitted.
+    """
+    jobs = get_import_jobs_collection()
+    for job in jobs.find({"status": "running", "instance": settings.INSTANCE_ID}, {"job_id": 1, "pid": 1, "files.path": 1}):
+        if job.get("pid") == os.getpid() or not _pid_alive(job.get("pid")):
+            _interrupt(jobs, job, {"pid": job.get("pid")})
+    stale = {"status": "running", "instance": {"$ne": settings.INSTANCE_ID}, "heartbeat_at": {"$lt": _now() - STALE_AFTER}}
+    for job in jobs.find(stale, {"job_id": 1, "files.path": 1}):
+        _interrupt(jobs, job, {"heartbeat_at": stale["heartbeat_at"]})
+    for job in jobs.find({"status": "queued"}, {"job_id": 1, "files.path": 1}):
+        if all(os.path.exists(f["path"]) for f in job["files"]):
+            _executor.submit(_run_job, job["job_id"])
+        else:
+            jobs.update_one(
+                {"job_id": job["job_id"], "status": "queued"},
+                {"$set": {"status": "failed", "error": "Upload file missing after restart", "finished_at": _now()}},
+            )
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+# Upper bounds (exclusive) for map_employee_size's buckets
+SIZE_BOUNDS = [50, 200, 500, 1000, 5000]
+SIZE_LABELS = ["1-50", "51-200", "201-500", "501-1000", "1001-5000", "5000+"]
+
+# Skip reasons, checked in this order; a row is counted under the first one it hits
+SKIP_REASONS = ["missing_name", "missing_email", "missing_company"]
+
+# Accepted source headers per field (matched case-insensitively, first hit wins)
+COLUMN_ALIASES = {
+    "first_name": ["First Name"],
+    "last_name": ["Last Name"],
+    "name": ["Full Name", "Name"],
+    "email": ["Email"],
+    "company": ["Company", "Company Name"],
+    "designation": ["Designation"],
+    "title": ["Title"],
+    "country": ["Country"],
+    "industry": ["Industry"],
+    "website": ["Website"],
+    "linkedin_url": ["Person Linkedin Url", "LinkedIn Url", "linkedin_url"],
+    "employees": ["# Employees", "Employees", "Employee Count"],
+}
+
+# Lower-cased set of every header the normalizer reads; readers use it for column projection
+SOURCE_COLUMNS = {name.lower() for names in COLUMN_ALIASES.values() for name in names}
+
+# A header must name a column of each group for its rows to be importable (see SKIP_REASONS)
+REQUIRED_COLUMN_GROUPS = (("first_name", "last_name", "name"), ("email",), ("company",))
+
+def has_required_columns(headers) -> bool:
+    """True when a header row names a name, an email and a company column."""
+    names = {str(h).strip().lower() for h in headers if h is not None}
+    return all(
+        any(alias.lower() in names for field in group for alias in COLUMN_ALIASES[field])
+        for group in REQUIRED_COLUMN_GROUPS
+    )
+
+NORMALIZED_COLUMNS = [
+    "full_name", "email", "company", "title", "country", "industry",
+    "website", "linkedin_url", "employee_count", "size",
+]
+
+def _find_column(df: pd.DataFrame, *names: str) -> str | None:
+    """Case-insensitive header lookup (Vault exports and user CSVs disagree on casing)."""
+    lookup = {str(c).strip().lower(): c for c in df.columns}
+    for name in names:
+        col = lookup.get(name.lower())
+        if col is not None:
+            return col
+    return None
+
+def _text(df: pd.DataFrame, *names: str) -> pd.Series:
+    """Stripped string column; missing column or NaN become ""."""
+    col = _find_column(df, *names)
+    if col is None:
+        return pd.Series("", index=df.index, dtype=object)
+    s = df[col]
+    return s.where(s.notna(), "").astype(str).str.strip()
+
+def _or_none(s: pd.Series) -> pd.Series:
+    # np.where: Series.where(..., None) on a string column fills NaN, not None
+    return pd.Series(np.where(s != "", s, None), index=s.index, dtype=object)
+
+def normalize_chunk(df: pd.DataFrame, country_default: str | None = None):
+    """
+    Column-wise normalization of one chunk of an import file.
+
+    Returns (normalized, skip_mask, skip_counts): `normalized` has
+    NORMALIZED_COLUMNS for every input row, `skip_mask` marks rows that can't
+    be imported and `skip_counts` counts them per SKIP_REASONS category.
+
+    `country_default` (the upload's country, or one guessed from its file name)
+    only fills rows whose country is blank; a row's own country always wins.
+    """
+    first = _text(df, *COLUMN_ALIASES["first_name"])
+    last = _text(df, *COLUMN_ALIASES["last_name"])
+    full_name = (first + " " + last).str.strip()
+    # Some exports carry a single name column instead of first/last
+    full_name = full_name.where(full_name != "", _text(df, *COLUMN_ALIASES["name"]))
+
+    email = _text(df, *COLUMN_ALIASES["email"])
+    company = _text(df, *COLUMN_ALIASES["company"])
+
+    designation = _text(df, *COLUMN_ALIASES["designation"])
+    title = designation.where(designation != "", _text(df, *COLUMN_ALIASES["title"]))
+
+    # The file's default country (e.g. India Vault exports have no Country column) fills blanks
+    # only, so a mixed-country file keeps each row's country
+    country = _text(df, *COLUMN_ALIASES["country"])
+    if country_default:
+        country = country.where(country != "", country_default)
+
+    employees_col = _find_column(df, *COLUMN_ALIASES["employees"])
+    if employees_col is not None:
+        employee_count = pd.to_numeric(df[employees_col], errors="coerce").to_numpy(dtype=float)
+    else:
+        employee_count = np.full(len(df), np.nan)
+    employee_count = np.floor(employee_count)
+
+    has_count = ~np.isnan(employee_count)
+    conditions = [has_count & (employee_count < bound) for bound in SIZE_BOUNDS]
+    conditions.append(has_count)
+    size = np.select(conditions, SIZE_LABELS, default=None)
+
+    normalized = pd.DataFrame({
+        "full_name": full_name,
+        "email": email,
+        "company": company,
+        "title": _or_none(title),
+        "country": _or_none(country),
+        "industry": _or_none(_text(df, *COLUMN_ALIASES["industry"])),
+        "website": _or_none(_text(df, *COLUMN_ALIASES["website"])),
+        "linkedin_url": _or_none(_text(df, *COLUMN_ALIASES["linkedin_url"])),
+        "employee_count": (
+            pd.Series(employee_count, index=df.index).astype("Int64").astype(object).where(has_count, None)
+        ),
+        "size": pd.Series(size, index=df.index, dtype=object),
+    }, index=df.index)
+
+    missing = [
+        (full_name == "").to_numpy(),
+        (email == "").to_numpy(),
+        (company == "").to_numpy(),
+    ]
+    reason = np.select(missing, SKIP_REASONS, default="")
+    skip_mask = reason != ""
+    skip_counts = {r: int(np.count_nonzero(reason == r)) for r in SKIP_REASONS}
+
+    return normalized, skip_mask, skip_counts
+
+def normalize_records(df: pd.DataFrame, country_default: str | None = None):
+    """normalize_chunk() reduced to the importable rows as plain dicts, plus skip counts."""
+    normalized, skip_mask, skip_counts = normalize_chunk(df, country_default)
+    return normalized[~skip_mask].to_dict("records"), skip_counts
@@ -0,0 +1,313 @@
+import csv
+import io
+import os
+import pandas as pd
+from openpyxl import load_workbook
+from app.services.import_normalizer import SOURCE_COLUMNS, has_required_columns
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; CSV falls back to pandas' C parser
+    pa = None
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Byte signatures checked before falling back to the file extension
+_MAGIC = [
+    (b"PAR1", "parquet"),
+    (b"ARROW1", "arrow"),
+    (b"\xff\xff\xff\xff", "arrow_stream"),
+    (b"PK\x03\x04", "xlsx"),
+    (b"\xd0\xcf\x11\xe0", "xls"),
+]
+
+_EXTENSIONS = {
+    ".csv": "csv",
+    ".txt": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+    ".arrows": "arrow_stream",
+    ".xlsx": "xlsx",
+    ".xlsm": "xlsx",
+    ".xls": "xls",
+}
+
+def detect_format(file_path: str) -> str:
+    """Identify an upload as csv / parquet / arrow / arrow_stream / xlsx / xls."""
+    with open(file_path, "rb") as f:
+        head = f.read(8)
+    for magic, fmt in _MAGIC:
+        if head.startswith(magic):
+            return fmt
+    ext = os.path.splitext(file_path)[1].lower()
+    return _EXTENSIONS.get(ext, "csv")
+
+def _wanted(name) -> bool:
+    return str(name).strip().lower() in SOURCE_COLUMNS
+
+def _projected(names) -> list[str]:
+    """Only the columns the normalizer reads; everything else is never decoded."""
+    return [n for n in names if _wanted(n)]
+
+def _header_names(header_row) -> list[str]:
+    """Name blank header cells the same way pandas does ("Unnamed: <i>")."""
+    names = []
+    for i, value in enumerate(header_row):
+        if value is None or (isinstance(value, str) and not value.strip()):
+            names.append(f"Unnamed: {i}")
+        else:
+            names.append(str(value).strip())
+    return names
+
+def _iter_sheet_chunks(ws, chunk_size: int):
+    rows = ws.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = _header_names(header)
+
+    buffer = []
+    for row in rows:
+        if row is None or all(v is None for v in row):
+            continue
+        row = tuple(row[:len(columns)])
+        if len(row) < len(columns):
+            row += (None,) * (len(columns) - len(row))
+        buffer.append(row)
+        if len(buffer) >= chunk_size:
+            yield pd.DataFrame.from_records(buffer, columns=columns)
+            buffer = []
+    if buffer:
+        yield pd.DataFrame.from_records(buffer, columns=columns)
+
+def _data_sheets(wb) -> list:
+    """
+    Worksheets holding import rows: every sheet whose header names a name, an
+    email and a company column (regional exports split their rows across
+    sheets), so notes or lookup sheets are left out. The first sheet when none
+    qualifies, so its rows are reported as skipped rather than silently ignored.
+    """
+    sheets = [
+        ws for ws in wb.worksheets
+        if has_required_columns(next(ws.iter_rows(max_row=1, values_only=True), ()))
+    ]
+    return sheets or wb.worksheets[:1]
+
+def _iter_xlsx_chunks(file_path: str, chunk_size: int, sheet: str | None = None):
+    """
+    Stream an .xlsx workbook with openpyxl's read-only mode: one sheet when
+    `sheet` is given, otherwise its data sheets in order (_data_sheets).
+    """
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheets = [wb[sheet]] if sheet else _data_sheets(wb)
+        for ws in sheets:
+            yield from _iter_sheet_chunks(ws, chunk_size)
+    finally:
+        wb.close()
+
+def _csv_header(file_path: str) -> list[str]:
+    with open(file_path, newline="", encoding="utf-8-sig") as f:
+        return next(csv.reader(f), [])
+
+def _csv_convert_options(header: list[str]):
+    # Every projected column is read as a string so type inference can't
+    # disagree between blocks (or between parallel byte ranges).
+    columns = _projected(header)
+    return pa_csv.ConvertOptions(
+        include_columns=columns,
+        column_types={c: pa.string() for c in columns},
+        strings_can_be_null=True,
+    )
+
+def _iter_csv_chunks(file_path: str, chunk_size: int):
+    if pa is None:
+        yield from pd.read_csv(file_path, chunksize=chunk_size, usecols=_wanted, dtype=str)
+        return
+
+    # Multi-threaded Arrow parser, streamed block by block
+    reader = pa_csv.open_csv(
+        file_path,
+        read_options=pa_csv.ReadOptions(block_size=16 << 20),
+        convert_options=_csv_convert_options(_csv_header(file_path)),
+    )
+    yield from _batches_to_chunks(reader, chunk_size)
+
+def _iter_csv_range_chunks(file_path: str, chunk_size: int, start: int, end: int):
+    """Parse one newline-aligned byte range of a CSV, re-using the file's header line."""
+    with open(file_path, "rb") as f:
+        header_line = f.readline()
+        f.seek(start)
+        data = header_line + f.read(end - start)
+
+    if pa is None:
+        yield from pd.read_csv(io.BytesIO(data), chunksize=chunk_size, usecols=_wanted, dtype=str, encoding="utf-8-sig")
+        return
+
+    table = pa_csv.read_csv(
+        io.BytesIO(data),
+        convert_options=_csv_convert_options(_csv_header(file_path)),
+    )
+    yield from _batches_to_chunks(table.to_batches(), chunk_size)
+
+def _iter_parquet_chunks(file_path: str, chunk_size: int):
+    pf = pq.ParquetFile(file_path, memory_map=True)
+    columns = _projected(pf.schema_arrow.names)
+    yield from _batches_to_chunks(pf.iter_batches(batch_size=chunk_size, columns=columns), chunk_size)
+
+def _iter_arrow_chunks(file_path: str, chunk_size: int, stream: bool):
+    with pa.memory_map(file_path, "r") as source:
+        if stream:
+            reader = pa.ipc.open_stream(source)
+            batches = iter(reader)
+        else:
+            reader = pa.ipc.open_file(source)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        columns = _projected(reader.schema.names)
+        yield from _batches_to_chunks((b.select(columns) for b in batches), chunk_size)
+
+def _batches_to_chunks(batches, chunk_size: int):
+    """Re-slice Arrow record batches into DataFrames of at most chunk_size rows."""
+    for batch in batches:
+        for start in range(0, batch.num_rows, chunk_size):
+            yield batch.slice(start, chunk_size).to_pandas()
+
+def iter_chunks(file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Yield the rows of an uploaded file as DataFrames of at most `chunk_size`
+    rows, so an import never holds the whole file in memory. CSV, Parquet and
+    Arrow IPC go through pyarrow (column-projected, memory-mapped where possible);
+    Excel through openpyxl's streaming reader.
+    """
+    fmt = detect_format(file_path)
+
+    if fmt in ("parquet", "arrow", "arrow_stream") and pa is None:
+        raise ValueError(f"Reading {fmt} files requires pyarrow")
+
+    if fmt == "csv":
+        yield from _iter_csv_chunks(file_path, chunk_size)
+    elif fmt == "parquet":
+        yield from _iter_parquet_chunks(file_path, chunk_size)
+    elif fmt == "arrow":
+        yield from _iter_arrow_chunks(file_path, chunk_size, stream=False)
+    elif fmt == "arrow_stream":
+        yield from _iter_arrow_chunks(file_path, chunk_size, stream=True)
+    elif fmt == "xls":
+        # Legacy binary workbooks have no streaming reader; parse once and slice.
+        df = pd.read_excel(file_path)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+    else:
+        yield from _iter_xlsx_chunks(file_path, chunk_size)
+
+# Smallest CSV byte range worth shipping to a separate process
+MIN_CSV_RANGE_BYTES = 8 << 20
+
+def _csv_ranges(file_path: str, parts: int) -> list[tuple[int, int]]:
+    """Split a CSV body into ~`parts` byte ranges that start and end on line boundaries."""
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as f:
+        f.readline()
+        body_start = f.tell()
+        parts = max(1, min(parts, (size - body_start) // MIN_CSV_RANGE_BYTES or 1))
+        step = (size - body_start) // parts
+
+        bounds = [body_start]
+        for i in range(1, parts):
+            f.seek(body_start + i * step)
+            f.readline()  # move to the start of the next full line
+            pos = f.tell()
+            if bounds[-1] < pos < size:
+                bounds.append(pos)
+        bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def plan_units(file_path: str, parts: int) -> list[dict]:
+    """
+    Split one upload into independently parseable work units for the parallel
+    importer: sheets of a workbook, newline-aligned byte ranges of a CSV,
+    row groups of a Parquet file or record batches of an Arrow file.
+
+    CSV splitting assumes one record per line (no line breaks inside quoted
+    values), which holds for Vault and CRM exports.
+
+    Sheets are not split further: openpyxl's read-only reader has to parse every
+    row before a range's start, so row ranges would re-parse the sheet once per
+    unit. A single-sheet workbook is one unit, parsed in a worker while the
+    writer stores the chunks it streams back.
+    """
+    fmt = detect_format(file_path)
+    if fmt == "xlsx":
+        wb = load_workbook(file_path, read_only=True)
+        try:
+            return [{"path": file_path, "format": fmt, "sheet": ws.title} for ws in _data_sheets(wb)]
+        finally:
+            wb.close()
+    if fmt == "csv":
+        return [{"path": file_path, "format": fmt, "range": r} for r in _csv_ranges(file_path, parts)]
+    if fmt == "parquet" and pa is not None:
+        groups = pq.ParquetFile(file_path).metadata.num_row_groups
+        return [{"path": file_path, "format": fmt, "row_groups": [g]} for g in range(groups)]
+    if fmt == "arrow" and pa is not None:
+        with pa.memory_map(file_path, "r") as source:
+            batches = pa.ipc.open_file(source).num_record_batches
+        per_unit = max(1, -(-batches // parts))
+        return [
+            {"path": file_path, "format": fmt, "batches": (i, min(i + per_unit, batches))}
+            for i in range(0, batches, per_unit)
+        ]
+    # Arrow streams and legacy .xls can't be split without reading them
+    return [{"path": file_path, "format": fmt}]
+
+def iter_unit_chunks(unit: dict, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Yield the DataFrame chunks of one work unit from plan_units()."""
+    path, fmt = unit["path"], unit["format"]
+    if fmt == "xlsx" and unit.get("sheet"):
+        yield from _iter_xlsx_chunks(path, chunk_size, sheet=unit["sheet"])
+    elif fmt == "csv" and unit.get("range"):
+        yield from _iter_csv_range_chunks(path, chunk_size, *unit["range"])
+    elif fmt == "parquet" and unit.get("row_groups") is not None:
+        pf = pq.ParquetFile(path, memory_map=True)
+        columns = _projected(pf.schema_arrow.names)
+        batches = pf.iter_batches(batch_size=chunk_size, row_groups=unit["row_groups"], columns=columns)
+        yield from _batches_to_chunks(batches, chunk_size)
+    elif fmt == "arrow" and unit.get("batches"):
+        start, stop = unit["batches"]
+        with pa.memory_map(path, "r") as source:
+            reader = pa.ipc.open_file(source)
+            columns = _projected(reader.schema.names)
+            batches = (reader.get_batch(i).select(columns) for i in range(start, stop))
+            yield from _batches_to_chunks(batches, chunk_size)
+    else:
+        yield from iter_chunks(path, chunk_size)
+
+def count_rows(file_path: str) -> int | None:
+    """Cheap data-row count used for progress/ETA. None if it can't be determined."""
+    try:
+        fmt = detect_format(file_path)
+        if fmt == "csv":
+            lines = 0
+            with open(file_path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    lines += block.count(b"\n")
+            return max(lines - 1, 0)
+        if fmt == "parquet" and pa is not None:
+            return pq.ParquetFile(file_path).metadata.num_rows
+        if fmt == "arrow" and pa is not None:
+            with pa.memory_map(file_path, "r") as source:
+                reader = pa.ipc.open_file(source)
+                return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+        if fmt != "xlsx":
+            return None
+        wb = load_workbook(file_path, read_only=True)
+        try:
+            return sum(max((ws.max_row or 0) - 1, 0) for ws in _data_sheets(wb))
+        finally:
+            wb.close()
+    except Exception:
+        return None
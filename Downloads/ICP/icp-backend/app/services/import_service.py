@@ -1,6 +1,24 @@
-import pandas as pd
+import multiprocessing
+import queue
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from typing import Callable
 from datetime import datetime, timezone
-from app.db.collections import get_company_collection, get_people_collection
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.db.collections import get_people_collection
+from app.db.owner import owner_of
+from app.services.import_reader import iter_chunks, plan_units, DEFAULT_CHUNK_SIZE
+from app.services.import_normalizer import normalize_records, SKIP_REASONS
+from app.services.import_worker import process_unit
+from app.services.company_resolver import CompanyResolver
+from app.services import company_names, prospect_view, search_cache, text_index
+from app.services.facet_service import apply_deltas, facet_deltas
+from app.services.search_fields import company_search_fields, person_search_fields
+from app.services.import_ids import company_id_for, person_id_for, row_fingerprint
 
 def map_employee_size(num_employees: int) -> str:
     """Convert numeric employee counts into size buckets."""
@@ -17,151 +35,349 @@ def map_employee_size(num_employees: int) -> str:
     else:
         return "5000+"
 
-def import_vault_excel(file_path: str, country_default: str = None):
-    """Import Vault India/USA data into MongoDB."""
-    companies = get_company_collection()
-    people = get_people_collection()
+def _company_doc(r: dict, user_id: str | None, source: str):
+    now = datetime.now(timezone.utc)
+    doc = {
+        "company_id": company_id_for(r["company"], user_id),
+        "name": r["company"],
+        "domain": None,
+        "industry": r["industry"],
+        "size": r["size"],
+        "employee_count": r["employee_count"],
+        "location": r["country"],
+        "website": r["website"],
+        "fetched_from": [source],
+        "user_id": user_id,
+        "owner": owner_of(user_id),
+        "created_at": now,
+        "updated_at": now,
+    }
+    doc.update(company_search_fields(doc))
+    return doc
+
+def _person_doc(r: dict, company_id: str, user_id: str | None):
+    now = datetime.now(timezone.utc)
+    doc = {
+        "person_id": person_id_for(r["email"], r["full_name"], user_id),
+        "full_name": r["full_name"],
+        "linkedin_url": r["linkedin_url"],
+        "emails": [{"value": r["email"]}],
+        "phones": [],
+        "employment": [{
+            "company_id": company_id,
+            "title": r["title"],
+        }],
+        "seniority": None,
+        "department": None,
+        "country": r["country"],
+        "user_id": user_id,
+        "owner": owner_of(user_id),
+        "created_at": now,
+        "updated_at": now,
+    }
+    doc.update(person_search_fields(doc, r["company"]))
+    doc["row_fingerprint"] = row_fingerprint(doc)
+    return doc
 
-    df = pd.read_excel(file_path)
-    people_added, companies_added, skipped = 0, 0, 0
+# Written only when a person is created: seniority/department may be set
+# explicitly (create_person, curated CRM data) and an import never knows them
+PERSON_INSERT_ONLY = ("created_at", "seniority", "department")
 
-    for _, row in df.iterrows():
-        try:
-            first = str(row.get("First Name", "")).strip()
-            last = str(row.get("Last Name", "")).strip()
-            full_name = f"{first} {last}".strip()
-            email = str(row.get("Email", "")).strip()
-            company_name = str(row.get("Company", "")).strip()
-
-            if not full_name or not email or not company_name:
-                skipped += 1
-                continue
-
-            # --- Company handling ---
-            company_filter = {"name": company_name, "user_id": None}
-            company_doc = companies.find_one(company_filter)
-            if not company_doc:
-                company_doc = {
-                    "company_id": str(hash(company_name)),  # simple unique ID
-                    "name": company_name,
-                    "domain": None,
-                    "industry": row.get("Industry"),
-                    "size": None,
-                    "location": country_default or row.get("Country"),
-                    "website": row.get("Website") if "Website" in row else None,
-                    "fetched_from": ["vault"],
-                    "user_id": None,
-                    "created_at": datetime.now(timezone.utc),
-                    "updated_at": datetime.now(timezone.utc),
-                }
-                # Employee size (USA file only)
-                if "# Employees" in row and pd.notna(row["# Employees"]):
-                    try:
-                        company_doc["size"] = map_employee_size(int(row["# Employees"]))
-                    except:
-                        pass
-                companies.insert_one(company_doc)
-                companies_added += 1
-
-            # --- People handling ---
-            person_doc = {
-                "person_id": str(hash(email + full_name)),
-                "full_name": full_name,
-                "linkedin_url": row.get("Person Linkedin Url") if "Person Linkedin Url" in row else None,
-                "emails": [{"value": email}],
-                "phones": [],
-                "employment": [{
-                    "company_id": company_doc["company_id"],
-                    "title": row.get("Designation") or row.get("Title"),
-                }],
-                "seniority": None,
-                "department": None,
-                "country": country_default or row.get("Country"),
-                "user_id": None,
-                "created_at": datetime.now(timezone.utc),
-                "updated_at": datetime.now(timezone.utc),
-            }
-            people.insert_one(person_doc)
-            people_added += 1
-
-        except Exception as e:
-            print(f"⚠️ Skipped row due to error: {e}")
-            skipped += 1
-
-    return {
-        "companies_added": companies_added,
-        "people_added": people_added,
-        "skipped": skipped,
+def _upsert_people(people, docs: list) -> tuple[dict, list, list]:
+    """
+    Idempotent write of a chunk of person documents keyed by person_id.
+    Rows whose stored fingerprint matches are skipped without a write.
+    Returns the counts, the documents that were written (inserted or updated)
+    and the stored versions of the updated ones (their facet fields), so
+    callers can move them out of their previous facet buckets.
+    """
+    counts = {"added": 0, "updated": 0, "unchanged": 0, "failed": 0}
+    if not docs:
+        return counts, [], []
+
+    # Last occurrence wins when a file repeats a person
+    by_id = {d["person_id"]: d for d in docs}
+    stored = {
+        p["person_id"]: p
+        for p in people.find(
+            {"person_id": {"$in": list(by_id)}},
+            {"_id": 0, "person_id": 1, "row_fingerprint": 1, "owner": 1, "user_id": 1, "title_department": 1},
+        )
     }
+    counts["unchanged"] = len(docs) - len(by_id)
 
-def import_user_excel(file_path: str, user_id: str, country_default: str = None):
-    """Import user-provided Excel data into MongoDB, tied to their user_id."""
-    companies = get_company_collection()
-    people = get_people_collection()
+    ops, op_docs = [], []
+    for person_id, doc in by_id.items():
+        if stored.get(person_id, {}).get("row_fingerprint") == doc["row_fingerprint"]:
+            counts["unchanged"] += 1
+            continue
+        fields = {k: v for k, v in doc.items() if k not in PERSON_INSERT_ONLY}
+        op_docs.append(doc)
+        ops.append(UpdateOne(
+            {"person_id": person_id},
+            {"$set": fields, "$setOnInsert": {k: doc[k] for k in PERSON_INSERT_ONLY}},
+            upsert=True,
+        ))
+    if not ops:
+        return counts, [], []
+
+    written = op_docs
+    try:
+        result = people.bulk_write(ops, ordered=False)
+        counts["added"] = result.upserted_count
+        counts["updated"] = result.modified_count
+    except BulkWriteError as e:
+        counts["failed"] = len(e.details.get("writeErrors", []))
+        counts["added"] = e.details.get("nUpserted", 0)
+        counts["updated"] = e.details.get("nModified", 0)
+        print(f"⚠️ Bulk upsert into {people.name} had {counts['failed']} failed rows")
+        failed = {err["index"] for err in e.details.get("writeErrors", [])}
+        written = [d for i, d in enumerate(op_docs) if i not in failed]
+
+    previous = [stored[d["person_id"]] for d in written if d["person_id"] in stored]
+    return counts, written, previous
+
+class ImportCancelled(Exception):
+    """Raised from a progress callback to stop an import between chunks."""
+
+    def __init__(self, summary: dict | None = None):
+        super().__init__("Import cancelled")
+        self.summary = summary or {}
 
-    df = pd.read_excel(file_path)
-    people_added, companies_added, skipped = 0, 0, 0
+# Per-stage wall time in the summary. In parallel mode parse/normalize are summed
+# across worker processes and wait_for_workers is time the writer sat idle.
+STAGES = [
+    "parse", "normalize", "wait_for_workers", "resolve_companies", "write_people",
+    "update_facets", "update_text_index", "update_company_names",
+    "update_prospects",
+]
 
-    for _, row in df.iterrows():
+class _ImportRun:
+    """Counters, company cache and stage timings shared by every chunk of one import."""
+
+    def __init__(self, user_id: str | None, source: str, on_progress: Callable[[dict], None] | None = None):
+        self.user_id = user_id
+        self.source = source
+        self.on_progress = on_progress
+        self.people = get_people_collection()
+        self.resolver = CompanyResolver(user_id)
+        self.started = time.perf_counter()
+        self.counts = {
+            "companies_added": 0,
+            "companies_updated": 0,
+            "people_added": 0,
+            "people_updated": 0,
+            "unchanged": 0,
+            "skipped": 0,
+        }
+        self.skip_reasons = {reason: 0 for reason in SKIP_REASONS + ["write_failed"]}
+        self.rows_processed = 0
+        self.timings = {stage: 0.0 for stage in STAGES}
+
+    @contextmanager
+    def stage(self, name: str):
+        t0 = time.perf_counter()
         try:
-            first = str(row.get("First Name", "")).strip()
-            last = str(row.get("Last Name", "")).strip()
-            full_name = f"{first} {last}".strip()
-            email = str(row.get("Email", "")).strip()
-            company_name = str(row.get("Company", "")).strip()
-
-            if not full_name or not email or not company_name:
-                skipped += 1
-                continue
-
-            # --- Company (private to user) ---
-            company_filter = {"name": company_name, "user_id": user_id}
-            company_doc = companies.find_one(company_filter)
-            if not company_doc:
-                company_doc = {
-                    "company_id": str(hash(company_name + user_id)),  # scoped to user
-                    "name": company_name,
-                    "domain": None,
-                    "industry": row.get("Industry"),
-                    "size": None,
-                    "location": country_default or row.get("Country"),
-                    "website": row.get("Website") if "Website" in row else None,
-                    "fetched_from": ["user-upload"],
-                    "user_id": user_id,
-                    "created_at": datetime.now(timezone.utc),
-                    "updated_at": datetime.now(timezone.utc),
-                }
-                companies.insert_one(company_doc)
-                companies_added += 1
-
-            # --- People (private to user) ---
-            person_doc = {
-                "person_id": str(hash(email + full_name + user_id)),
-                "full_name": full_name,
-                "linkedin_url": row.get("Person Linkedin Url") if "Person Linkedin Url" in row else None,
-                "emails": [{"value": email}],
-                "phones": [],
-                "employment": [{
-                    "company_id": company_doc["company_id"],
-                    "title": row.get("Designation") or row.get("Title"),
-                }],
-                "seniority": None,
-                "department": None,
-                "country": country_default or row.get("Country"),
-                "user_id": user_id,
-                "created_at": datetime.now(timezone.utc),
-                "updated_at": datetime.now(timezone.utc),
-            }
-            people.insert_one(person_doc)
-            people_added += 1
-
-        except Exception as e:
-            print(f"⚠️ Skipped row due to error: {e}")
-            skipped += 1
-
-    return {
-        "companies_added": companies_added,
-        "people_added": people_added,
-        "skipped": skipped,
-    }
+            yield
+        finally:
+            self.timings[name] += time.perf_counter() - t0
+
+    def summary(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        return {
+            **self.counts,
+            "skip_reasons": dict(self.skip_reasons),
+            "rows_processed": self.rows_processed,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_sec": round(self.rows_processed / elapsed, 1) if elapsed > 0 else None,
+            "timings": {stage: round(t, 3) for stage, t in self.timings.items()},
+        }
+
+    def write_chunk(self, rows: int, records: list[dict], skip_counts: dict):
+        """Resolve companies and upsert people for one normalized chunk, then report progress."""
+        self.rows_processed += rows
+        for reason, n in skip_counts.items():
+            self.skip_reasons[reason] += n
+            self.counts["skipped"] += n
+
+        # --- Company handling: one $in lookup + one bulk upsert per chunk (new and changed companies) ---
+        with self.stage("resolve_companies"):
+            first_by_company: dict[str, dict] = {}
+            for r in records:
+                if r["company"] not in self.resolver:
+                    first_by_company.setdefault(r["company"], r)
+            new_companies, updated_companies = self.resolver.resolve(
+                first_by_company,
+                lambda name: _company_doc(first_by_company[name], self.user_id, self.source),
+            )
+            self.counts["companies_added"] += len(new_companies)
+            self.counts["companies_updated"] += len(updated_companies)
+
+        # --- People handling ---
+        with self.stage("write_people"):
+            person_docs = [_person_doc(r, self.resolver.company_id(r["company"]), self.user_id) for r in records]
+            written, changed_people, previous_people = _upsert_people(self.people, person_docs)
+        self.counts["people_added"] += written["added"]
+        self.counts["people_updated"] += written["updated"]
+        self.counts["unchanged"] += written["unchanged"]
+        self.counts["skipped"] += written["failed"]
+        self.skip_reasons["write_failed"] += written["failed"]
+
+        # --- Facet counts: new records added, updated ones moved out of their old buckets ---
+        with self.stage("update_facets"):
+            apply_deltas(*facet_deltas(
+                new_companies + [c for c, _ in updated_companies], changed_people,
+                [prev for _, prev in updated_companies], previous_people,
+            ))
+
+        with self.stage("update_text_index"):
+            company_ids = {r["company"]: self.resolver.company_id(r["company"]) for r in records}
+            text_index.index_import_chunk(self.user_id, records, person_docs, company_ids)
+
+        with self.stage("update_company_names"):
+            company_names.index_companies(new_companies)
+
+        # --- Prospects read model for every written person (unchanged rows are already current) ---
+        with self.stage("update_prospects"):
+            prospect_view.sync_people(changed_people, {c["company_id"]: c for c in new_companies})
+            # ...and everyone employed at a company whose attributes changed
+            for company, _ in updated_companies:
+                prospect_view.sync_company(company)
+
+        self.report()
+
+    def report(self):
+        """Send the running summary to on_progress (the job heartbeat); may raise ImportCancelled."""
+        if self.on_progress:
+            try:
+                self.on_progress(self.summary())
+            except ImportCancelled as e:
+                e.summary = self.summary()
+                raise
+
+def _import_sequential(run: _ImportRun, file_path: str, country_default: str | None, chunk_size: int):
+    chunks = iter_chunks(file_path, chunk_size)
+    while True:
+        with run.stage("parse"):
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        # --- Column-wise normalization + skip mask for the whole chunk ---
+        with run.stage("normalize"):
+            records, skip_counts = normalize_records(chunk, country_default)
+        run.write_chunk(len(chunk), records, skip_counts)
+
+# While the writer waits on a worker it still reports progress this often,
+# so a slow unit keeps the job's heartbeat fresh and cancellation responsive
+HEARTBEAT_SECONDS = 30
+# Normalized chunks each worker may hold ahead of the writer
+CHUNKS_AHEAD = 2
+
+def _next_chunk(chunks, future, run: _ImportRun):
+    """Next chunk a worker put on its queue (None once its unit is done)."""
+    poll = min(1.0, HEARTBEAT_SECONDS)
+    last_report = time.monotonic()
+    while True:
+        try:
+            return chunks.get(timeout=poll)
+        except queue.Empty:
+            if future.done():
+                future.result()  # the worker failed before finishing its unit: re-raise
+            if time.monotonic() - last_report >= HEARTBEAT_SECONDS:
+                run.report()
+                last_report = time.monotonic()
+
+def _import_parallel(run: _ImportRun, files: list[tuple[str, str | None]], workers: int, chunk_size: int):
+    """
+    Parse + normalize work units (sheets, CSV byte ranges, row groups) in a
+    process pool while this thread is the single writer. Workers stream each
+    unit's chunks back through a bounded queue and units are written in
+    submission order, so memory is bounded by chunk size, not unit size.
+    """
+    units = [
+        (unit, country_default)
+        for path, country_default in files
+        for unit in plan_units(path, parts=workers * 2)
+    ]
+    # spawn: the API process is threaded and holds a Mongo client, neither survives fork safely
+    ctx = multiprocessing.get_context("spawn")
+    # The manager exits first, so a worker blocked on a full queue fails instead of hanging shutdown
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool, ctx.Manager() as manager:
+        def submit(unit, country_default):
+            chunks = manager.Queue(maxsize=CHUNKS_AHEAD)
+            return pool.submit(process_unit, unit, country_default, chunk_size, chunks), chunks
+
+        pending = deque()
+        next_unit = iter(units)
+        try:
+            for unit, country_default in islice(next_unit, workers * 2):
+                pending.append(submit(unit, country_default))
+            while pending:
+                future, chunks = pending.popleft()
+                for unit, country_default in islice(next_unit, 1):
+                    pending.append(submit(unit, country_default))
+
+                while True:
+                    with run.stage("wait_for_workers"):
+                        chunk = _next_chunk(chunks, future, run)
+                    if chunk is None:
+                        break
+                    run.write_chunk(chunk["rows"], chunk["records"], chunk["skip_counts"])
+
+                result = future.result()
+                run.timings["parse"] += result["parse_seconds"]
+                run.timings["normalize"] += result["normalize_seconds"]
+        except BaseException:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+def _run_import(
+    files: list[tuple[str, str | None]],
+    user_id: str | None,
+    source: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_progress: Callable[[dict], None] | None = None,
+    workers: int | None = None,
+):
+    """
+    Import one or more (file_path, country_default) files. Each file is streamed
+    chunk by chunk: normalized column-wise, its companies resolved in bulk and its
+    people upserted by their content-derived person_id, so re-imports are idempotent.
+
+    With `workers` > 1, parsing and normalization run in a process pool
+    (see _import_parallel); writes always happen in this thread, in order.
+
+    `on_progress` is called with the running summary after every chunk; it
+    may raise ImportCancelled to stop the import.
+    """
+    run = _ImportRun(user_id, source, on_progress)
+    try:
+        if workers and workers > 1:
+            _import_parallel(run, files, workers, chunk_size)
+        else:
+            for file_path, country_default in files:
+                _import_sequential(run, file_path, country_default, chunk_size)
+    finally:
+        # Cancelled/failed runs may have written some chunks too
+        search_cache.bump_data_version(user_id)
+        # People indexed earlier carry their employer's old tokens: let the scope reload
+        if not run.counts["companies_updated"]:
+            text_index.mark_current(user_id)
+        company_names.mark_current(user_id)
+    return run.summary()
+
+def import_vault_files(files: list[tuple[str, str | None]], workers: int | None = None, on_progress=None):
+    """Import several Vault files (e.g. India + USA) as one run, optionally in parallel."""
+    return _run_import(files, None, "vault", on_progress=on_progress, workers=workers)
+
+def import_vault_excel(file_path: str, country_default: str = None, on_progress=None):
+    """Import Vault India/USA data into MongoDB."""
+    return _run_import([(file_path, country_default)], None, "vault", on_progress=on_progress)
+
+def import_user_excel(file_path: str, user_id: str, country_default: str = None, on_progress=None):
+    """Import user-provided Excel data into MongoDB, tied to their user_id."""
+    return _run_import([(file_path, country_default)], user_id, "user-upload", on_progress=on_progress)
 
+def import_user_files(files: list[tuple[str, str | None]], user_id: str, workers: int | None = None, on_progress=None):
+    """Import several user files as one run, tied to their user_id."""
+    return _run_import(files, user_id, "user-upload", on_progress=on_progress, workers=workers)
@@ -0,0 +1,29 @@
+import time
+from app.services.import_reader import iter_unit_chunks, DEFAULT_CHUNK_SIZE
+from app.services.import_normalizer import normalize_records
+
+# Runs inside ProcessPoolExecutor workers: keep this module free of DB imports
+# so spawned processes start fast and never open a Mongo connection.
+
+def process_unit(unit: dict, country_default: str | None, chunk_size: int, out) -> dict:
+    """
+    Parse and normalize one work unit, putting each chunk on `out` as soon as it
+    is ready, then None. `out` is a bounded queue, so a worker only runs a few
+    chunks ahead of the writer whatever the unit's size. Returns stage timings.
+    """
+    parse_seconds = normalize_seconds = 0.0
+
+    reader = iter_unit_chunks(unit, chunk_size or DEFAULT_CHUNK_SIZE)
+    while True:
+        t0 = time.perf_counter()
+        df = next(reader, None)
+        t1 = time.perf_counter()
+        parse_seconds += t1 - t0
+        if df is None:
+            break
+        records, skip_counts = normalize_records(df, country_default)
+        normalize_seconds += time.perf_counter() - t1
+        out.put({"rows": len(df), "records": records, "skip_counts": skip_counts})
+
+    out.put(None)
+    return {"parse_seconds": parse_seconds, "normalize_seconds": normalize_seconds}
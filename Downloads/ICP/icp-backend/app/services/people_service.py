@@ -1,10 +1,27 @@
 from bson import ObjectId
-from app.db.collections import get_people_collection
+from app.db.owner import owner_of
+from app.services import prospect_view, search_cache
+from app.services.search_fields import person_search_fields
+from app.db.collections import get_company_collection, get_people_collection
 from app.models.people import People
 
+def _company_name(doc: dict):
+    """Name of the person's current company (employment[0]), if it exists."""
+    if not doc.get("employment"):
+        return None
+    company = get_company_collection().find_one(
+        {"company_id": doc["employment"][0]["company_id"]}, {"_id": 0, "name": 1}
+    )
+    return company.get("name") if company else None
+
 def create_person(person: People) -> str:
     people = get_people_collection()
-    result = people.insert_one(person.dict(by_alias=True))
+    doc = person.dict(by_alias=True)
+    doc["owner"] = owner_of(doc.get("user_id"))
+    doc.update(person_search_fields(doc, _company_name(doc)))
+    result = people.insert_one(doc)
+    prospect_view.sync_people([doc])
+    search_cache.bump_data_version(doc.get("user_id"))
     return str(result.inserted_id)
 
 def get_person_by_id(person_id: str):
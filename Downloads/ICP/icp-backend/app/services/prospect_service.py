@@ -1,6 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 from app.db.collections import get_prospect_lists_collection
+from app.db.async_collections import get_async_prospect_lists_collection
 
 def save_prospect_list(user_id: str, conversation_id: str, icp_data: dict, results: dict):
     """Save fetched prospects linked to a conversation + user."""
@@ -27,6 +28,40 @@ def get_prospect_list(prospect_list_id: str, user_id: str):
         "user_id": user_id
     })
 
+# The list view only shows which searches were saved; results come from get_prospect_list()
+PROSPECT_LIST_SUMMARY_FIELDS = {
+    "prospect_list_id": 1, "user_id": 1, "conversation_id": 1, "icp_filters": 1, "created_at": 1,
+}
+
 def list_prospect_lists(user_id: str):
     coll = get_prospect_lists_collection()
-    return list(coll.find({"user_id": user_id}).sort("created_at", -1))
+    return list(coll.find({"user_id": user_id}, PROSPECT_LIST_SUMMARY_FIELDS).sort("created_at", -1))
+
+# ======================= Async (Motor) =======================
+
+async def save_prospect_list_async(user_id: str, conversation_id: str, icp_data: dict, results: dict):
+    """Save fetched prospects linked to a conversation + user."""
+    coll = get_async_prospect_lists_collection()
+    doc = {
+        "prospect_list_id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "conversation_id": conversation_id,
+        "icp_filters": icp_data,
+        "results": results,
+        "created_at": datetime.now(timezone.utc)
+    }
+
+    await coll.insert_one(doc)
+    return doc
+
+async def get_prospect_list_async(prospect_list_id: str, user_id: str):
+    coll = get_async_prospect_lists_collection()
+    return await coll.find_one({
+        "prospect_list_id": prospect_list_id,
+        "user_id": user_id
+    })
+
+async def list_prospect_lists_async(user_id: str):
+    coll = get_async_prospect_lists_collection()
+    cursor = coll.find({"user_id": user_id}, PROSPECT_LIST_SUMMARY_FIELDS).sort("created_at", -1)
+    return await cursor.to_list(length=None)
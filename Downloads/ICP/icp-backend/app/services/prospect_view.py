@@ -0,0 +1,154 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+from pymongo import DeleteMany, UpdateOne
+from app.db.collections import get_company_collection, get_people_collection, get_prospects_collection
+from app.db.owner import owner_of
+from app.services.role_index import title_roles
+from app.services.search_fields import company_search_fields, title_tokens
+
+# Materialized read model behind search_icp(mode="prospects"): one document per
+# person-at-company (prospect_id = "<person_id>:<company_id>") carrying the
+# person's contact fields, the job's canonical title fields and the employer's
+# flattened industry / geography / size fields, under the same names the
+# search filters use on companies and people. A search is then one indexed
+# find() on `prospects`, with no join.
+#
+# Kept current by import_service (every written person), people_service.create_person
+# and company_service.create_company; scripts/rebuild_prospects.py rebuilds it.
+
+BATCH = 1000
+
+# Company fields a prospect flattens
+COMPANY_FIELDS = {
+    "_id": 0, "company_id": 1, "name": 1, "Company": 1, "industry": 1, "Industry": 1,
+    "location": 1, "country": 1, "Country": 1, "size": 1, "employee_count": 1,
+}
+
+def _first_email(p: Dict[str, Any]) -> Optional[str]:
+    emails = p.get("emails")
+    if isinstance(emails, list) and emails:
+        first = emails[0]
+        return first.get("value") if isinstance(first, dict) else str(first)
+    return p.get("Email") or p.get("email")
+
+def _epoch(value: Any) -> Optional[float]:
+    """Epoch seconds for the relevance model's recency feature (Mongo returns naive UTC)."""
+    if not isinstance(value, datetime):
+        return None
+    return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp()
+
+def _company_part(c: Dict[str, Any]) -> Dict[str, Any]:
+    fields = company_search_fields(c)
+    count = c.get("employee_count")
+    return {
+        "company_id": c["company_id"],
+        "company_name": c.get("name") or c.get("Company"),
+        "industry": c.get("industry") or c.get("Industry"),
+        "location": c.get("location") or c.get("country") or c.get("Country"),
+        "size": c.get("size"),
+        "employee_count": count if isinstance(count, (int, float)) and not isinstance(count, bool) else None,
+        "industry_norm": fields["industry_norm"],
+        "country_norm": fields["country_norm"],
+        "country_code": fields["country_code"],
+        "subdivision_code": fields["subdivision_code"],
+    }
+
+def _jobs(person: Dict[str, Any]) -> List[Dict[str, Any]]:
+    jobs = person.get("employment")
+    if isinstance(jobs, dict):
+        jobs = [jobs]
+    return [j for j in jobs if isinstance(j, dict)] if isinstance(jobs, list) else []
+
+def prospect_docs(person: Dict[str, Any], companies: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Prospect documents for one person: one per job whose company is in `companies`."""
+    docs = []
+    for job in _jobs(person):
+        company = companies.get(job.get("company_id"))
+        if company is None:
+            continue
+        title = job.get("title") or job.get("Designation") or job.get("Title")
+        docs.append({
+            "prospect_id": f"{person['person_id']}:{company['company_id']}",
+            "person_id": person["person_id"],
+            "owner": person.get("owner") or owner_of(person.get("user_id")),
+            "full_name": person.get("full_name"),
+            "email": _first_email(person),
+            "linkedin_url": person.get("linkedin_url"),
+            "updated_at": person.get("updated_at"),
+            "updated_ts": _epoch(person.get("updated_at")),
+            "title": title,
+            "title_tokens": title_tokens(title),
+            **title_roles(title),
+            **_company_part(company),
+        })
+    return docs
+
+def _load_companies(company_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    ids = [i for i in set(company_ids) if i]
+    if not ids:
+        return {}
+    return {c["company_id"]: c for c in get_company_collection().find({"company_id": {"$in": ids}}, COMPANY_FIELDS)}
+
+def sync_people(people: List[Dict[str, Any]], companies: Optional[Dict[str, Dict[str, Any]]] = None,
+                stamp: Optional[datetime] = None):
+    """
+    Upsert the prospects of these person documents and drop the ones for jobs
+    they no longer hold. `companies` (company_id -> document) saves lookups;
+    missing employers are fetched with one $in query. Each written prospect
+    gets `synced_at` (default now) so a rebuild can tell what it didn't touch.
+    """
+    people = [p for p in people if p.get("person_id")]
+    if not people:
+        return
+    companies = dict(companies or {})
+    wanted = {job.get("company_id") for p in people for job in _jobs(p)}
+    companies.update(_load_companies(wanted - set(companies)))
+    stamp = stamp or datetime.now(timezone.utc)
+
+    ops, keep = [], []
+    for p in people:
+        for doc in prospect_docs(p, companies):
+            keep.append(doc["prospect_id"])
+            ops.append(UpdateOne({"prospect_id": doc["prospect_id"]}, {"$set": {**doc, "synced_at": stamp}}, upsert=True))
+    ops.append(DeleteMany({"person_id": {"$in": [p["person_id"] for p in people]}, "prospect_id": {"$nin": keep}}))
+    get_prospects_collection().bulk_write(ops, ordered=False)
+
+def sync_company(company: Dict[str, Any]):
+    """Re-flatten a company into the prospects of everyone employed there."""
+    if not company.get("company_id"):
+        return
+    batch: List[Dict[str, Any]] = []
+    for p in get_people_collection().find({"employment.company_id": company["company_id"]}, batch_size=BATCH):
+        batch.append(p)
+        if len(batch) >= BATCH:
+            sync_people(batch, {company["company_id"]: company})
+            batch = []
+    sync_people(batch, {company["company_id"]: company})
+
+def rebuild_prospects() -> int:
+    """Rebuild every prospect from companies and people (full scan). Returns the number of prospects."""
+    stamp = datetime.now(timezone.utc)
+    companies = {
+        c["company_id"]: c
+        for c in get_company_collection().find({"company_id": {"$exists": True}}, COMPANY_FIELDS, batch_size=BATCH)
+    }
+    batch: List[Dict[str, Any]] = []
+    people = get_people_collection().find(
+        {"person_id": {"$exists": True}},
+        {"_id": 0, "person_id": 1, "owner": 1, "user_id": 1, "full_name": 1, "emails": 1, "Email": 1, "email": 1,
+         "linkedin_url": 1, "employment": 1, "updated_at": 1},
+        batch_size=BATCH,
+    )
+    for p in people:
+        batch.append(p)
+        if len(batch) >= BATCH:
+            sync_people(batch, companies, stamp)
+            batch = []
+    sync_people(batch, companies, stamp)
+
+    prospects = get_prospects_collection()
+    # Prospects written by imports during the rebuild carry a later stamp and survive
+    stale = prospects.delete_many({"$or": [{"synced_at": {"$lt": stamp}}, {"synced_at": None}]}).deleted_count
+    total = prospects.count_documents({})
+    print(f"✅ Prospects rebuilt: {total} ({stale} stale removed)")
+    return total
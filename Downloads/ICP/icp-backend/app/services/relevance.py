@@ -0,0 +1,154 @@
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from app.core.config import settings
+from app.services.role_index import SENIORITY, role_exact_ids, role_query_ids
+from app.services.search_fields import size_range, title_tokens
+
+# Weighted relevance model behind search_icp(mode="scored"). Each candidate
+# prospect gets a row of features in [0, 1]; the score is their weighted sum
+# and the top k are picked with argpartition (no full sort of the pool).
+#
+#   role        how well the job matches a requested role (exact role id 1.0,
+#               same family or seniority 0.5, title words matched pro rata)
+#               e.g. "Software Engineer": ic:engineering 1.0, senior:engineering 0.5
+#   seniority   rank of the job's seniority (founder/c-level 1.0 ... entry 0.1)
+#   size_fit    1.0 inside the requested employee range, decaying with the
+#               log-distance outside it; 0.5 when no range was requested
+#   complete    share of contact fields present (email, LinkedIn)
+#   recency     exp(-age / RECENCY_DAYS) of the record's last update
+
+FEATURES = ("role", "seniority", "size_fit", "complete", "recency")
+DEFAULT_WEIGHTS: Dict[str, float] = {"role": 3.0, "seniority": 1.0, "size_fit": 1.5, "complete": 1.0, "recency": 0.5}
+RECENCY_DAYS = 365.0
+
+_SENIORITY_LEVEL: Dict[str, float] = {label: rank / 9 for rank, label in SENIORITY.values()}
+_SENIORITY_LEVEL["ic"] = _SENIORITY_LEVEL["entry"] = 0.1
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """"role=4,recency=0" -> weights over DEFAULT_WEIGHTS; unknown names are an error."""
+    weights = dict(DEFAULT_WEIGHTS)
+    for part in filter(None, (p.strip() for p in (spec or "").split(","))):
+        name, _, value = part.partition("=")
+        if name.strip() not in weights:
+            raise ValueError(f"Unknown relevance feature '{name.strip()}' (expected one of {', '.join(FEATURES)})")
+        weights[name.strip()] = float(value)
+    return weights
+
+WEIGHTS = parse_weights(settings.SEARCH_SCORE_WEIGHTS)
+
+# ======================= Features =======================
+
+def _role_feature(candidates: List[Dict[str, Any]], roles: Sequence[str]) -> np.ndarray:
+    wanted_ids, wanted_parts, wanted_tokens = set(), set(), []
+    for role in roles:
+        ids = role_query_ids(role)
+        if ids:
+            exact = role_exact_ids(role)
+            wanted_ids.update(exact)
+            wanted_parts.update(part for i in exact for part in i.split(":"))
+        elif title_tokens(role):
+            wanted_tokens.append(set(title_tokens(role)))
+    if not (wanted_ids or wanted_tokens):
+        return np.zeros(len(candidates), dtype=np.float32)
+
+    def strength(ids: Sequence[str], toks: Sequence[str]) -> float:
+        if wanted_ids.intersection(ids):
+            return 1.0
+        if wanted_parts.intersection(ids):
+            return 0.5
+        if wanted_tokens:
+            return max(len(w.intersection(toks)) / len(w) for w in wanted_tokens)
+        return 0.0
+
+    # role_ids / title_tokens are derived from the title, and a pool has few
+    # distinct titles: score each title once
+    memo: Dict[Any, float] = {}
+
+    def lookup(c: Dict[str, Any]) -> float:
+        v = memo.get(c.get("title"))
+        if v is None:
+            v = memo[c.get("title")] = strength(c.get("role_ids") or (), c.get("title_tokens") or ())
+        return v
+
+    return np.fromiter((lookup(c) for c in candidates), dtype=np.float32, count=len(candidates))
+
+def _size_feature(counts: np.ndarray, size: Any) -> np.ndarray:
+    rng = size if isinstance(size, dict) else size_range(size)
+    if not rng:
+        return np.full(len(counts), 0.5, dtype=np.float32)
+    lo = rng.get("min", rng.get("gte"))
+    hi = rng.get("max", rng.get("lte"))
+    logs = np.log10(np.maximum(counts, 1))
+    below = np.maximum(math.log10(max(lo, 1)) - logs, 0) if lo is not None else 0
+    above = np.maximum(logs - math.log10(max(hi, 1)), 0) if hi is not None else 0
+    fit = np.exp(-2.0 * (below + above))
+    # Unknown head count: neither rewarded nor excluded
+    return np.where(np.isnan(counts), 0.25, fit).astype(np.float32)
+
+def _numbers(candidates: List[Dict[str, Any]], field: str) -> np.ndarray:
+    """Numeric column; missing or non-numeric values become NaN."""
+    return np.array(
+        [v if type(v) in (int, float) else np.nan for v in (c.get(field) for c in candidates)], dtype=np.float64,
+    )
+
+def features(candidates: List[Dict[str, Any]], icp_filters: dict,
+             now: Optional[datetime] = None) -> Dict[str, np.ndarray]:
+    """Feature arrays (one value per candidate) for a list of prospect rows."""
+    now = now or datetime.now(timezone.utc)
+    roles = icp_filters.get("roles") or []
+    roles = [roles] if isinstance(roles, str) else [r for r in roles if isinstance(r, str)]
+
+    # updated_ts is epoch seconds (prospect_view); unknown age scores like a year-old record
+    ages = (now.timestamp() - _numbers(candidates, "updated_ts")) / 86400
+    ages = np.where(np.isnan(ages), RECENCY_DAYS, np.maximum(ages, 0))
+    return {
+        "role": _role_feature(candidates, roles),
+        "seniority": np.array([_SENIORITY_LEVEL.get(c.get("seniority"), 0.0) for c in candidates], dtype=np.float32),
+        "size_fit": _size_feature(_numbers(candidates, "employee_count"), icp_filters.get("company_size")),
+        "complete": np.array(
+            [(bool(c.get("email")) + bool(c.get("linkedin_url"))) / 2 for c in candidates], dtype=np.float32,
+        ),
+        "recency": np.exp(-ages / RECENCY_DAYS).astype(np.float32),
+    }
+
+# ======================= Scoring =======================
+
+def score(feats: Dict[str, np.ndarray], weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+    weights = weights or WEIGHTS
+    n = len(next(iter(feats.values()))) if feats else 0
+    total = np.zeros(n, dtype=np.float32)
+    for name in FEATURES:
+        w = weights.get(name, 0.0)
+        if w:
+            total += np.float32(w) * feats[name]
+    return total
+
+def top_k(scores: np.ndarray, k: int) -> List[int]:
+    """Indices of the k highest scores, best first (ties keep candidate order)."""
+    if k <= 0 or not len(scores):
+        return []
+    if len(scores) > k:
+        idx = np.argpartition(-scores, k - 1)[:k]
+    else:
+        idx = np.arange(len(scores))
+    return idx[np.lexsort((idx, -scores[idx]))].tolist()
+
+def top_groups(scores: np.ndarray, keys: List[Any], k: int) -> List[Tuple[int, float]]:
+    """
+    The k best groups of candidates sharing a key (e.g. employees of one
+    company), scored by their best member: (index of that member, group score).
+    """
+    out: List[Tuple[int, float]] = []
+    if k <= 0 or not len(scores):
+        return out
+    seen = set()
+    # Walk candidates best-first; the first member seen of each group is its best
+    for i in np.argsort(-scores, kind="stable").tolist():
+        if keys[i] not in seen:
+            seen.add(keys[i])
+            out.append((i, float(scores[i])))
+            if len(out) >= k:
+                break
+    return out
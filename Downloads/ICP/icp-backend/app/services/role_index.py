@@ -0,0 +1,198 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# Title normalization: job titles are tokenized, abbreviations and multi-word
+# synonyms are folded into canonical tokens ("Vice President" -> vp,
+# "Chief Technology Officer" -> cto), and the result is mapped to a seniority
+# and a role family (job function). Import stores the derived role ids on each
+# person (people.role_ids, indexed); search turns the LLM's roles into the same
+# ids, so matching is an indexed $in instead of per-word regexes.
+#
+# Role ids:  "<family>"              e.g. "sales"
+#            "<seniority>"           e.g. "vp"
+#            "<seniority>:<family>"  e.g. "vp:sales"
+#            c-level acronyms        e.g. "cto"
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Multi-word synonyms, matched longest first
+PHRASES: Dict[Tuple[str, ...], str] = {
+    ("chief", "executive", "officer"): "ceo",
+    ("chief", "technology", "officer"): "cto",
+    ("chief", "technical", "officer"): "cto",
+    ("chief", "financial", "officer"): "cfo",
+    ("chief", "finance", "officer"): "cfo",
+    ("chief", "operating", "officer"): "coo",
+    ("chief", "operations", "officer"): "coo",
+    ("chief", "marketing", "officer"): "cmo",
+    ("chief", "revenue", "officer"): "cro",
+    ("chief", "product", "officer"): "cpo",
+    ("chief", "information", "officer"): "cio",
+    ("chief", "information", "security", "officer"): "ciso",
+    ("chief", "data", "officer"): "cdo",
+    ("chief", "human", "resources", "officer"): "chro",
+    ("chief", "people", "officer"): "chro",
+    ("senior", "vice", "president"): "vp",
+    ("executive", "vice", "president"): "vp",
+    ("vice", "president"): "vp",
+    ("managing", "director"): "md",
+    ("general", "manager"): "manager",
+    ("co", "founder"): "founder",
+    ("human", "resources"): "hr",
+    ("business", "development"): "bizdev",
+    ("account", "executive"): "ae",
+    ("account", "manager"): "am",
+    ("talent", "acquisition"): "recruiting",
+    ("machine", "learning"): "ml",
+}
+
+# Single-token synonyms / abbreviations
+SYNONYMS: Dict[str, str] = {
+    "svp": "vp", "evp": "vp", "avp": "vp", "vicepresident": "vp",
+    "sr": "senior", "snr": "senior", "jr": "junior",
+    "mgr": "manager", "gm": "manager", "cofounder": "founder",
+    "eng": "engineering", "engg": "engineering", "dev": "developer", "swe": "engineer",
+    "mktg": "marketing", "ops": "operations", "acct": "accounting",
+    "leader": "lead", "chairman": "president", "chairperson": "president",
+}
+
+# c-level acronym -> family it implies (president and md are c-level titles with
+# their own id, so "President" doesn't match every chief officer)
+C_LEVEL: Dict[str, str] = {
+    "ceo": "executive", "cto": "engineering", "cfo": "finance", "coo": "operations",
+    "cmo": "marketing", "cro": "sales", "cpo": "product", "cio": "engineering",
+    "ciso": "engineering", "cdo": "data", "chro": "hr",
+    "president": "executive", "md": "executive",
+}
+
+# Highest rank wins when a title has several seniority tokens
+SENIORITY: Dict[str, Tuple[int, str]] = {
+    "founder": (9, "founder"), "owner": (9, "founder"),
+    "president": (8, "c_level"), "chief": (8, "c_level"), "md": (8, "c_level"),
+    "vp": (7, "vp"),
+    "head": (6, "head"),
+    "director": (5, "director"),
+    "manager": (4, "manager"), "am": (4, "manager"),
+    "lead": (3, "lead"), "principal": (3, "lead"),
+    "senior": (2, "senior"),
+    "junior": (1, "entry"), "intern": (1, "entry"), "trainee": (1, "entry"), "associate": (1, "entry"),
+}
+# Role nouns mark an individual contributor when no other seniority is present
+# ("Software Engineer" is ic:engineering, "Engineering" alone is the whole family)
+IC_NOUNS = {
+    "engineer", "developer", "architect", "analyst", "scientist", "designer", "accountant",
+    "recruiter", "specialist", "representative", "consultant", "ae", "sdr", "bdr", "administrator",
+}
+
+# token -> role family; first family token in the title wins
+FAMILIES: Dict[str, Tuple[str, ...]] = {
+    "engineering": ("engineering", "engineer", "developer", "architect", "devops", "software",
+                    "technology", "technical", "it", "security", "infrastructure", "ml"),
+    "executive": ("founder", "owner", "president", "md"),
+    "sales": ("sales", "bizdev", "ae", "am", "sdr", "bdr", "revenue"),
+    "marketing": ("marketing", "brand", "growth", "content", "demand", "communications"),
+    "product": ("product", "design", "designer", "ux"),
+    "finance": ("finance", "financial", "accounting", "accountant", "controller", "treasury"),
+    "hr": ("hr", "talent", "recruiter", "recruiting", "people"),
+    "operations": ("operations", "supply", "logistics", "procurement"),
+    "data": ("data", "analytics", "analyst", "scientist", "bi"),
+}
+_FAMILY_BY_TOKEN = {tok: family for family, toks in FAMILIES.items() for tok in toks}
+_MAX_PHRASE = max(len(p) for p in PHRASES)
+
+def canonical_tokens(title: Any) -> List[str]:
+    """Lower-case tokens of a title with synonyms and abbreviations folded."""
+    if title is None:
+        return []
+    words = _TOKEN.findall(str(title).casefold())
+    out: List[str] = []
+    i = 0
+    while i < len(words):
+        for n in range(min(_MAX_PHRASE, len(words) - i), 1, -1):
+            canon = PHRASES.get(tuple(words[i:i + n]))
+            if canon:
+                out.append(canon)
+                i += n
+                break
+        else:
+            out.append(SYNONYMS.get(words[i], words[i]))
+            i += 1
+    return out
+
+def classify(tokens: List[str]) -> Tuple[Optional[str], Optional[str], List[str]]:
+    """(seniority, family, c-level acronyms) of canonical title tokens."""
+    acronyms = [t for t in tokens if t in C_LEVEL]
+    rank, seniority = 0, None
+    for t in tokens:
+        r = SENIORITY.get(t)
+        if r and r[0] > rank:
+            rank, seniority = r
+    if acronyms and rank < 8:
+        seniority = "c_level"
+    if seniority is None and any(t in IC_NOUNS for t in tokens):
+        seniority = "ic"
+
+    family = C_LEVEL[acronyms[0]] if acronyms else None
+    if family is None:
+        family = next((_FAMILY_BY_TOKEN[t] for t in tokens if t in _FAMILY_BY_TOKEN), None)
+    return seniority, family, acronyms
+
+def title_roles(title: Any) -> Dict[str, Any]:
+    """role_ids, seniority and department (role family) of a job title."""
+    seniority, family, acronyms = classify(canonical_tokens(title))
+    ids = list(acronyms)
+    if seniority:
+        ids.append(seniority)
+    if family:
+        ids.append(family)
+    if seniority and family:
+        ids.append(f"{seniority}:{family}")
+    return {"role_ids": list(dict.fromkeys(ids)), "seniority": seniority, "department": family}
+
+def role_family(role: Any) -> Optional[str]:
+    """Role family (department) a searched role belongs to, if any."""
+    return classify(canonical_tokens(role))[1]
+
+@lru_cache(maxsize=4096)
+def role_exact_ids(role: str) -> Tuple[str, ...]:
+    """
+    The most specific role id a searched role maps to ("CTO" -> cto,
+    "VP Sales" -> vp:sales, "Software Engineer" -> ic:engineering,
+    "Sales" -> sales). Used to rank exact matches above the rest.
+    """
+    seniority, family, acronyms = classify(canonical_tokens(role))
+    if acronyms:
+        return tuple(acronyms)
+    if seniority and family:
+        return (f"{seniority}:{family}",)
+    if family:
+        return (family,)
+    if seniority:
+        return (seniority,)
+    return ()
+
+# Individual-contributor ladder: a plain IC role matches every level of it
+IC_LEVELS = ("entry", "ic", "senior", "lead")
+
+@lru_cache(maxsize=4096)
+def role_query_ids(role: str) -> Tuple[str, ...]:
+    """
+    Role ids a searched role matches on. A role that names a seniority keeps
+    it ("VP Sales" -> vp:sales). A plain IC role matches its family's IC
+    ladder, so "Software Engineer" also finds Junior / Senior / Lead /
+    Principal engineers but not managers or CTOs; a bare family ("Engineering")
+    matches the whole family. "Founder" matches on the seniority, so it finds
+    "Founder & CTO". Empty when the role has no known seniority or family:
+    the caller falls back to title words.
+    """
+    seniority, family, acronyms = classify(canonical_tokens(role))
+    if acronyms:
+        return tuple(acronyms)
+    if family and seniority in IC_LEVELS:
+        return tuple(f"{level}:{family}" for level in IC_LEVELS)
+    if family and seniority is None:
+        return (family,)
+    if family == "executive" and seniority:
+        return (seniority,)
+    return role_exact_ids(role)
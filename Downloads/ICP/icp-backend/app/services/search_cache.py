@@ -0,0 +1,210 @@
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from app.core.config import settings
+from app.db.owner import GLOBAL_OWNER, owner_of
+from app.services.search_fields import norm_text
+
+# Cache for search_icp() results, keyed by the canonicalized ICP filters + user scope.
+#
+# Every entry is tagged with the data versions it was computed against: one for
+# the global Vault data and one for the searching user's own uploads. Imports
+# bump the version of the scope they wrote to (bump_data_version), so a Vault
+# import invalidates every cached search while a user upload only invalidates
+# that user's searches.
+#
+# Entries live in a bounded in-process LRU. When SEARCH_CACHE_DB is set, entries
+# and versions are also kept in that SQLite file so several API workers share
+# them (and an import in one worker invalidates the others).
+
+# The only filter keys search_icp reads; anything else (e.g. chat metadata) is ignored
+SEARCH_KEYS = ("industry", "geography", "roles", "company_size")
+# Filters that accept a single value or a list ("CTO" == ["cto"])
+_LIST_KEYS = ("industry", "geography", "roles")
+
+Versions = Tuple[int, int]
+
+_lock = threading.Lock()
+_entries: "OrderedDict[str, Tuple[float, Versions, Any]]" = OrderedDict()
+_versions: Dict[str, int] = {}
+_stats = {"hits": 0, "shared_hits": 0, "misses": 0, "stale": 0, "expired": 0, "evictions": 0}
+
+# ======================= Keys =======================
+
+def _canon(value: Any) -> Any:
+    if isinstance(value, str):
+        return norm_text(value)
+    if isinstance(value, (list, tuple, set)):
+        items = [_canon(v) for v in value]
+        return sorted({json.dumps(v, sort_keys=True) for v in items if v not in (None, "", [], {})})
+    if isinstance(value, dict):
+        return {k: _canon(v) for k, v in sorted(value.items()) if v is not None}
+    return value
+
+def cache_key(icp_filters: dict, user_id: Optional[str], **options: Any) -> str:
+    """
+    Stable key for one search: filter values are case/whitespace-normalized and
+    list order is ignored, so equivalent ICPs share an entry. `options` holds
+    anything else that changes the result (limit, mode, ...).
+    """
+    filters = {}
+    for k in SEARCH_KEYS:
+        v = icp_filters.get(k)
+        filters[k] = _canon([v] if k in _LIST_KEYS and isinstance(v, str) else v)
+    payload = {
+        "filters": {k: v for k, v in filters.items() if v not in (None, "", [], {})},
+        "scope": owner_of(user_id),
+        "options": options,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
+
+# ======================= Shared store =======================
+
+def _shared():
+    if not settings.SEARCH_CACHE_DB:
+        return None
+    conn = sqlite3.connect(settings.SEARCH_CACHE_DB, timeout=5)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS search_cache ("
+        "key TEXT PRIMARY KEY, expires_at REAL, versions TEXT, value TEXT)"
+    )
+    conn.execute("CREATE TABLE IF NOT EXISTS data_versions (scope TEXT PRIMARY KEY, version INTEGER)")
+    return conn
+
+def _shared_call(fn, default=None):
+    """Run fn(conn) against the shared store; a broken store degrades to in-process only."""
+    try:
+        conn = _shared()
+    except sqlite3.Error as e:
+        print(f"⚠️ Search cache store unavailable: {e}")
+        return default
+    if conn is None:
+        return default
+    try:
+        with conn:
+            return fn(conn)
+    except sqlite3.Error as e:
+        print(f"⚠️ Search cache store error: {e}")
+        return default
+    finally:
+        conn.close()
+
+# ======================= Data versions =======================
+
+def data_versions(user_id: Optional[str]) -> Versions:
+    """(global version, user version) that a search by `user_id` depends on."""
+    scopes = [GLOBAL_OWNER, owner_of(user_id)]
+
+    def read(conn):
+        rows = conn.execute(
+            "SELECT scope, version FROM data_versions WHERE scope IN (?, ?)", scopes
+        ).fetchall()
+        return dict(rows)
+
+    shared = _shared_call(read)
+    with _lock:
+        if shared is not None:
+            _versions.update(shared)
+        return _versions.get(scopes[0], 0), (_versions.get(scopes[1], 0) if user_id else 0)
+
+def bump_data_version(user_id: Optional[str] = None) -> int:
+    """Invalidate cached searches over a scope's data (None = global Vault data)."""
+    scope = owner_of(user_id)
+
+    def bump(conn):
+        conn.execute(
+            "INSERT INTO data_versions (scope, version) VALUES (?, 1) "
+            "ON CONFLICT(scope) DO UPDATE SET version = version + 1",
+            (scope,),
+        )
+        return conn.execute("SELECT version FROM data_versions WHERE scope = ?", (scope,)).fetchone()[0]
+
+    shared = _shared_call(bump)
+    with _lock:
+        _versions[scope] = shared if shared is not None else _versions.get(scope, 0) + 1
+        return _versions[scope]
+
+# ======================= Get / put =======================
+
+def get(key: str, versions: Versions) -> Optional[Any]:
+    """Cached value for `key` if it was computed against `versions` and hasn't expired."""
+    now = time.time()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None:
+            expires_at, entry_versions, value = entry
+            if expires_at < now or entry_versions != versions:
+                del _entries[key]
+                _stats["expired" if expires_at < now else "stale"] += 1
+            else:
+                _entries.move_to_end(key)
+                _stats["hits"] += 1
+                return copy.deepcopy(value)
+
+    row = _shared_call(lambda conn: conn.execute(
+        "SELECT expires_at, versions, value FROM search_cache WHERE key = ?", (key,)
+    ).fetchone())
+    if row and row[0] >= now and tuple(json.loads(row[1])) == versions:
+        value = json.loads(row[2])
+        with _lock:
+            _stats["shared_hits"] += 1
+            _store(key, row[0], versions, value)
+        return copy.deepcopy(value)
+
+    with _lock:
+        _stats["misses"] += 1
+    return None
+
+def _store(key: str, expires_at: float, versions: Versions, value: Any):
+    _entries[key] = (expires_at, versions, value)
+    _entries.move_to_end(key)
+    while len(_entries) > settings.SEARCH_CACHE_SIZE:
+        _entries.popitem(last=False)
+        _stats["evictions"] += 1
+
+def put(key: str, versions: Versions, value: Any):
+    """Cache `value`, tagged with the data versions read before it was computed."""
+    if settings.SEARCH_CACHE_SIZE <= 0:
+        return
+    expires_at = time.time() + settings.SEARCH_CACHE_TTL
+    with _lock:
+        _store(key, expires_at, versions, copy.deepcopy(value))
+
+    def write(conn):
+        conn.execute(
+            "INSERT OR REPLACE INTO search_cache (key, expires_at, versions, value) VALUES (?, ?, ?, ?)",
+            (key, expires_at, json.dumps(list(versions)), json.dumps(value, default=str)),
+        )
+        conn.execute("DELETE FROM search_cache WHERE expires_at < ?", (time.time(),))
+        conn.execute(
+            "DELETE FROM search_cache WHERE key NOT IN "
+            "(SELECT key FROM search_cache ORDER BY expires_at DESC LIMIT ?)",
+            (settings.SEARCH_CACHE_SIZE,),
+        )
+
+    _shared_call(write)
+
+def clear():
+    with _lock:
+        _entries.clear()
+    _shared_call(lambda conn: conn.execute("DELETE FROM search_cache"))
+
+def stats() -> dict:
+    with _lock:
+        lookups = _stats["hits"] + _stats["shared_hits"] + _stats["misses"]
+        return {
+            **_stats,
+            "hit_rate": round((_stats["hits"] + _stats["shared_hits"]) / lookups, 3) if lookups else None,
+            "entries": len(_entries),
+            "max_entries": settings.SEARCH_CACHE_SIZE,
+            "ttl_seconds": settings.SEARCH_CACHE_TTL,
+            "shared_store": settings.SEARCH_CACHE_DB or None,
+            "data_versions": dict(_versions),
+        }
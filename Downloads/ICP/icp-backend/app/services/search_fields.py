@@ -0,0 +1,152 @@
+import re
+from typing import Any, Dict, List, Optional
+from app.services.geo import geo_fields
+from app.services.role_index import title_roles
+
+# Canonical, lower-case copies of the fields search filters on (plus the role
+# ids/seniority/department from app/services/role_index.py, stored as role_ids,
+# title_seniority and title_department so explicitly set seniority/department
+# values are never overwritten, and the ISO
+# country/subdivision codes from app/services/geo.py). They are written
+# at import time (and by scripts/backfill_search_fields.py) so search can use
+# indexed equality / $in lookups instead of case-insensitive regexes over every
+# spelling a Vault or user export might use.
+
+_WS = re.compile(r"\s+")
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+def _first(doc: Dict[str, Any], *keys: str) -> Any:
+    for k in keys:
+        v = doc.get(k)
+        if v is not None and v != "":
+            return v
+    return None
+
+def norm_text(value: Any) -> Optional[str]:
+    """Casefold + collapse whitespace. None for empty/missing values."""
+    if value is None:
+        return None
+    if isinstance(value, float) and value != value:  # NaN
+        return None
+    s = _WS.sub(" ", str(value)).strip().casefold()
+    return s or None
+
+def industry_norm(value: Any) -> Optional[str]:
+    return norm_text(value)
+
+def country_norm(value: Any) -> Optional[str]:
+    return norm_text(value)
+
+# Trailing legal-form words dropped from company names ("Acme Inc." == "ACME Incorporated")
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "corp", "corporation", "co", "company", "llc", "llp", "lp",
+    "ltd", "limited", "plc", "pvt", "private", "pte", "pty", "gmbh", "ag", "sa", "sas",
+    "srl", "spa", "bv", "nv", "oy", "ab", "as", "kk",
+}
+_NON_WORD = re.compile(r"[^\w\s]")
+
+def company_name_norm(value: Any) -> Optional[str]:
+    """Join key for company names: casefolded, punctuation collapsed, legal suffixes removed."""
+    s = norm_text(value)
+    if not s:
+        return None
+    s = s.replace("&", " and ").replace(".", "")
+    words = _NON_WORD.sub(" ", s).split()
+    if words and words[0] == "the" and len(words) > 1:
+        words = words[1:]
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words) or None
+
+_NUM = r"(\d+(?:\.\d+)?k?)"
+_SIZE_BETWEEN = re.compile(rf"^{_NUM}(?:-|–|to){_NUM}$")
+_SIZE_ATLEAST = re.compile(rf"^(?:{_NUM}\+|>={_NUM}|>{_NUM})$")
+_SIZE_ATMOST = re.compile(rf"^(?:<={_NUM}|<{_NUM})$")
+_SIZE_EXACT = re.compile(rf"^{_NUM}$")
+
+def _size_number(s: str) -> int:
+    return int(float(s[:-1]) * 1000) if s.endswith("k") else int(float(s))
+
+def employee_count_value(value: Any) -> Optional[int]:
+    """Exact head count from a raw cell ("1,200", 1200.0); None for ranges/blanks."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value) if value == value else None
+    s = re.sub(r"[,\s]", "", str(value)).casefold()
+    return _size_number(s) if _SIZE_EXACT.match(s) else None
+
+def size_range(value: Any) -> Optional[Dict[str, int]]:
+    """
+    Parse a company-size bucket into {"min", "max"} head counts:
+    "51-200", "51 to 200", "5000+", ">1000", "<50", "1k-5k", "10,000+ employees".
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {"min": int(value), "max": int(value)}
+    if not isinstance(value, str):
+        return None
+    s = re.sub(r"[,\s]|employees?|people|staff", "", value.casefold())
+    m = _SIZE_BETWEEN.match(s)
+    if m:
+        lo, hi = sorted((_size_number(m.group(1)), _size_number(m.group(2))))
+        return {"min": lo, "max": hi}
+    m = _SIZE_ATLEAST.match(s)
+    if m:
+        plus, gte, gt = m.groups()
+        return {"min": _size_number(plus or gte) if (plus or gte) else _size_number(gt) + 1}
+    m = _SIZE_ATMOST.match(s)
+    if m:
+        lte, lt = m.groups()
+        return {"max": _size_number(lte) if lte else _size_number(lt) - 1}
+    m = _SIZE_EXACT.match(s)
+    if m:
+        n = _size_number(m.group(1))
+        return {"min": n, "max": n}
+    return None
+
+def title_tokens(title: Any) -> List[str]:
+    """Distinct lower-case word tokens of a job title, in order."""
+    s = norm_text(title)
+    if not s:
+        return []
+    return list(dict.fromkeys(_TOKEN.findall(s)))
+
+def person_title(p: Dict[str, Any]) -> Optional[str]:
+    emp = p.get("employment")
+    candidate = None
+    if isinstance(emp, (list, tuple)) and emp:
+        candidate = emp[0]
+    elif isinstance(emp, dict):
+        candidate = emp
+    if isinstance(candidate, dict):
+        title = _first(candidate, "title", "Designation", "Title")
+        if title:
+            return title
+    return _first(p, "Designation", "Title")
+
+def company_search_fields(c: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalized search fields for a company document (any legacy spelling)."""
+    return {
+        "company_name_norm": company_name_norm(_first(c, "name", "Company", "company", "company_name")),
+        "industry_norm": industry_norm(_first(c, "industry", "Industry")),
+        "country_norm": country_norm(_first(c, "location", "country", "Country")),
+        **geo_fields(_first(c, "location", "country", "Country")),
+    }
+
+def person_search_fields(p: Dict[str, Any], company_name: Any = None) -> Dict[str, Any]:
+    """Normalized search fields for a person document; `company_name` overrides raw columns."""
+    company = company_name or _first(p, "Company", "company", "company_name")
+    if not company and isinstance(p.get("employment"), list) and p["employment"]:
+        first_job = p["employment"][0]
+        company = first_job.get("company") if isinstance(first_job, dict) else None
+    title = person_title(p)
+    roles = title_roles(title)
+    return {
+        "company_name_norm": company_name_norm(company),
+        "country_norm": country_norm(_first(p, "country", "Country", "location")),
+        **geo_fields(_first(p, "country", "Country", "location")),
+        "title_tokens": title_tokens(title),
+        "role_ids": roles["role_ids"],
+        "title_seniority": roles["seniority"],
+        "title_department": roles["department"],
+    }
@@ -1,48 +1,52 @@
-from typing import Any, Dict, Optional, List, Tuple
-import re
-from bson.regex import Regex
+import base64
+import json
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, List, Tuple
 from bson import ObjectId
-from app.db.collections import get_company_collection, get_people_collection
+from pymongo.errors import ExecutionTimeout
+from starlette.concurrency import run_in_threadpool
+from app.db.collections import get_company_collection, get_people_collection, get_prospects_collection
+from app.db.async_collections import (
+    get_async_company_collection, get_async_people_collection, get_async_prospects_collection,
+)
+from app.db.owner import owner_scope
+from app.core.config import settings
+from app.services import relevance, search_cache, text_index
+from app.services.facet_service import facet_share
+from app.services.search_fields import industry_norm, country_norm, title_tokens, size_range
+from app.services.geo import query_codes
+from app.services.role_index import role_family, role_query_ids
 
 def _ensure_list(v: Any) -> List[Any]:
     if v is None:
         return []
     return v if isinstance(v, (list, tuple, set)) else [v]
 
-def _rx_or_in(value: Any) -> Optional[Dict[str, Any]]:
-    def to_rx(s: Any):
-        if s is None:
-            return None
-        if isinstance(s, (int, float, bool)):
-            s = str(s)
-        if isinstance(s, str):
-            s = s.strip()
-            if not s:
-                return None
-            return Regex(re.escape(s), "i")
-        return None
-
-    if isinstance(value, (list, tuple, set)):
-        regs = [to_rx(v) for v in value]
-        regs = [r for r in regs if r is not None]
-        return {"$in": regs} if regs else None
+def _norm_in(value: Any, norm: Callable[[Any], Optional[str]]) -> List[str]:
+    """Normalize filter values the same way the *_norm fields were written."""
+    out = [norm(v) for v in _ensure_list(value) if isinstance(v, (str, int, float))]
+    return list(dict.fromkeys(v for v in out if v))
 
-    r = to_rx(value)
-    return {"$regex": r} if r is not None else None
-
-def _user_scope(user_id: Optional[str]) -> Dict[str, Any]:
-    ors: List[Dict[str, Any]] = [
-        {"user_id": {"$exists": False}},
-        {"user_id": None},
-    ]
-    if user_id:
-        ors.append({"user_id": user_id})
-        try:
-            oid = ObjectId(user_id)
-            ors.append({"user_id": oid})
-        except Exception:
-            pass
-    return {"$or": ors}
+def _roles_cond(roles: Any) -> Optional[Dict[str, Any]]:
+    """
+    Roles known to the role index become one $in over canonical role ids
+    ("VP Sales" also finds "Vice President, Sales"); any other role matches
+    people whose title contains all of its words.
+    """
+    role_ids: List[str] = []
+    clauses: List[Dict[str, Any]] = []
+    for role in _ensure_list(roles):
+        if not isinstance(role, str):
+            continue
+        ids = role_query_ids(role)
+        if ids:
+            role_ids.extend(ids)
+        elif title_tokens(role):
+            clauses.append({"title_tokens": {"$all": title_tokens(role)}})
+    if role_ids:
+        clauses.insert(0, {"role_ids": {"$in": list(dict.fromkeys(role_ids))}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
 
 def _append_and(q: Dict[str, Any], cond: Dict[str, Any]) -> Dict[str, Any]:
     if not cond:
@@ -77,173 +81,639 @@ def _first_title_from_person(p: Dict[str, Any]) -> Optional[str]:
 def _linkedin_from_person(p: Dict[str, Any]) -> Optional[str]:
     return p.get("linkedin_url") or p.get("linkedin") or p.get("LinkedIn") or None
 
-def search_icp(icp_filters: dict, user_id: str | None = None, limit: int = 20):
-    companies = get_company_collection()
-    people = get_people_collection()
+# ======================= Result shapes =======================
+# Each shape sits next to the projection of exactly the fields it reads, so
+# queries never ship employment history, phones, timestamps or raw Vault
+# columns that the response drops anyway.
+
+COMPANY_RESULT_FIELDS = {
+    "_id": 0, "name": 1, "Company": 1, "industry": 1, "Industry": 1, "size": 1,
+    "employee_count": 1, "location": 1, "country": 1, "Country": 1,
+}
+
+def shape_company(c: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": c.get("name") or c.get("Company"),
+        "industry": c.get("industry") or c.get("Industry"),
+        "size": c.get("size") or c.get("employee_count"),
+        "location": c.get("location") or c.get("country") or c.get("Country"),
+    }
+
+PERSON_RESULT_FIELDS = {
+    "_id": 0, "full_name": 1, "First Name": 1, "Last Name": 1,
+    # employment is returned, but only the keys a result row uses
+    "employment.company_id": 1, "employment.title": 1, "employment.Designation": 1, "employment.Title": 1,
+    "Designation": 1, "Title": 1, "emails": 1, "Email": 1, "email": 1,
+    "linkedin_url": 1, "linkedin": 1, "LinkedIn": 1,
+}
+
+def shape_person(p: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape output (include designation, email, linkedin)."""
+    return {
+        "full_name": p.get("full_name") or f"{p.get('First Name','')} {p.get('Last Name','')}".strip(),
+        "designation": _first_title_from_person(p) or "",
+        "email": _first_email_from_person(p) or "",
+        "linkedin": _linkedin_from_person(p) or "",
+        "employment": p.get("employment") or {},
+    }
+
+# Rows of the prospects read model (app/services/prospect_view.py)
+PROSPECT_PERSON_FIELDS = {
+    "_id": 0, "full_name": 1, "title": 1, "email": 1, "linkedin_url": 1, "company_id": 1,
+}
+
+def shape_prospect_person(p: Dict[str, Any]) -> Dict[str, Any]:
+    """Same keys as shape_person."""
+    return {
+        "full_name": p.get("full_name") or "",
+        "designation": p.get("title") or "",
+        "email": p.get("email") or "",
+        "linkedin": p.get("linkedin_url") or "",
+        "employment": [{"company_id": p.get("company_id"), "title": p.get("title")}],
+    }
+
+PROSPECT_COMPANY_FIELDS = {
+    "_id": 0, "company_id": 1, "company_name": 1, "industry": 1, "size": 1, "employee_count": 1, "location": 1,
+}
+
+def shape_prospect_company(p: Dict[str, Any]) -> Dict[str, Any]:
+    return shape_company({**p, "name": p.get("company_name")})
+
+def shape_results(matched_companies: List[Dict[str, Any]], matched_people: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "companies": [shape_company(c) for c in matched_companies],
+        "people": [shape_person(p) for p in matched_people],
+    }
+
+# ======================= Queries =======================
 
-    # ---------- Companies ----------
+def _geo_cond(geography: Any) -> Optional[Dict[str, Any]]:
+    """
+    ICP geography as indexed $in clauses on the ISO codes written at import
+    (app/services/geo.py): countries and regions on country_code, states and
+    cities on subdivision_code. Values geo can't resolve fall back to country_norm.
+    """
+    countries, subdivisions, unresolved = query_codes(_ensure_list(geography))
+    clauses: List[Dict[str, Any]] = []
+    if countries:
+        clauses.append({"country_code": {"$in": countries}})
+    if subdivisions:
+        clauses.append({"subdivision_code": {"$in": subdivisions}})
+    unresolved = _norm_in(unresolved, country_norm)
+    if unresolved:
+        clauses.append({"country_norm": {"$in": unresolved}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+def _company_conditions(icp_filters: dict) -> List[Dict[str, Any]]:
+    """Company-level filter clauses."""
     c_and: List[Dict[str, Any]] = []
 
-    industry_cond = None
-    if "industry" in icp_filters:
-        industry_cond = _rx_or_in(icp_filters["industry"])
-        if industry_cond:
-            c_and.append({
-                "$or": [
-                    {"industry": industry_cond},
-                    {"Industry": industry_cond},
-                ]
-            })
-
-    india_requested = False
-    geo_cond = None
-    if "geography" in icp_filters:
-        geo_values = icp_filters.get("geography")
-        geo_cond = _rx_or_in(geo_values)
-        if geo_cond:
-            vals = geo_values if isinstance(geo_values, (list, tuple, set)) else [geo_values]
-            india_requested = any(isinstance(v, str) and v.strip().lower() == "india" for v in vals)
-            or_parts: List[Dict[str, Any]] = [
-                {"location": geo_cond},
-                {"country": geo_cond},
-                {"Country": geo_cond},
-            ]
-            if india_requested:
-                or_parts.extend([
-                    {"Country": {"$exists": False}},
-                    {"country": {"$exists": False}},
-                    {"location": {"$exists": False}},
-                ])
-            c_and.append({"$or": or_parts})
-
-    if isinstance(icp_filters.get("company_size"), dict):
-        cs = icp_filters["company_size"]
-        rng: Dict[str, Any] = {}
-        for a, b in (("min", "$gte"), ("max", "$lte"), ("gte", "$gte"), ("lte", "$lte")):
-            if a in cs and cs[a] is not None:
-                rng[b] = cs[a]
-        if rng:
-            c_and.append({
-                "$or": [
-                    {"employee_count": rng},
-                    {"# Employees": rng},
-                ]
-            })
-
-    company_query: Dict[str, Any] = {"$and": c_and} if c_and else {}
-    company_query = _append_and(company_query, _user_scope(user_id))
-
-    print("Company query:", company_query)
-
-    matched_companies = list(companies.find(company_query).limit(limit))
-
-    if not matched_companies and india_requested:
-        relaxed = {"$and": []} if c_and else {}
-        for cond in c_and:
-            if isinstance(cond, dict) and "$or" in cond:
-                ors = cond["$or"]
-                if any(isinstance(x, dict) and any(k in x for k in ["Country", "country", "location"]) for x in ors):
-                    continue
-            _append_and(relaxed, cond)
-        relaxed = _append_and(relaxed, _user_scope(user_id))
-        print("Company query (relaxed India):", relaxed)
-        matched_companies = list(companies.find(relaxed).limit(limit))
-
-    # Build company-name and company-id conditions for people
-    company_names: List[str] = []
-    company_ids: List[str] = []
-    for c in matched_companies:
-        # collect multiple possible name fields
-        name = c.get("name") or c.get("Company") or c.get("company") or c.get("company_name")
-        if name:
-            company_names.append(str(name).strip())
-        # collect possible id fields that appear in people.employment.company_id
-        for id_key in ("company_id", "companyId", "person_id", "personId", "id", "_id"):
-            val = c.get(id_key)
-            if val is not None:
-                company_ids.append(str(val))
-
-    company_based_cond = None
-    if company_names:
-        company_based_cond = _rx_or_in(company_names)
+    industries = _norm_in(icp_filters.get("industry"), industry_norm)
+    if industries:
+        c_and.append({"industry_norm": {"$in": industries}})
+
+    geo_cond = _geo_cond(icp_filters.get("geography"))
+    if geo_cond:
+        c_and.append(geo_cond)
+
+    size_cond = _size_cond(icp_filters)
+    if size_cond:
+        c_and.append(size_cond)
+
+    return c_and
+
+def _size_cond(icp_filters: dict) -> Optional[Dict[str, Any]]:
+    """Range over the indexed numeric employee_count; accepts {"min", "max"} or a bucket like "51-200"."""
+    cs = icp_filters.get("company_size")
+    if not isinstance(cs, dict):
+        cs = size_range(cs)
+    if not cs:
+        return None
+    rng: Dict[str, Any] = {}
+    for a, b in (("min", "$gte"), ("max", "$lte"), ("gte", "$gte"), ("lte", "$lte")):
+        if a in cs and cs[a] is not None:
+            rng[b] = cs[a]
+    return {"employee_count": rng} if rng else None
+
+def _scoped(conds: List[Dict[str, Any]], user_id: Optional[str]) -> Dict[str, Any]:
+    q: Dict[str, Any] = {"$and": list(conds)} if conds else {}
+    return _append_and(q, owner_scope(user_id))
+
+def _people_stages(company_conds: List[Dict[str, Any]], people_query: Dict[str, Any],
+                   company_query: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """$match people, then keep those whose employer passes the company filters."""
+    stages: List[Dict[str, Any]] = [{"$match": people_query}]
+    if company_conds:
+        stages += [
+            {"$lookup": {
+                "from": "companies",
+                "localField": "employment.company_id",
+                "foreignField": "company_id",
+                "pipeline": [{"$match": company_query}, {"$project": {"_id": 1}}, {"$limit": 1}],
+                "as": "_company",
+            }},
+            # People whose employer doesn't match the company filters drop out here
+            {"$match": {"_company": {"$ne": []}}},
+        ]
+    return stages
+
+def _company_union(company_query: Dict[str, Any], limit: int) -> Dict[str, Any]:
+    return {"$unionWith": {
+        "coll": "companies",
+        "pipeline": [
+            {"$match": company_query},
+            {"$limit": limit},
+            {"$project": COMPANY_RESULT_FIELDS},
+            {"$set": {"_kind": "company"}},
+        ],
+    }}
+
+def build_search_pipeline(company_conds: List[Dict[str, Any]], people_conds: List[Dict[str, Any]],
+                          user_id: Optional[str], limit: int) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    One aggregation that returns both result sets: matching people, followed
+    by the matching companies via $unionWith. Every output document carries
+    `_kind` = "person" | "company". Returns (collection to aggregate, pipeline).
+
+    With a people-side filter (roles) it runs on `people`, joining each match
+    to its company on the indexed company_id with the company filters applied
+    inside the join. With company filters only, the people $match would be
+    just the owner scope, so it runs on `companies` instead: matching companies
+    (through the (owner, ...) indexes) each look up their people on the indexed
+    employment.company_id, and reading stops once `limit` people are found.
+    Needs MongoDB 5.0+ ($lookup with localField and a pipeline).
+    """
+    company_query = _scoped(company_conds, user_id)
+    if company_conds and not people_conds:
+        return "companies", [
+            {"$match": company_query},
+            {"$lookup": {
+                "from": "people",
+                "localField": "company_id",
+                "foreignField": "employment.company_id",
+                "pipeline": [{"$match": owner_scope(user_id)}, {"$limit": limit}, {"$project": PERSON_RESULT_FIELDS}],
+                "as": "_people",
+            }},
+            {"$unwind": "$_people"},
+            {"$limit": limit},
+            {"$replaceWith": "$_people"},
+            {"$set": {"_kind": "person"}},
+            _company_union(company_query, limit),
+        ]
+    return "people", _people_stages(company_conds, _scoped(people_conds, user_id), company_query) + [
+        {"$limit": limit},
+        {"$project": PERSON_RESULT_FIELDS},
+        {"$set": {"_kind": "person"}},
+        _company_union(company_query, limit),
+    ]
+
+def _split_results(docs: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    companies = [d for d in docs if d.get("_kind") == "company"]
+    people = [d for d in docs if d.get("_kind") == "person"]
+    return companies, people
+
+SEARCH_MODES = ("filter", "ranked", "prospects", "scored")
+
+def search_icp(icp_filters: dict, user_id: str | None = None, limit: int = 20, mode: str = "filter"):
+    """
+    Cached ICP search; entries are invalidated by imports into the global or the user's scope.
+
+    mode="filter": boolean match on the normalized fields (natural order).
+    mode="ranked": best `limit` by BM25 over titles, companies, industries and
+    locations (app/services/text_index.py); company size stays a hard filter.
+    mode="prospects": the same filters answered from the denormalized
+    `prospects` collection with no join (companies without people are absent).
+    mode="scored": up to SEARCH_SCORE_POOL matching prospects ranked by the
+    weighted relevance model in app/services/relevance.py (size is scored, not filtered).
+    """
+    key, versions, cached = _cached_search(icp_filters, user_id, limit, mode)
+    if cached is not None:
+        return cached
+
+    if mode == "ranked":
+        results = _ranked_search(icp_filters, user_id, limit)
+    elif mode == "prospects":
+        results = _prospect_search(icp_filters, user_id, limit)
+    elif mode == "scored":
+        results = _scored_search(icp_filters, user_id, limit)
     else:
-        if industry_cond:
-            company_based_cond = industry_cond
-        elif geo_cond:
-            company_based_cond = geo_cond
-
-    # ---------- People ----------
-    p_and: List[Dict[str, Any]] = []
-    roles_cond = None
-    if "roles" in icp_filters:
-        roles_cond = _rx_or_in(icp_filters["roles"])
-        if roles_cond:
-            p_and.append({
-                "$or": [
-                    {"employment.title": roles_cond},
-                    {"Designation": roles_cond},
-                    {"Title": roles_cond},
-                ]
-            })
-
-    # Add company-based matching: try both name-based regex fields and id-based exact fields
-    company_or_parts: List[Dict[str, Any]] = []
-    if company_based_cond:
-        company_or_parts.extend([
-            {"Company": company_based_cond},
-            {"company": company_based_cond},
-            {"company_name": company_based_cond},
-            {"employment.company": company_based_cond},
-        ])
-    if company_ids:
-        company_or_parts.extend([
-            {"employment.company_id": {"$in": company_ids}},
-            {"company_id": {"$in": company_ids}},
-            {"person_id": {"$in": company_ids}},
-            {"_company_id": {"$in": company_ids}},
-        ])
-    if company_or_parts:
-        p_and.append({"$or": company_or_parts})
-
-    people_query: Dict[str, Any] = {"$and": p_and} if p_and else {}
-    people_query = _append_and(people_query, _user_scope(user_id))
-
-    print("People query:", people_query)
-
-    matched_people = list(people.find(people_query).limit(limit))
-
-    # ----- Extra diagnostics (print once per call) -----
-    try:
-        total_c = companies.estimated_document_count()
-        total_p = people.estimated_document_count()
-        print(f"[DEBUG] Companies total={total_c}, People total={total_p}, "
-              f"found companies={len(matched_companies)}, people={len(matched_people)}")
-        print("[DEBUG] Distinct Industry keys (sample):", companies.distinct("Industry")[:5] if hasattr(list, "__getitem__") else "n/a")
-        print("[DEBUG] Distinct industry keys (sample):", companies.distinct("industry")[:5] if hasattr(list, "__getitem__") else "n/a")
-        print("[DEBUG] Distinct Country keys (sample):", companies.distinct("Country")[:5] if hasattr(list, "__getitem__") else "n/a")
-        print("[DEBUG] Distinct country keys (sample):", companies.distinct("country")[:5] if hasattr(list, "__getitem__") else "n/a")
-    except Exception:
-        pass
+        results = _search_icp(icp_filters, user_id, limit)
+    search_cache.put(key, versions, results)
+    return results
+
+def _cached_search(icp_filters: dict, user_id: str | None, limit: int, mode: str):
+    """(cache key, data versions, cached results or None) for a search."""
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"mode must be one of {', '.join(SEARCH_MODES)}")
+    # Versions are read before searching so an import finishing mid-search can't be cached as current
+    versions = search_cache.data_versions(user_id)
+    key = search_cache.cache_key(icp_filters, user_id, limit=limit, mode=mode)
+    return key, versions, search_cache.get(key, versions)
+
+def _filter_pipeline(icp_filters: dict, user_id: str | None, limit: int) -> Tuple[str, List[Dict[str, Any]]]:
+    company_conds = _company_conditions(icp_filters)
+    roles_cond = _roles_cond(icp_filters.get("roles"))
+    people_conds = [roles_cond] if roles_cond else []
+    return build_search_pipeline(company_conds, people_conds, user_id, limit)
+
+def _search_icp(icp_filters: dict, user_id: str | None, limit: int):
+    source, pipeline = _filter_pipeline(icp_filters, user_id, limit)
+    coll = get_company_collection() if source == "companies" else get_people_collection()
+    matched_companies, matched_people = _split_results(list(coll.aggregate(pipeline)))
+
+    return shape_results(matched_companies, matched_people)
+
+# Ranked candidates fetched per result slot, so the size filter can still fill `limit`
+RANKED_OVERFETCH = 4
+
+def _in_rank_order(docs: List[Dict[str, Any]], key: str, ranked: List[Tuple[str, float]],
+                   limit: int) -> List[Tuple[Dict[str, Any], float]]:
+    by_key = {d.get(key): d for d in docs}
+    return [(by_key[k], score) for k, score in ranked if k in by_key][:limit]
+
+def _ranked_search(icp_filters: dict, user_id: str | None, limit: int):
+    text_index.ensure_current(user_id)
+    ranked_people = text_index.rank_people(icp_filters, user_id, limit * RANKED_OVERFETCH)
+    ranked_companies = text_index.rank_companies(icp_filters, user_id, limit * RANKED_OVERFETCH)
+    if not ranked_people and not ranked_companies:
+        # Nothing textual to rank on (e.g. size-only ICP)
+        return _search_icp(icp_filters, user_id, limit)
+
+    size_conds = [c for c in [_size_cond(icp_filters)] if c]
+    company_query = _scoped(size_conds + [{"company_id": {"$in": [k for k, _ in ranked_companies]}}], user_id)
+    companies = list(get_company_collection().find(company_query, {**COMPANY_RESULT_FIELDS, "company_id": 1}))
+
+    people_query = _scoped([{"person_id": {"$in": [k for k, _ in ranked_people]}}], user_id)
+    pipeline = _people_stages(size_conds, people_query, _scoped(size_conds, user_id))
+    pipeline.append({"$project": {**PERSON_RESULT_FIELDS, "person_id": 1}})
+    people = list(get_people_collection().aggregate(pipeline)) if ranked_people else []
 
-    # ----- Shape output (include designation, email, linkedin) -----
     return {
         "companies": [
-            {
-                "name": c.get("name") or c.get("Company"),
-                "industry": c.get("industry") or c.get("Industry"),
-                "size": c.get("size") or c.get("employee_count") or c.get("# Employees"),
-                "location": c.get("location") or c.get("country") or c.get("Country"),
-            }
-            for c in matched_companies
+            {**shape_company(c), "score": round(score, 4)}
+            for c, score in _in_rank_order(companies, "company_id", ranked_companies, limit)
         ],
         "people": [
-            {
-                "full_name": p.get("full_name") or f"{p.get('First Name','')} {p.get('Last Name','')}".strip(),
-                "designation": _first_title_from_person(p) or "",
-                "email": _first_email_from_person(p) or "",
-                "linkedin": _linkedin_from_person(p) or "",
-                "employment": p.get("employment") or {},
-            }
-            for p in matched_people
+            {**shape_person(p), "score": round(score, 4)}
+            for p, score in _in_rank_order(people, "person_id", ranked_people, limit)
         ],
     }
+
+def _prospect_search(icp_filters: dict, user_id: str | None, limit: int):
+    """One indexed find() for people and one for their employers, both on `prospects`."""
+    prospects = get_prospects_collection()
+    people_query, company_query = _prospect_queries(icp_filters, user_id)
+    people = list(prospects.find(people_query, PROSPECT_PERSON_FIELDS).limit(limit))
+
+    # First `limit` distinct employers; stops reading as soon as it has them
+    companies: Dict[str, Dict[str, Any]] = {}
+    for row in prospects.find(company_query, PROSPECT_COMPANY_FIELDS).batch_size(limit * 4):
+        companies.setdefault(row["company_id"], row)
+        if len(companies) >= limit:
+            break
+    return _prospect_results(people, companies)
+
+def _prospect_queries(icp_filters: dict, user_id: str | None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """(people query, company query) on `prospects`."""
+    company_conds = _company_conditions(icp_filters)
+    roles_cond = _roles_cond(icp_filters.get("roles"))
+    return _scoped(company_conds + ([roles_cond] if roles_cond else []), user_id), _scoped(company_conds, user_id)
+
+def _prospect_results(people: List[Dict[str, Any]], companies: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "companies": [shape_prospect_company(c) for c in companies.values()],
+        "people": [shape_prospect_person(p) for p in people],
+    }
+
+# Everything the relevance model and both result shapes read from a prospect
+SCORED_CANDIDATE_FIELDS = {
+    **PROSPECT_PERSON_FIELDS, **PROSPECT_COMPANY_FIELDS,
+    "role_ids": 1, "title_tokens": 1, "seniority": 1, "updated_ts": 1,
+}
+
+def _scored_search(icp_filters: dict, user_id: str | None, limit: int):
+    """
+    Best `limit` people among a bounded pool of matching prospects, and their
+    employers ordered by each one's best-scoring employee. Company size is a
+    scored preference here (size_fit), not a filter.
+    """
+    candidates = list(_scored_candidates(get_prospects_collection(), icp_filters, user_id))
+    return _scored_results(candidates, icp_filters, limit)
+
+def _scored_candidates(prospects, icp_filters: dict, user_id: str | None):
+    """Cursor over the candidate pool: matching prospects, size left to the model."""
+    company_conds = _company_conditions({k: v for k, v in icp_filters.items() if k != "company_size"})
+    roles_cond = _roles_cond(icp_filters.get("roles"))
+    query = _scoped(company_conds + ([roles_cond] if roles_cond else []), user_id)
+    return prospects.find(query, SCORED_CANDIDATE_FIELDS).limit(settings.SEARCH_SCORE_POOL).batch_size(5000)
+
+def _scored_results(candidates: List[Dict[str, Any]], icp_filters: dict, limit: int) -> Dict[str, Any]:
+    scores = relevance.score(relevance.features(candidates, icp_filters))
+    people = [(candidates[i], float(scores[i])) for i in relevance.top_k(scores, limit)]
+    companies = relevance.top_groups(scores, [c.get("company_id") for c in candidates], limit)
+    return {
+        "companies": [{**shape_prospect_company(candidates[i]), "score": round(s, 4)} for i, s in companies],
+        "people": [{**shape_prospect_person(p), "score": round(s, 4)} for p, s in people],
+    }
+
+# ======================= Estimates =======================
+# Approximate audience size before running a search (chat decides whether to
+# search, ask for tighter filters or just report the size). Companies are
+# counted on `companies`, people on the flattened `prospects`, both through
+# the (owner, ...) indexes and capped at ESTIMATE_CAP. If a count is too slow,
+# or prospects haven't been built, the size is extrapolated from facet_stats
+# assuming the filters are independent.
+
+ESTIMATE_CAP = 100_000
+ESTIMATE_MAX_TIME_MS = 200
+
+def _capped_count(coll, query: Dict[str, Any]) -> Optional[int]:
+    try:
+        return coll.count_documents(query, limit=ESTIMATE_CAP, maxTimeMS=ESTIMATE_MAX_TIME_MS)
+    except ExecutionTimeout:
+        return None
+
+def _facet_estimate(icp_filters: dict, user_id: Optional[str], kind: str) -> int:
+    """Scope size times the facet share of each filter (filters treated as independent)."""
+    coll = get_company_collection() if kind == "companies" else get_people_collection()
+    scope_size = _capped_count(coll, owner_scope(user_id))
+    estimate = float(coll.estimated_document_count() if scope_size is None else scope_size)
+
+    industries = set(_norm_in(icp_filters.get("industry"), industry_norm))
+    countries, subdivisions, _ = query_codes(_ensure_list(icp_filters.get("geography")))
+    countries = set(countries) | {s.split("-")[0] for s in subdivisions}
+    rng = _size_cond(icp_filters)
+    factors = []
+    if industries:
+        factors.append(("industry", lambda v: v in industries))
+    if countries:
+        factors.append(("country", lambda v: v in countries))
+    if rng:
+        lo, hi = rng["employee_count"].get("$gte", 0), rng["employee_count"].get("$lte", float("inf"))
+
+        def overlaps(v: Any) -> bool:
+            bucket = size_range(v)
+            return bool(bucket) and (bucket.get("max") is None or bucket["max"] >= lo) and (bucket.get("min") or 0) <= hi
+        factors.append(("size", overlaps))
+    if kind == "people":
+        families = {role_family(r) for r in _ensure_list(icp_filters.get("roles")) if isinstance(r, str)} - {None}
+        if families:
+            factors.append(("title_family", lambda v: v in families))
+
+    for facet, match in factors:
+        share = facet_share(user_id, facet, match)
+        if share is not None:
+            estimate *= share
+    return int(round(estimate))
+
+def estimate_icp(icp_filters: dict, user_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Approximate company / people counts for an ICP. `exact` is True when both
+    are real counts below ESTIMATE_CAP; `capped` when a count hit the cap.
+    """
+    company_conds = _company_conditions(icp_filters)
+    roles_cond = _roles_cond(icp_filters.get("roles"))
+
+    companies = _capped_count(get_company_collection(), _scoped(company_conds, user_id))
+    prospects = get_prospects_collection()
+    people = None
+    if prospects.estimated_document_count():
+        people = _capped_count(prospects, _scoped(company_conds + ([roles_cond] if roles_cond else []), user_id))
+
+    method = "index_count" if companies is not None and people is not None else "facets"
+    if companies is None:
+        companies = _facet_estimate(icp_filters, user_id, "companies")
+    if people is None:
+        people = _facet_estimate(icp_filters, user_id, "people")
+    return _estimate_result(companies, people, method)
+
+def _estimate_result(companies: int, people: int, method: str) -> Dict[str, Any]:
+    capped = companies >= ESTIMATE_CAP or people >= ESTIMATE_CAP
+    return {
+        "companies": companies,
+        "people": people,
+        "method": method,
+        "exact": method == "index_count" and not capped,
+        "capped": capped,
+    }
+
+# ======================= Paging / streaming =======================
+# Keyset pagination over one result kind ("people" or "companies"), ordered by
+# _id. The opaque cursor carries the last key seen plus a hash of the filters
+# and scope, so it can't be replayed against a different search. People pages
+# with company filters only are read company by company, so their key is the
+# (company _id, person _id) pair.
+
+SEARCH_KINDS = ("people", "companies")
+STREAM_BATCH = 1000
+
+def _encode_cursor(filters_key: str, last_key: Tuple[Any, ...]) -> str:
+    raw = json.dumps({"q": filters_key, "after": ":".join(str(k) for k in last_key)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def _decode_cursor(cursor: str, filters_key: str) -> Tuple[ObjectId, ...]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        after = tuple(ObjectId(k) for k in payload["after"].split(":"))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if payload.get("q") != filters_key:
+        raise ValueError("Cursor belongs to a different search")
+    return after
+
+def _last_key(doc: Dict[str, Any]) -> Tuple[Any, ...]:
+    return (doc["_company_oid"], doc["_id"]) if "_company_oid" in doc else (doc["_id"],)
+
+def _people_by_company(company_conds: List[Dict[str, Any]], user_id: Optional[str],
+                       after: Optional[Tuple[ObjectId, ...]], limit: Optional[int],
+                       fields: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Company-only people pages: matching companies in _id order (through the
+    (owner, ...) indexes), each followed by its people in _id order on the
+    (employment.company_id, _id) index. Only the company the cursor stopped in
+    is filtered on person _id. Someone employed at two matching companies is
+    listed under each.
+    """
+    if after is not None and len(after) != 2:
+        raise ValueError("Invalid cursor")
+    company_keyset = [{"_id": {"$gte": after[0]}}] if after else []
+    people_stages: List[Dict[str, Any]] = [{"$match": owner_scope(user_id)}]
+    if after:
+        people_stages.append({"$match": {"$expr": {"$or": [
+            {"$ne": ["$$company_oid", after[0]]}, {"$gt": ["$_id", after[1]]},
+        ]}}})
+    people_stages += [{"$sort": {"_id": 1}}] + ([{"$limit": limit}] if limit else []) + [{"$project": fields}]
+
+    pipeline = [
+        {"$match": _scoped(company_conds + company_keyset, user_id)},
+        {"$sort": {"_id": 1}},
+        {"$lookup": {
+            "from": "people",
+            "localField": "company_id",
+            "foreignField": "employment.company_id",
+            "let": {"company_oid": "$_id"},
+            "pipeline": people_stages,
+            "as": "_people",
+        }},
+        {"$unwind": "$_people"},
+        {"$replaceWith": {"$mergeObjects": ["$_people", {"_company_oid": "$_id"}]}},
+    ]
+    return pipeline + ([{"$limit": limit}] if limit else [])
+
+def _kind_cursor(icp_filters: dict, user_id: Optional[str], kind: str, after: Optional[Tuple[ObjectId, ...]] = None,
+                 limit: Optional[int] = None, batch_size: Optional[int] = None, motor: bool = False):
+    """Mongo cursor over one result kind in key order, starting after `after` (a Motor cursor if `motor`)."""
+    if kind not in SEARCH_KINDS:
+        raise ValueError(f"kind must be one of {', '.join(SEARCH_KINDS)}")
+    company_conds = _company_conditions(icp_filters)
+    roles_cond = _roles_cond(icp_filters.get("roles"))
+    fields = {**(PERSON_RESULT_FIELDS if kind == "people" else COMPANY_RESULT_FIELDS), "_id": 1}
+
+    if kind == "people" and company_conds and not roles_cond:
+        # The people $match would be just the owner scope: drive from companies (as build_search_pipeline does)
+        companies = get_async_company_collection() if motor else get_company_collection()
+        pipeline = _people_by_company(company_conds, user_id, after, limit, fields)
+        return companies.aggregate(pipeline, batchSize=batch_size or STREAM_BATCH)
+
+    if after is not None and len(after) != 1:
+        raise ValueError("Invalid cursor")
+    keyset = [{"_id": {"$gt": after[0]}}] if after else []
+
+    if kind == "companies":
+        companies = get_async_company_collection() if motor else get_company_collection()
+        cursor = companies.find(
+            _scoped(company_conds + keyset, user_id), fields, sort=[("_id", 1)], batch_size=batch_size or 0,
+        )
+        return cursor.limit(limit) if limit else cursor
+
+    people_query = _scoped(([roles_cond] if roles_cond else []) + keyset, user_id)
+    # Sorting right after the $match (before the join) keeps the $lookup lazy:
+    # it stops as soon as `limit` people have passed the company filters
+    stages = _people_stages(company_conds, people_query, _scoped(company_conds, user_id))
+    pipeline = stages[:1] + [{"$sort": {"_id": 1}}] + stages[1:]
+    if limit:
+        pipeline.append({"$limit": limit})
+    pipeline.append({"$project": fields})
+    people = get_async_people_collection() if motor else get_people_collection()
+    return people.aggregate(pipeline, batchSize=batch_size or STREAM_BATCH)
+
+def search_page(icp_filters: dict, user_id: Optional[str] = None, kind: str = "people",
+                limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """One page of `kind` results plus `next_cursor` (None on the last page)."""
+    filters_key = search_cache.cache_key(icp_filters, user_id, kind=kind)
+    after = _decode_cursor(cursor, filters_key) if cursor else None
+
+    docs = list(_kind_cursor(icp_filters, user_id, kind, after, limit=limit + 1))
+    return _page(docs, kind, limit, filters_key)
+
+def _page(docs: List[Dict[str, Any]], kind: str, limit: int, filters_key: str) -> Dict[str, Any]:
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    shape = shape_person if kind == "people" else shape_company
+    return {
+        kind: [shape(d) for d in docs],
+        "next_cursor": _encode_cursor(filters_key, _last_key(docs[-1])) if has_more and docs else None,
+    }
+
+def stream_search(icp_filters: dict, user_id: Optional[str] = None, kinds: Tuple[str, ...] = SEARCH_KINDS,
+                  limit: Optional[int] = None) -> Iterator[str]:
+    """
+    NDJSON lines ({"type": "company"|"person", ...}) read straight off the Mongo
+    cursor in batches of STREAM_BATCH, so memory stays flat however many rows match.
+    """
+    for kind in kinds:
+        for doc in _kind_cursor(icp_filters, user_id, kind, limit=limit, batch_size=STREAM_BATCH):
+            yield _stream_line(kind, doc)
+
+def _stream_line(kind: str, doc: Dict[str, Any]) -> str:
+    shape = shape_person if kind == "people" else shape_company
+    row_type = "person" if kind == "people" else "company"
+    return json.dumps({"type": row_type, **shape(doc)}, default=str) + "\n"
+
+# ======================= Async (Motor) =======================
+# The same searches for the async routes: the queries and pipelines built
+# above, run on the Motor client (app/db/async_collections.py) so the event
+# loop isn't blocked on Mongo. In-process work that can take a while (BM25
+# index rebuilds, relevance scoring, facet extrapolation) runs in the threadpool.
+
+async def search_icp_async(icp_filters: dict, user_id: str | None = None, limit: int = 20, mode: str = "filter"):
+    """search_icp() on Motor; same modes, same cache."""
+    # The cache may read/write its SQLite store (SEARCH_CACHE_DB): keep that off the loop
+    key, versions, cached = await run_in_threadpool(_cached_search, icp_filters, user_id, limit, mode)
+    if cached is not None:
+        return cached
+
+    if mode == "ranked":
+        # The BM25 index is in-process and rebuilt from pymongo when stale
+        results = await run_in_threadpool(_ranked_search, icp_filters, user_id, limit)
+    elif mode == "prospects":
+        results = await _prospect_search_async(icp_filters, user_id, limit)
+    elif mode == "scored":
+        candidates = await _scored_candidates(get_async_prospects_collection(), icp_filters, user_id).to_list(None)
+        results = await run_in_threadpool(_scored_results, candidates, icp_filters, limit)
+    else:
+        source, pipeline = _filter_pipeline(icp_filters, user_id, limit)
+        coll = get_async_company_collection() if source == "companies" else get_async_people_collection()
+        docs = await coll.aggregate(pipeline).to_list(None)
+        results = shape_results(*_split_results(docs))
+    await run_in_threadpool(search_cache.put, key, versions, results)
+    return results
+
+async def _prospect_search_async(icp_filters: dict, user_id: str | None, limit: int):
+    prospects = get_async_prospects_collection()
+    people_query, company_query = _prospect_queries(icp_filters, user_id)
+    people = await prospects.find(people_query, PROSPECT_PERSON_FIELDS).limit(limit).to_list(limit)
+
+    companies: Dict[str, Dict[str, Any]] = {}
+    cursor = prospects.find(company_query, PROSPECT_COMPANY_FIELDS).batch_size(limit * 4)
+    async for row in cursor:
+        companies.setdefault(row["company_id"], row)
+        if len(companies) >= limit:
+            break
+    await cursor.close()
+    return _prospect_results(people, companies)
+
+async def _capped_count_async(coll, query: Dict[str, Any]) -> Optional[int]:
+    try:
+        return await coll.count_documents(query, limit=ESTIMATE_CAP, maxTimeMS=ESTIMATE_MAX_TIME_MS)
+    except ExecutionTimeout:
+        return None
+
+async def estimate_icp_async(icp_filters: dict, user_id: Optional[str] = None) -> Dict[str, Any]:
+    """estimate_icp() on Motor."""
+    company_conds = _company_conditions(icp_filters)
+    roles_cond = _roles_cond(icp_filters.get("roles"))
+
+    companies = await _capped_count_async(get_async_company_collection(), _scoped(company_conds, user_id))
+    prospects = get_async_prospects_collection()
+    people = None
+    if await prospects.estimated_document_count():
+        people = await _capped_count_async(
+            prospects, _scoped(company_conds + ([roles_cond] if roles_cond else []), user_id),
+        )
+
+    method = "index_count" if companies is not None and people is not None else "facets"
+    if companies is None:
+        companies = await run_in_threadpool(_facet_estimate, icp_filters, user_id, "companies")
+    if people is None:
+        people = await run_in_threadpool(_facet_estimate, icp_filters, user_id, "people")
+    return _estimate_result(companies, people, method)
+
+async def search_page_async(icp_filters: dict, user_id: Optional[str] = None, kind: str = "people",
+                            limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """search_page() on Motor."""
+    filters_key = search_cache.cache_key(icp_filters, user_id, kind=kind)
+    after = _decode_cursor(cursor, filters_key) if cursor else None
+
+    docs = await _kind_cursor(icp_filters, user_id, kind, after, limit=limit + 1, motor=True).to_list(limit + 1)
+    return _page(docs, kind, limit, filters_key)
+
+async def stream_search_async(icp_filters: dict, user_id: Optional[str] = None,
+                              kinds: Tuple[str, ...] = SEARCH_KINDS, limit: Optional[int] = None) -> AsyncIterator[str]:
+    """stream_search() on Motor: NDJSON lines, STREAM_BATCH documents per round trip."""
+    for kind in kinds:
+        async for doc in _kind_cursor(icp_filters, user_id, kind, limit=limit, batch_size=STREAM_BATCH, motor=True):
+            yield _stream_line(kind, doc)
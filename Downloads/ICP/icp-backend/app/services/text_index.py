@@ -0,0 +1,321 @@
+import math
+import re
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from app.db.collections import get_company_collection, get_people_collection
+from app.db.owner import GLOBAL_OWNER, owner_of, visible_owners
+from app.services import geo, search_cache
+from app.services.role_index import canonical_tokens, role_query_ids, title_roles
+from app.services.search_fields import person_title
+
+# In-process BM25 full-text index behind search_icp(mode="ranked").
+#
+# Two indexes are kept: people (title, role ids, employer name, industry and
+# location) and companies (name, industry, location). Tokens are prefixed with
+# their field ("t:cto", "i:software", "l:india") so a word only matches in the
+# field it was searched for. Postings are compact arrays (doc slot ids as
+# uint32, term frequencies as uint16) and scoring is vectorized with NumPy.
+#
+# The index is built lazily from Mongo on the first ranked search and updated
+# incrementally by imports running in this process. When the data versions in
+# search_cache show another worker imported into a scope, one background thread
+# reloads just that scope (a global change, or too many tombstones, rebuilds
+# everything) while searches keep using the current index.
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+def _words(value: Any) -> List[str]:
+    if value is None or (isinstance(value, float) and value != value):
+        return []
+    return _WORD.findall(str(value).casefold())
+
+def _field(prefix: str, tokens: Iterable[str]) -> List[str]:
+    return [f"{prefix}:{t}" for t in tokens]
+
+class BM25Index:
+    """Append-only inverted index; re-adding a key tombstones its old slot."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._keys: List[str] = []
+        self._slot: Dict[str, int] = {}
+        self._sig: Dict[str, int] = {}
+        self._scope_codes: Dict[str, int] = {}
+        self._scopes = array("I")
+        self._lengths = array("I")
+        self._alive = bytearray()
+        self._live_count = 0
+        self._live_length = 0
+        self._docs: Dict[str, array] = {}
+        self._tfs: Dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return self._live_count
+
+    @property
+    def dead(self) -> int:
+        """Tombstoned slots still holding postings."""
+        return len(self._keys) - self._live_count
+
+    def _kill(self, slot: int):
+        if self._alive[slot]:
+            self._alive[slot] = 0
+            self._live_count -= 1
+            self._live_length -= self._lengths[slot]
+
+    def drop_scope(self, scope: str):
+        """Tombstone every live document of a scope."""
+        code = self._scope_codes.get(scope)
+        if code is None:
+            return
+        alive = np.frombuffer(bytes(self._alive), dtype=np.uint8).astype(bool)
+        for slot in np.flatnonzero(alive & (np.frombuffer(self._scopes, dtype=np.uint32) == code)).tolist():
+            self._kill(slot)
+            key = self._keys[slot]
+            self._sig.pop(key, None)
+            self._slot.pop(key, None)
+
+    def add(self, key: str, tokens: List[str], scope: str):
+        """Index (or re-index) one document. A no-op if its tokens and scope didn't change."""
+        sig = hash((scope, tuple(tokens)))
+        if self._sig.get(key) == sig:
+            return
+        if key in self._slot:
+            self._kill(self._slot[key])
+
+        slot = len(self._keys)
+        self._keys.append(key)
+        self._slot[key] = slot
+        self._sig[key] = sig
+        self._scopes.append(self._scope_codes.setdefault(scope, len(self._scope_codes)))
+        self._lengths.append(len(tokens))
+        self._alive.append(1)
+        self._live_count += 1
+        self._live_length += len(tokens)
+
+        tf: Dict[str, int] = {}
+        for t in tokens:
+            tf[t] = tf.get(t, 0) + 1
+        for t, n in tf.items():
+            if t not in self._docs:
+                self._docs[t] = array("I")
+                self._tfs[t] = array("H")
+            self._docs[t].append(slot)
+            self._tfs[t].append(min(n, 65535))
+
+    def search(self, query: List[str], scopes: List[str], k: int) -> List[Tuple[str, float]]:
+        """Top-k (key, score) by BM25 among live documents in `scopes`."""
+        n = len(self._keys)
+        codes = [self._scope_codes[s] for s in scopes if s in self._scope_codes]
+        if not n or not codes or not self._live_count:
+            return []
+
+        lengths = np.frombuffer(self._lengths, dtype=np.uint32).astype(np.float32)
+        avgdl = self._live_length / self._live_count or 1.0
+        scores = np.zeros(n, dtype=np.float32)
+        for t in dict.fromkeys(query):
+            docs = self._docs.get(t)
+            if not docs:
+                continue
+            slots = np.frombuffer(docs, dtype=np.uint32)
+            tf = np.frombuffer(self._tfs[t], dtype=np.uint16).astype(np.float32)
+            # df counts tombstoned postings too; close enough between rebuilds
+            df = len(slots)
+            idf = math.log(1 + (self._live_count - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths[slots] / avgdl)
+            # each term has at most one posting per slot, so plain fancy-index += is safe
+            scores[slots] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        mask = np.frombuffer(bytes(self._alive), dtype=np.uint8).astype(bool)
+        mask &= np.isin(np.frombuffer(self._scopes, dtype=np.uint32), codes)
+        mask &= scores > 0
+        candidates = np.flatnonzero(mask)
+        if not len(candidates):
+            return []
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self._keys[i], float(scores[i])) for i in candidates]
+
+# ======================= Documents =======================
+
+def company_tokens(name: Any, industry: Any, location: Any) -> List[str]:
+    """Location adds its ISO codes ("g:us", "g:us-ca") so "USA" and "United States" match."""
+    codes = [c.casefold() for c in geo.resolve(location) if c]
+    return (_field("c", _words(name)) + _field("i", _words(industry)) + _field("l", _words(location))
+            + _field("g", codes))
+
+def person_tokens(title: Any, role_ids: Optional[List[str]], company: List[str]) -> List[str]:
+    """`company` is the employer's company_tokens()."""
+    if role_ids is None:
+        role_ids = title_roles(title)["role_ids"]
+    return _field("t", canonical_tokens(title)) + _field("r", role_ids) + company
+
+def query_tokens(icp_filters: dict) -> Tuple[List[str], List[str]]:
+    """(people query, companies query) tokens for an ICP."""
+    def values(key):
+        v = icp_filters.get(key)
+        return v if isinstance(v, (list, tuple)) else ([v] if v else [])
+
+    company: List[str] = []
+    for v in values("industry"):
+        company += _field("i", _words(v))
+    for v in values("geography"):
+        company += _field("l", _words(v))
+    countries, subdivisions, _ = geo.query_codes(values("geography"))
+    company += _field("g", [c.casefold() for c in countries + subdivisions])
+    people = list(company)
+    for role in values("roles"):
+        people += _field("t", canonical_tokens(role)) + _field("r", role_query_ids(str(role)))
+    return people, company
+
+# ======================= Module state =======================
+
+_lock = threading.RLock()
+# Held while reading Mongo for a build or a scope reload: one at a time
+_build_lock = threading.Lock()
+_people = BM25Index()
+_companies = BM25Index()
+_company_tokens: Dict[str, List[str]] = {}
+_built = False
+_versions: Dict[str, int] = {}
+_refresh_thread: Optional[threading.Thread] = None
+
+COMPANY_FIELDS = {"_id": 0, "company_id": 1, "owner": 1, "user_id": 1, "name": 1, "industry": 1,
+                  "location": 1, "country": 1}
+PERSON_FIELDS = {"_id": 0, "person_id": 1, "owner": 1, "user_id": 1, "role_ids": 1, "employment.company_id": 1,
+                 "employment.title": 1, "Designation": 1, "Title": 1}
+
+def _owner(doc: dict) -> str:
+    return doc.get("owner") or owner_of(doc.get("user_id"))
+
+def _load(query: Dict[str, Any], company_tokens_by_id: Dict[str, List[str]]):
+    """(companies, people) as (key, tokens, scope) lists for the documents matching `query`."""
+    companies = []
+    for c in get_company_collection().find({"company_id": {"$exists": True}, **query}, COMPANY_FIELDS, batch_size=1000):
+        toks = company_tokens(c.get("name"), c.get("industry"), c.get("location") or c.get("country"))
+        company_tokens_by_id[c["company_id"]] = toks
+        companies.append((c["company_id"], toks, _owner(c)))
+
+    people = []
+    for p in get_people_collection().find({"person_id": {"$exists": True}, **query}, PERSON_FIELDS, batch_size=1000):
+        emp = p.get("employment")
+        company_id = emp[0].get("company_id") if isinstance(emp, list) and emp and isinstance(emp[0], dict) else None
+        toks = person_tokens(person_title(p), p.get("role_ids"), company_tokens_by_id.get(company_id, []))
+        people.append((p["person_id"], toks, _owner(p)))
+    return companies, people
+
+def _rebuild():
+    global _people, _companies, _company_tokens, _built
+    people, companies, by_id = BM25Index(), BM25Index(), {}
+    company_docs, people_docs = _load({}, by_id)
+    for key, toks, scope in company_docs:
+        companies.add(key, toks, scope)
+    for key, toks, scope in people_docs:
+        people.add(key, toks, scope)
+
+    with _lock:
+        _people, _companies, _company_tokens, _built = people, companies, by_id, True
+        _versions.clear()
+    print(f"✅ Text index built: {len(companies)} companies, {len(people)} people")
+
+def rebuild():
+    """Rebuild both indexes from Mongo (full scan of companies and people)."""
+    with _build_lock:
+        _rebuild()
+
+def _reload_scope(scope: str):
+    """Replace one scope's documents (read outside the index lock, swapped in under it)."""
+    # Company ids are scoped, so a scope's people only reference its own companies
+    by_id: Dict[str, List[str]] = {}
+    company_docs, people_docs = _load({"owner": scope}, by_id)
+    with _lock:
+        _companies.drop_scope(scope)
+        _people.drop_scope(scope)
+        for key, toks, s in company_docs:
+            _companies.add(key, toks, s)
+        for key, toks, s in people_docs:
+            _people.add(key, toks, s)
+        _company_tokens.update(by_id)
+    print(f"✅ Text index scope {scope} reloaded: {len(company_docs)} companies, {len(people_docs)} people")
+
+def _refresh(stale: Dict[str, int]):
+    """Bring stale scopes up to the versions read before loading them."""
+    try:
+        with _build_lock:
+            # A Vault import touches most of the data, and tombstones cost memory and df accuracy
+            if GLOBAL_OWNER in stale or _people.dead > len(_people):
+                _rebuild()
+            else:
+                for scope in stale:
+                    _reload_scope(scope)
+            with _lock:
+                _versions.update(stale)
+    except Exception as e:
+        print(f"⚠️ Text index refresh failed: {e}")
+
+def ensure_current(user_id: Optional[str]):
+    """
+    Build on first use (other callers wait for that one build). If the global or
+    user data changed outside this process, refresh those scopes in a single
+    background thread and keep serving the current index meanwhile.
+    """
+    global _refresh_thread
+    current = search_cache.data_versions(user_id)[:2 if user_id else 1]
+    versions = dict(zip(visible_owners(user_id), current))
+    if not _built:
+        with _build_lock:
+            if not _built:
+                _rebuild()
+                with _lock:
+                    _versions.update(versions)
+        return
+
+    with _lock:
+        stale = {s: v for s, v in versions.items() if _versions.setdefault(s, v) != v}
+        if not stale or (_refresh_thread is not None and _refresh_thread.is_alive()):
+            return
+        _refresh_thread = threading.Thread(target=_refresh, args=(stale,), name="text-index-refresh", daemon=True)
+        _refresh_thread.start()
+
+def mark_current(user_id: Optional[str]):
+    """Called after an import in this process bumped a scope's version (its chunks are already indexed)."""
+    version = search_cache.data_versions(user_id)[1 if user_id else 0]
+    with _lock:
+        if _built:
+            _versions[owner_of(user_id)] = version
+
+def index_import_chunk(user_id: Optional[str], records: List[dict], person_docs: List[dict], company_ids: Dict[str, str]):
+    """Incrementally index one written import chunk (records and person_docs are aligned)."""
+    with _lock:
+        if not _built:
+            return  # the lazy build will read these rows from Mongo
+        scope = owner_of(user_id)
+        first_by_company: Dict[str, dict] = {}
+        for r in records:
+            first_by_company.setdefault(r["company"], r)
+        for name, company_id in company_ids.items():
+            if company_id in _company_tokens:
+                continue
+            r = first_by_company[name]
+            toks = company_tokens(name, r["industry"], r["country"])
+            _company_tokens[company_id] = toks
+            _companies.add(company_id, toks, scope)
+        for r, doc in zip(records, person_docs):
+            company = _company_tokens.get(company_ids.get(r["company"]), [])
+            _people.add(doc["person_id"], person_tokens(r["title"], doc.get("role_ids"), company), scope)
+
+def rank_people(icp_filters: dict, user_id: Optional[str], k: int) -> List[Tuple[str, float]]:
+    query, _ = query_tokens(icp_filters)
+    scopes = visible_owners(user_id)
+    with _lock:
+        return _people.search(query, scopes, k)
+
+def rank_companies(icp_filters: dict, user_id: Optional[str], k: int) -> List[Tuple[str, float]]:
+    _, query = query_tokens(icp_filters)
+    scopes = visible_owners(user_id)
+    with _lock:
+        return _companies.search(query, scopes, k)
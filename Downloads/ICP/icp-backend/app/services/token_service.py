@@ -1,5 +1,6 @@
 from datetime import datetime
 from app.db.collections import get_refresh_tokens_collection
+from app.db.async_collections import get_async_refresh_tokens_collection
 
 def save_refresh_token(user_id: str, token: str, expires_at: datetime):
     coll = get_refresh_tokens_collection()
@@ -22,3 +23,26 @@ def is_refresh_token_valid(token: str) -> bool:
         return False
     # ✅ Also check expiration
     return record["expires_at"] > datetime.utcnow()
+
+# ======================= Async (Motor) =======================
+
+async def save_refresh_token_async(user_id: str, token: str, expires_at: datetime):
+    coll = get_async_refresh_tokens_collection()
+    await coll.insert_one({
+        "user_id": user_id,
+        "token": token,
+        "expires_at": expires_at,
+        "created_at": datetime.utcnow(),
+        "revoked": False
+    })
+
+async def revoke_refresh_token_async(token: str):
+    coll = get_async_refresh_tokens_collection()
+    await coll.update_one({"token": token}, {"$set": {"revoked": True}})
+
+async def is_refresh_token_valid_async(token: str) -> bool:
+    coll = get_async_refresh_tokens_collection()
+    record = await coll.find_one({"token": token, "revoked": False})
+    if not record:
+        return False
+    return record["expires_at"] > datetime.utcnow()
@@ -0,0 +1,55 @@
+import hashlib
+import os
+import uuid
+from fastapi import UploadFile
+from app.core.config import settings
+
+UPLOAD_DIR = "uploads"
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+# Large blocks keep the copy to a handful of syscalls even for 100MB+ workbooks
+COPY_BLOCK_BYTES = 8 << 20
+
+class UploadTooLarge(ValueError):
+    pass
+
+def save_upload(file: UploadFile, max_bytes: int | None = None) -> dict:
+    """
+    Copy an upload into UPLOAD_DIR in large blocks, hashing it on the way.
+    Enforces `max_bytes` while copying and removes the partial file on any error.
+    Returns {"path", "sha256", "size_bytes"}.
+    """
+    max_bytes = max_bytes or settings.MAX_UPLOAD_BYTES
+    # Reject early when the client (or Starlette) already knows the size
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLarge(f"Upload exceeds {max_bytes // (1 << 20)} MB limit")
+
+    # Keep only the base name so a crafted filename can't escape UPLOAD_DIR
+    safe_name = os.path.basename(file.filename or "upload")
+    path = os.path.join(UPLOAD_DIR, f"{uuid.uuid4()}_{safe_name}")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(path, "wb", buffering=COPY_BLOCK_BYTES) as out:
+            while True:
+                block = file.file.read(COPY_BLOCK_BYTES)
+                if not block:
+                    break
+                size += len(block)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes // (1 << 20)} MB limit")
+                digest.update(block)
+                out.write(block)
+    except BaseException:
+        discard_upload(path)
+        raise
+
+    return {"path": path, "sha256": digest.hexdigest(), "size_bytes": size}
+
+def discard_upload(path: str | None):
+    """Remove a saved upload; safe to call more than once."""
+    if path and os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"⚠️ Could not remove upload {path}: {e}")
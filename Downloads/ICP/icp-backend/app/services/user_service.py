@@ -1,5 +1,6 @@
 from bson import ObjectId
 from app.db.collections import get_user_collection
+from app.db.async_collections import get_async_user_collection
 from app.models.user import User
 
 def create_user(user: User) -> str:
@@ -14,3 +15,18 @@ def get_user_by_email(email: str):
 def get_user_by_id(user_id: str):
     users = get_user_collection()
     return users.find_one({"_id": ObjectId(user_id)})
+
+# ======================= Async (Motor) =======================
+
+async def create_user_async(user: User) -> str:
+    users = get_async_user_collection()
+    result = await users.insert_one(user.dict(by_alias=True))
+    return str(result.inserted_id)
+
+async def get_user_by_email_async(email: str):
+    users = get_async_user_collection()
+    return await users.find_one({"email": email})
+
+async def get_user_by_id_async(user_id: str):
+    users = get_async_user_collection()
+    return await users.find_one({"_id": ObjectId(user_id)})
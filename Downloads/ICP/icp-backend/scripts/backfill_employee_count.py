@@ -0,0 +1,53 @@
+import sys
+import os
+
+# ✅ Add project root to sys.path so "app" can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import UpdateOne
+from app.db.mongodb import db
+from app.services.search_fields import employee_count_value, size_range
+
+BATCH = 1000
+
+# Raw head-count columns seen in older Vault / user imports
+RAW_FIELDS = ["employee_count", "# Employees", "Employees", "Employee Count", "employees"]
+
+def employee_count_for(c: dict):
+    """(employee_count, estimated) for a company document, or (None, False)."""
+    for field in RAW_FIELDS:
+        n = employee_count_value(c.get(field))
+        if n is not None:
+            return n, False
+    # Only a bucket label ("51-200"): store its lower bound and flag it as an estimate
+    rng = size_range(c.get("size"))
+    if rng and rng.get("min") is not None:
+        return rng["min"], True
+    return None, False
+
+def backfill_employee_count():
+    """Write a numeric employee_count on every company that doesn't have one yet."""
+    ops, filled, estimated, missing = [], 0, 0, 0
+    cursor = db.companies.find(
+        {"employee_count": {"$not": {"$type": "number"}}},
+        {field: 1 for field in RAW_FIELDS + ["size"]},
+    )
+    for c in cursor:
+        n, is_estimate = employee_count_for(c)
+        if n is None:
+            missing += 1
+            continue
+        ops.append(UpdateOne({"_id": c["_id"]}, {"$set": {"employee_count": n, "employee_count_estimated": is_estimate}}))
+        filled += 1
+        estimated += is_estimate
+        if len(ops) >= BATCH:
+            db.companies.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        db.companies.bulk_write(ops, ordered=False)
+    print(f"✅ employee_count written: {filled} ({estimated} from size buckets), {missing} without any size data")
+
+
+if __name__ == "__main__":
+    # Re-runnable: only touches companies without a numeric employee_count.
+    backfill_employee_count()
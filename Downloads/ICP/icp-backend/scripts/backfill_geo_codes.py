@@ -0,0 +1,47 @@
+import sys
+import os
+
+# ✅ Add project root to sys.path so "app" can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import UpdateOne
+from app.db.mongodb import db
+from app.services.geo import geo_fields
+
+BATCH = 1000
+
+# Legacy India Vault rows were imported without a Country column. Search used to
+# treat "no country" as India at query time; this writes that default instead.
+LEGACY_VAULT_COUNTRY = "India"
+
+def _flush(coll, ops):
+    if ops:
+        coll.bulk_write(ops, ordered=False)
+    return []
+
+def backfill(coll, location_fields: list, write_field: str):
+    """Write country_code / subdivision_code on every document of `coll`."""
+    ops, resolved, defaulted, unknown = [], 0, 0, 0
+    cursor = coll.find({}, {"user_id": 1, **{f: 1 for f in location_fields}})
+    for doc in cursor:
+        location = next((doc[f] for f in location_fields if doc.get(f) not in (None, "")), None)
+        update = {}
+        if location is None and not doc.get("user_id"):
+            location = update[write_field] = LEGACY_VAULT_COUNTRY
+            defaulted += 1
+        update.update(geo_fields(location))
+        if update["country_code"]:
+            resolved += 1
+        else:
+            unknown += 1
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": update}))
+        if len(ops) >= BATCH:
+            ops = _flush(coll, ops)
+    _flush(coll, ops)
+    print(f"✅ {coll.name}: {resolved} resolved ({defaulted} defaulted to {LEGACY_VAULT_COUNTRY}), {unknown} unknown")
+
+
+if __name__ == "__main__":
+    # Re-runnable. Run scripts/rebuild_facets.py afterwards (the country facet is keyed by country_code).
+    backfill(db.companies, ["location", "country", "Country"], "location")
+    backfill(db.people, ["country", "Country", "location"], "country")
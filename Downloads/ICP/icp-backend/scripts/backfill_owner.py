@@ -0,0 +1,25 @@
+import sys
+import os
+
+# ✅ Add project root to sys.path so "app" can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.mongodb import db
+from app.db.owner import GLOBAL_OWNER, owner_of
+
+def backfill_owner(coll):
+    """Write `owner` on every document: "global" for missing/null user_id, else str(user_id)."""
+    # {"user_id": None} also matches documents without the field
+    n = coll.update_many({"user_id": None}, {"$set": {"owner": GLOBAL_OWNER}}).modified_count
+    # One update per distinct owner; ObjectId and string user ids end up as the same string
+    for user_id in coll.distinct("user_id", {"user_id": {"$ne": None}}):
+        n += coll.update_many({"user_id": user_id}, {"$set": {"owner": owner_of(user_id)}}).modified_count
+    missing = coll.count_documents({"owner": {"$exists": False}})
+    print(f"✅ {coll.name}: owner written on {n} documents, {missing} still without owner")
+
+
+if __name__ == "__main__":
+    # Re-runnable. Run before deploying the owner-scoped search (documents without owner are invisible to it),
+    # then `scripts/manage_indexes.py apply` and `prune` to build the (owner, ...) indexes and drop the old ones.
+    backfill_owner(db.companies)
+    backfill_owner(db.people)
@@ -0,0 +1,51 @@
+import sys
+import os
+
+# ✅ Add project root to sys.path so "app" can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import UpdateOne
+from app.db.mongodb import db
+from app.services.search_fields import company_search_fields, person_search_fields
+
+BATCH = 1000
+
+def _flush(coll, ops):
+    if ops:
+        coll.bulk_write(ops, ordered=False)
+    return []
+
+def backfill_companies() -> dict:
+    """Write normalized search fields on every company. Returns company_id -> name."""
+    names = {}
+    ops, n = [], 0
+    for c in db.companies.find({}):
+        if c.get("company_id") and c.get("name"):
+            names[c["company_id"]] = c["name"]
+        ops.append(UpdateOne({"_id": c["_id"]}, {"$set": company_search_fields(c)}))
+        n += 1
+        if len(ops) >= BATCH:
+            ops = _flush(db.companies, ops)
+    _flush(db.companies, ops)
+    print(f"✅ Companies backfilled: {n}")
+    return names
+
+def backfill_people(company_names: dict):
+    """Write normalized search fields on every person, resolving company names via employment.company_id."""
+    ops, n = [], 0
+    for p in db.people.find({}):
+        company_name = None
+        emp = p.get("employment")
+        if isinstance(emp, list) and emp and isinstance(emp[0], dict):
+            company_name = company_names.get(emp[0].get("company_id"))
+        ops.append(UpdateOne({"_id": p["_id"]}, {"$set": person_search_fields(p, company_name)}))
+        n += 1
+        if len(ops) >= BATCH:
+            ops = _flush(db.people, ops)
+    _flush(db.people, ops)
+    print(f"✅ People backfilled: {n}")
+
+
+if __name__ == "__main__":
+    # One-off (re-runnable) backfill for records imported before the *_norm fields existed.
+    backfill_people(backfill_companies())
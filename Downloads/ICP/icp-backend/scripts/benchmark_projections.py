@@ -0,0 +1,68 @@
+import sys
+import os
+import time
+
+# ✅ Add project root to sys.path so "app" can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bson
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from app.db.mongodb import db
+from app.services.search_service import COMPANY_RESULT_FIELDS, PERSON_RESULT_FIELDS
+from app.services.prospect_service import PROSPECT_LIST_SUMMARY_FIELDS
+from app.services.conversation_service import CONVERSATION_LIST_FIELDS
+
+# Documents are fetched as RawBSONDocument so the byte count is what came over
+# the wire and decode time can be measured separately from the query.
+RAW = CodecOptions(document_class=RawBSONDocument)
+
+LIMIT = 500
+
+def _sample_user_id(coll_name: str):
+    doc = db[coll_name].find_one({"user_id": {"$exists": True}}, {"user_id": 1})
+    return doc["user_id"] if doc else None
+
+def _queries():
+    yield "search: companies", "companies", {}, COMPANY_RESULT_FIELDS
+    yield "search: people", "people", {}, PERSON_RESULT_FIELDS
+    uid = _sample_user_id("prospect_lists")
+    if uid is not None:
+        yield "list_prospect_lists", "prospect_lists", {"user_id": uid}, PROSPECT_LIST_SUMMARY_FIELDS
+    uid = _sample_user_id("conversations")
+    if uid is not None:
+        yield "list_user_conversations", "conversations", {"user_id": uid}, CONVERSATION_LIST_FIELDS
+
+def _measure(coll_name: str, query: dict, projection: dict | None) -> dict:
+    coll = db.get_collection(coll_name, codec_options=RAW)
+    t0 = time.perf_counter()
+    docs = list(coll.find(query, projection).limit(LIMIT))
+    fetch = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for d in docs:
+        bson.decode(d.raw)
+    decode = time.perf_counter() - t0
+
+    return {
+        "docs": len(docs),
+        "bytes": sum(len(d.raw) for d in docs),
+        "fetch_ms": fetch * 1000,
+        "decode_ms": decode * 1000,
+    }
+
+def run():
+    print(f"{'query':<26}{'docs':>6}{'full KB':>10}{'proj KB':>10}{'bytes':>8}{'decode full':>13}{'decode proj':>13}")
+    for label, coll_name, query, projection in _queries():
+        full = _measure(coll_name, query, None)
+        proj = _measure(coll_name, query, projection)
+        saved = 1 - proj["bytes"] / full["bytes"] if full["bytes"] else 0
+        print(
+            f"{label:<26}{full['docs']:>6}{full['bytes'] / 1024:>10.1f}{proj['bytes'] / 1024:>10.1f}"
+            f"{-saved:>8.0%}{full['decode_ms']:>11.2f}ms{proj['decode_ms']:>11.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    # Read-only: compares whole documents against the projections the services use.
+    run()
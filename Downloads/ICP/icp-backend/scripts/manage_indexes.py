@@ -0,0 +1,53 @@
+import sys
+import os
+
+# ✅ Add project root to sys.path so "app" can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.indexes import ensure_indexes, index_drift, drop_extra_indexes, check_query_plans
+
+USAGE = "Usage: python scripts/manage_indexes.py <apply|drift|prune|explain>"
+
+def apply():
+    errors = ensure_indexes()
+    if errors:
+        print(f"❌ Some indexes could not be created: {errors}")
+        return 1
+    print("✅ All registered indexes present")
+    return 0
+
+def drift():
+    report = index_drift()
+    if not report:
+        print("✅ Live indexes match the registry")
+        return 0
+    for coll, diff in report.items():
+        for kind, names in diff.items():
+            for name in names:
+                print(f"⚠️ {coll}: {kind} {name}")
+    return 1
+
+def prune():
+    dropped = drop_extra_indexes()
+    for name in dropped:
+        print(f"🗑️ Dropped {name}")
+    print(f"✅ {len(dropped)} unregistered indexes dropped")
+    return 0
+
+def explain():
+    failures = check_query_plans()
+    if not failures:
+        print("✅ Every canonical query is served by a selective index")
+        return 0
+    for f in failures:
+        print(f"❌ {f['problem']} in {f['service']}: {f['collection']}.find({f['query']}) sort={f['sort']}")
+    return 1
+
+
+if __name__ == "__main__":
+    commands = {"apply": apply, "drift": drift, "prune": prune, "explain": explain}
+    if len(sys.argv) != 2 or sys.argv[1] not in commands:
+        print(USAGE)
+        sys.exit(1)
+    # Non-zero exit on drift / unindexed plans so this can gate a deploy
+    sys.exit(commands[sys.argv[1]]())
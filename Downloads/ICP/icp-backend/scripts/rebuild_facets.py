@@ -0,0 +1,14 @@
+import sys
+import os
+
+# ✅ Add project root to sys.path so "app" can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.facet_service import rebuild_facets
+
+
+if __name__ == "__main__":
+    # Imports add counts for records they insert and move updated ones between
+    # buckets; run this after backfills, deletes or direct edits (re-runnable).
+    n = rebuild_facets()
+    print(f"✅ Facet stats rebuilt: {n} values")
@@ -0,0 +1,12 @@
+import sys
+import os
+
+# ✅ Add project root to sys.path so "app" can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.prospect_view import rebuild_prospects
+
+
+if __name__ == "__main__":
+    # Initial build of the prospects read model; re-run if it ever drifts from companies/people.
+    rebuild_prospects()
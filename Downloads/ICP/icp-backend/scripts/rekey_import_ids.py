@@ -0,0 +1,84 @@
+import sys
+import os
+
+# ✅ Add project root to sys.path so "app" can be imported
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import UpdateOne, UpdateMany, DeleteOne
+from app.db.mongodb import db
+from app.services.import_ids import company_id_for, person_id_for
+
+BATCH = 1000
+
+def _flush(coll, ops):
+    if ops:
+        coll.bulk_write(ops, ordered=False)
+    return []
+
+def rekey_companies():
+    """Give every company its content-derived company_id and drop duplicate copies."""
+    seen = {}          # new company_id -> kept _id
+    remap = {}         # old company_id -> new company_id
+    ops = []
+    removed = 0
+    for c in db.companies.find({"name": {"$ne": None}}, {"name": 1, "user_id": 1, "company_id": 1}).sort("_id", 1):
+        new_id = company_id_for(c["name"], c.get("user_id"))
+        old_id = c.get("company_id")
+        if old_id and old_id != new_id:
+            remap[old_id] = new_id
+        if new_id in seen:
+            ops.append(DeleteOne({"_id": c["_id"]}))
+            removed += 1
+        else:
+            seen[new_id] = c["_id"]
+            if old_id != new_id:
+                ops.append(UpdateOne({"_id": c["_id"]}, {"$set": {"company_id": new_id}}))
+        if len(ops) >= BATCH:
+            ops = _flush(db.companies, ops)
+    _flush(db.companies, ops)
+
+    # Point people at the new ids
+    ops = []
+    for old_id, new_id in remap.items():
+        ops.append(UpdateMany(
+            {"employment.company_id": old_id},
+            {"$set": {"employment.$[e].company_id": new_id}},
+            array_filters=[{"e.company_id": old_id}],
+        ))
+        if len(ops) >= BATCH:
+            ops = _flush(db.people, ops)
+    _flush(db.people, ops)
+
+    print(f"✅ Companies: {len(seen)} kept, {removed} duplicates removed, {len(remap)} re-keyed")
+
+def rekey_people():
+    """Give every person its content-derived person_id and drop duplicate copies."""
+    seen = set()
+    ops = []
+    removed = 0
+    for p in db.people.find({}, {"full_name": 1, "emails": 1, "user_id": 1, "person_id": 1}).sort("_id", 1):
+        emails = p.get("emails") or []
+        email = emails[0].get("value") if emails and isinstance(emails[0], dict) else None
+        if not email or not p.get("full_name"):
+            continue
+        new_id = person_id_for(email, p["full_name"], p.get("user_id"))
+        if new_id in seen:
+            ops.append(DeleteOne({"_id": p["_id"]}))
+            removed += 1
+        else:
+            seen.add(new_id)
+            if p.get("person_id") != new_id:
+                ops.append(UpdateOne({"_id": p["_id"]}, {"$set": {"person_id": new_id}}))
+        if len(ops) >= BATCH:
+            ops = _flush(db.people, ops)
+    _flush(db.people, ops)
+    print(f"✅ People: {len(seen)} kept, {removed} duplicates removed")
+
+
+if __name__ == "__main__":
+    # One-off migration from the old hash()-based ids; safe to re-run.
+    rekey_companies()
+    rekey_people()
+    db.companies.create_index("company_id", unique=True)
+    db.people.create_index("person_id", unique=True)
+    print("✅ Unique indexes on company_id / person_id created")
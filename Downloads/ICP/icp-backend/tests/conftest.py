@@ -0,0 +1,23 @@
+import os
+
+# app.core.config reads these at import; pymongo connects lazily, so nothing dials out
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ["SEARCH_CACHE_DB"] = ""
+
+import mongomock
+import pytest
+import app.db.mongodb as mongodb
+
+# Every collection getter goes through mongodb.db
+mongodb.client = mongomock.MongoClient()
+mongodb.db = mongodb.client["icp_test"]
+
+@pytest.fixture
+def db():
+    """Empty mongomock database, plus fresh in-process search state."""
+    from app.services import search_cache
+    for name in mongodb.db.list_collection_names():
+        mongodb.db.drop_collection(name)
+    search_cache.clear()
+    yield mongodb.db
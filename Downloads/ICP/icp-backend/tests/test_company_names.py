@@ -0,0 +1,78 @@
+import pytest
+from app.services import company_names
+from app.services.company_names import TrigramIndex, trigrams
+from app.services.company_resolver import CompanyResolver
+from app.services.import_ids import company_id_for
+from app.services.search_fields import company_name_norm, size_range
+
+@pytest.mark.parametrize("a, b", [
+    ("Acme Inc.", "ACME Incorporated"),
+    ("The Acme Company", "acme co"),
+    ("Smith & Sons Ltd", "Smith and Sons"),
+    ("Globex, LLC", "globex"),
+])
+def test_name_variants_share_a_key(a, b):
+    assert company_name_norm(a) == company_name_norm(b)
+
+def test_name_key_keeps_meaningful_words():
+    assert company_name_norm("The Company") == "company"
+    assert company_name_norm("Acme Labs") != company_name_norm("Acme")
+    assert company_name_norm("  ") is None
+
+@pytest.mark.parametrize("value, expected", [
+    ("51-200", {"min": 51, "max": 200}),
+    ("51 to 200 employees", {"min": 51, "max": 200}),
+    ("1k-5k", {"min": 1000, "max": 5000}),
+    ("10,000+", {"min": 10000}),
+    (">1000", {"min": 1001}),
+    ("<50", {"max": 49}),
+    (120, {"min": 120, "max": 120}),
+    ("lots", None),
+])
+def test_size_range(value, expected):
+    assert size_range(value) == expected
+
+def test_trigrams_are_padded_and_distinct():
+    assert trigrams("ab") == ["  a", " ab", "ab "]
+    assert len(trigrams("aaaa")) == len(set(trigrams("aaaa")))
+
+def test_trigram_search_ranks_typos_and_respects_scope():
+    index = TrigramIndex()
+    index.add("c1", "Acme Technologies Inc.", "global")
+    index.add("c2", "Acme Logistics", "global")
+    index.add("c3", "Zenith Partners", "global")
+    index.add("c4", "Acme Technologies", "u1")
+
+    hits = index.search("Acme Technolgies", ["global"], 5, 0.4)
+    assert [h["company_id"] for h in hits] == ["c1"]
+    assert 0.4 <= hits[0]["similarity"] < 1
+
+    assert [h["company_id"] for h in index.search("acme technologies", ["global", "u1"], 1, 0.4)] == ["c1"]
+    assert index.search("Acme Technologies", ["u2"], 5, 0.1) == []
+
+def test_resolver_merges_name_variants_into_one_company(db):
+    resolver = CompanyResolver(None)
+    created, updated = resolver.resolve(
+        ["Acme Inc.", "ACME Incorporated"],
+        lambda name: {"company_id": company_id_for(name, None), "name": name, "owner": "global",
+                      "company_name_norm": company_name_norm(name)},
+    )
+    assert [c["name"] for c in created] == ["Acme Inc."] and updated == []
+    assert resolver.company_id("Acme Inc.") == resolver.company_id("ACME Incorporated")
+    assert db.companies.count_documents({}) == 1
+
+def test_similar_companies_reads_mongo(db):
+    db.companies.insert_many([
+        {"company_id": "c1", "name": "Acme Technologies Inc.", "owner": "global"},
+        {"company_id": "c2", "name": "Acme Technologies", "owner": "u1", "user_id": "u1"},
+    ])
+    company_names.rebuild()
+    assert [c["company_id"] for c in company_names.similar_companies("Acme Technolgy", None)] == ["c1"]
+    assert {c["company_id"] for c in company_names.similar_companies("Acme Technolgy", "u1")} == {"c1", "c2"}
+
+def test_trigram_scopes_follow_the_owner_field(db):
+    # Scoped by `owner` like owner_scope(), even without a user_id on the record
+    db.companies.insert_one({"company_id": "c3", "name": "Globex Corporation", "owner": "u1"})
+    company_names.rebuild()
+    assert company_names.similar_companies("Globex Corp", None) == []
+    assert [c["company_id"] for c in company_names.similar_companies("Globex Corp", "u1")] == ["c3"]
@@ -0,0 +1,39 @@
+from app.services.facet_service import get_facets
+from app.services.import_service import import_vault_files
+
+CSV = """Full Name,Email,Company,Title,Country,Industry,# Employees,Website
+Ann Lee,ann@acme.io,Acme Inc.,CTO,USA,Software,120,acme.io
+Cy Diaz,cy@beta.io,Beta GmbH,Engineer,Germany,Fintech,40,beta.io
+"""
+
+def _industries():
+    return {f["value"]: f["count"] for f in get_facets(facets=["industry"])["industry"]}
+
+def test_reimport_updates_company_attributes(db, tmp_path):
+    path = tmp_path / "people.csv"
+    path.write_text(CSV)
+    import_vault_files([(str(path), None)])
+    before = db.companies.find_one({"name": "Acme Inc."})
+
+    path.write_text(CSV.replace("Software,120,acme.io", "Healthcare,600,"))
+    summary = import_vault_files([(str(path), None)])
+    assert (summary["companies_added"], summary["companies_updated"]) == (0, 1)
+
+    after = db.companies.find_one({"name": "Acme Inc."})
+    assert (after["industry"], after["industry_norm"], after["employee_count"]) == ("Healthcare", "healthcare", 600)
+    assert after["website"] == "acme.io"  # a blank cell doesn't erase it
+    assert (after["company_id"], after["created_at"]) == (before["company_id"], before["created_at"])
+
+    # The read model and facet counts follow the company
+    assert db.prospects.find_one({"full_name": "Ann Lee"})["industry_norm"] == "healthcare"
+    assert _industries() == {"healthcare": 1, "fintech": 1}
+
+def test_unchanged_companies_are_not_rewritten(db, tmp_path):
+    path = tmp_path / "people.csv"
+    path.write_text(CSV)
+    import_vault_files([(str(path), None)])
+    stamp = db.companies.find_one({"name": "Acme Inc."})["updated_at"]
+
+    summary = import_vault_files([(str(path), None)])
+    assert summary["companies_updated"] == 0
+    assert db.companies.find_one({"name": "Acme Inc."})["updated_at"] == stamp
@@ -0,0 +1,38 @@
+from app.services.facet_service import get_facets, rebuild_facets
+from app.services.import_service import import_vault_files
+
+CSV = """Full Name,Email,Company,Title,Country,Industry,# Employees
+Ann Lee,ann@acme.io,Acme Inc.,Engineer,USA,Software,120
+Bo Chan,bo@acme.io,Acme Inc.,Engineer,USA,Software,120
+"""
+
+def _families():
+    return {f["value"]: f["count"] for f in get_facets(facets=["title_family"])["title_family"]}
+
+def test_updated_people_move_between_facet_buckets(db, tmp_path):
+    path = tmp_path / "people.csv"
+    path.write_text(CSV)
+    import_vault_files([(str(path), None)])
+    assert _families() == {"engineering": 2}
+
+    path.write_text(CSV.replace("Bo Chan,bo@acme.io,Acme Inc.,Engineer", "Bo Chan,bo@acme.io,Acme Inc.,Sales Manager"))
+    import_vault_files([(str(path), None)])
+    assert _families() == {"engineering": 1, "sales": 1}
+
+    # Incremental counts agree with a full recount
+    rebuild_facets()
+    assert _families() == {"engineering": 1, "sales": 1}
+
+def test_facets_are_keyed_by_owner(db):
+    db.companies.insert_many([
+        {"owner": "global", "industry_norm": "software", "industry": "Software"},
+        {"owner": "u1", "industry_norm": "fintech", "industry": "Fintech"},
+    ])
+    rebuild_facets()
+
+    def industries(user_id):
+        return {f["value"] for f in get_facets(user_id, facets=["industry"])["industry"]}
+
+    assert industries(None) == {"software"}
+    assert industries("u1") == {"software", "fintech"}
+    assert industries("u2") == {"software"}
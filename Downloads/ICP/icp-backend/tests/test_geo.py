@@ -0,0 +1,52 @@
+import pytest
+from app.services import geo
+from app.services.prospect_view import prospect_docs
+from app.services.search_service import search_icp
+
+@pytest.mark.parametrize("location, expected", [
+    ("USA", ("US", None)),
+    ("U.S.A.", ("US", None)),
+    ("United States", ("US", None)),
+    ("San Francisco, CA", ("US", "US-CA")),
+    ("Texas", ("US", "US-TX")),
+    ("Bangalore", ("IN", "IN-KA")),
+    ("Bengaluru, Karnataka", ("IN", "IN-KA")),
+    ("Deutschland", ("DE", None)),
+    ("Atlantis", (None, None)),
+    (None, (None, None)),
+])
+def test_resolve(location, expected):
+    assert geo.resolve(location) == expected
+
+def test_query_codes_expand_regions_and_narrow_states():
+    countries, subdivisions, unresolved = geo.query_codes(["DACH", "California", "India", "Narnia"])
+    assert countries == ["DE", "AT", "CH", "IN"]
+    assert subdivisions == ["US-CA"]
+    assert unresolved == ["narnia"]
+
+def test_country_from_filename():
+    assert geo.country_from_filename("Vault_data_India.xlsx") == "India"
+    assert geo.country_from_filename("people.csv") is None
+    assert geo.country_from_filename("america_accounts.csv") == "United States"
+
+@pytest.mark.parametrize("filename", [
+    "Latin_America_leads.xlsx", "South_America.xlsx", "North America contacts.csv", "EMEA_export.csv",
+])
+def test_region_filenames_give_no_default_country(filename):
+    assert geo.country_from_filename(filename) is None
+
+def _prospect(person_id, location):
+    company = {"company_id": f"c-{person_id}", "name": person_id, "location": location, "owner": "global"}
+    person = {"person_id": person_id, "owner": "global", "employment": [{"company_id": company["company_id"], "title": "CTO"}]}
+    return prospect_docs(person, {company["company_id"]: company})
+
+def test_geography_filter_matches_codes(db):
+    for person_id, location in [("sf", "San Francisco, CA"), ("tx", "Austin, Texas"), ("blr", "Bengaluru"), ("us", "U.S.")]:
+        db.prospects.insert_many(_prospect(person_id, location))
+
+    def matches(geography):
+        return len(search_icp({"geography": geography}, None, mode="prospects")["people"])
+
+    assert matches("United States") == 3
+    assert matches("California") == 1
+    assert matches(["India", "Texas"]) == 2
@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+from app.services.import_ids import company_id_for, person_id_for, row_fingerprint
+from app.services.import_service import import_user_files, import_vault_files
+
+def test_company_id_is_stable_across_name_variants():
+    assert company_id_for("Acme Inc.", None) == company_id_for("ACME Incorporated", None)
+    assert company_id_for("The Acme Company", None) == company_id_for("acme co", None)
+    assert company_id_for("Acme", None) != company_id_for("Apex", None)
+
+def test_ids_are_scoped_by_owner():
+    assert company_id_for("Acme", None) != company_id_for("Acme", "u1")
+    assert person_id_for("a@x.io", "Ann", "u1") == person_id_for(" A@X.io ", "ann", "u1")
+    assert person_id_for("a@x.io", "Ann", "u1") != person_id_for("a@x.io", "Ann", "u2")
+
+def test_row_fingerprint_ignores_volatile_fields_and_key_order():
+    doc = {"person_id": "p1", "full_name": "Ann", "employment": [{"company_id": "c1", "title": "CTO"}]}
+    stamped = {"created_at": datetime.now(timezone.utc), "_id": 1, **dict(reversed(list(doc.items())))}
+    assert row_fingerprint(doc) == row_fingerprint(stamped)
+    assert row_fingerprint(doc) != row_fingerprint({**doc, "full_name": "Anne"})
+
+CSV = """Full Name,Email,Company,Title,Country,Industry,# Employees
+Ann Lee,ann@acme.io,Acme Inc.,CTO,USA,Software,120
+Bo Chan,bo@acme.io,ACME Incorporated,VP Sales,USA,Software,120
+Cy Diaz,cy@beta.io,Beta GmbH,Engineer,Germany,Fintech,40
+"""
+
+def test_reimport_is_idempotent(db, tmp_path):
+    path = tmp_path / "people.csv"
+    path.write_text(CSV)
+
+    first = import_vault_files([(str(path), None)])
+    assert (first["companies_added"], first["people_added"], first["unchanged"]) == (2, 3, 0)
+
+    again = import_vault_files([(str(path), None)])
+    assert (again["companies_added"], again["people_added"], again["people_updated"], again["unchanged"]) == (0, 0, 0, 3)
+    assert db.companies.count_documents({}) == 2
+    assert db.people.count_documents({}) == 3
+    assert db.prospects.count_documents({}) == 3
+
+    # A changed row is updated in place; the rest stay untouched
+    path.write_text(CSV.replace("Engineer,Germany", "Senior Engineer,Germany"))
+    changed = import_vault_files([(str(path), None)])
+    assert (changed["people_added"], changed["people_updated"], changed["unchanged"]) == (0, 1, 2)
+    assert db.people.find_one({"full_name": "Cy Diaz"})["employment"][0]["title"] == "Senior Engineer"
+
+def test_user_import_does_not_touch_global_rows(db, tmp_path):
+    path = tmp_path / "people.csv"
+    path.write_text(CSV)
+    import_vault_files([(str(path), None)])
+    summary = import_user_files([(str(path), None)], "u1")
+    assert (summary["companies_added"], summary["people_added"]) == (2, 3)
+    assert db.people.count_documents({"owner": "global"}) == 3
+    assert db.people.count_documents({"owner": "u1"}) == 3
@@ -0,0 +1,99 @@
+import os
+import queue
+import subprocess
+import sys
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.core.config import settings
+from app.services import import_service
+from app.services import import_job_service
+from app.services.import_job_service import recover_import_jobs
+
+def _dead_pid() -> int:
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+def _job(db, job_id, instance, pid, heartbeat_age=timedelta(0), files=()):
+    db.import_jobs.insert_one({
+        "job_id": job_id, "status": "running", "instance": instance, "pid": pid, "files": list(files),
+        "heartbeat_at": datetime.now(timezone.utc) - heartbeat_age,
+    })
+
+def test_restart_interrupts_this_instances_dead_jobs_at_once(db):
+    here = settings.INSTANCE_ID
+    _job(db, "dead", here, _dead_pid())
+    _job(db, "reused-pid", here, os.getpid())
+    _job(db, "sibling-worker", here, os.getppid())
+    _job(db, "other-host-fresh", "elsewhere", 1)
+    _job(db, "other-host-stale", "elsewhere", 1, heartbeat_age=timedelta(hours=1))
+
+    recover_import_jobs()
+
+    status = {j["job_id"]: j["status"] for j in db.import_jobs.find()}
+    assert status == {
+        "dead": "interrupted",
+        "reused-pid": "interrupted",
+        "sibling-worker": "running",
+        "other-host-fresh": "running",
+        "other-host-stale": "interrupted",
+    }
+
+def test_writer_heartbeats_while_waiting_on_a_worker(monkeypatch):
+    monkeypatch.setattr(import_service, "HEARTBEAT_SECONDS", 0.01)
+    beats = []
+    run = import_service._ImportRun(None, "test", on_progress=beats.append)
+    chunks = queue.Queue()
+    threading.Timer(0.1, chunks.put, args=("chunk",)).start()
+    assert import_service._next_chunk(chunks, Future(), run) == "chunk"
+    assert len(beats) >= 2
+
+def test_writer_reraises_a_failed_worker():
+    run = import_service._ImportRun(None, "test")
+    future = Future()
+    future.set_exception(ValueError("bad unit"))
+    with pytest.raises(ValueError, match="bad unit"):
+        import_service._next_chunk(queue.Queue(), future, run)
+
+def test_interrupted_jobs_discard_their_uploads(db, tmp_path):
+    staged = tmp_path / "staged.csv"
+    staged.write_text("Full Name,Email,Company\n")
+    _job(db, "dead", settings.INSTANCE_ID, _dead_pid(), files=[{"path": str(staged)}])
+
+    recover_import_jobs()
+
+    assert db.import_jobs.find_one({"job_id": "dead"})["status"] == "interrupted"
+    assert not staged.exists()
+
+def test_rows_are_counted_by_the_worker_not_the_request(db, tmp_path, monkeypatch):
+    path = tmp_path / "people.csv"
+    path.write_text("Full Name,Email,Company\nAnn Lee,ann@acme.io,Acme\nBo Chan,bo@acme.io,Acme\n")
+    upload = {"path": str(path), "filename": "people.csv", "sha256": "x", "size_bytes": path.stat().st_size}
+
+    submitted = []
+    monkeypatch.setattr(import_job_service._executor, "submit", lambda fn, job_id: submitted.append(job_id))
+    job = import_job_service.create_import_job("vault", [upload], requested_by="admin")
+    assert job["rows_total"] is None
+
+    import_job_service._run_job(submitted[0])
+    done = db.import_jobs.find_one({"job_id": job["job_id"]})
+    assert (done["status"], done["rows_total"], done["rows_processed"]) == ("completed", 2, 2)
+
+def test_batch_upload_discards_a_file_that_fails_after_saving(db, tmp_path, monkeypatch):
+    import io
+    from fastapi import HTTPException, Response, UploadFile
+    from app.routes import admin
+    from app.services import upload_service
+
+    monkeypatch.setattr(upload_service, "UPLOAD_DIR", str(tmp_path))
+
+    def lookup_fails(*args):
+        raise RuntimeError("lookup failed")
+
+    monkeypatch.setattr(admin, "find_completed_import", lookup_fails)
+    files = [UploadFile(io.BytesIO(b"Full Name,Email\n"), filename="usa.csv")]
+    with pytest.raises(HTTPException):
+        admin.import_vault_batch(Response(), files=files, admin={"_id": "admin"})
+    assert list(tmp_path.iterdir()) == []
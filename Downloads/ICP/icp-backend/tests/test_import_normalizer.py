@@ -0,0 +1,53 @@
+import pandas as pd
+from app.services.import_normalizer import normalize_chunk, normalize_records
+
+def _frame(**cols):
+    return pd.DataFrame(cols)
+
+def test_skip_mask_counts_first_missing_field_only():
+    df = _frame(
+        **{"First Name": ["Ann", "", "Cy", "Di"], "Last Name": ["Lee", "", "", "Ng"],
+           "Email": ["a@x.io", "", "", "d@x.io"], "Company": ["Acme", "", "Beta", ""]}
+    )
+    _, skip_mask, counts = normalize_chunk(df)
+    assert skip_mask.tolist() == [False, True, True, True]
+    # Row 2 lacks everything but is counted once, under missing_name
+    assert counts == {"missing_name": 1, "missing_email": 1, "missing_company": 1}
+
+def test_size_buckets_and_employee_count():
+    df = _frame(**{
+        "Full Name": ["a", "b", "c", "d", "e", "f", "g"],
+        "Email": ["e"] * 7, "Company": ["c"] * 7,
+        "# Employees": [49, 50, 199.7, 1000, 5000, "n/a", None],
+    })
+    records, _ = normalize_records(df)
+    assert [r["size"] for r in records] == ["1-50", "51-200", "51-200", "1001-5000", "5000+", None, None]
+    assert [r["employee_count"] for r in records] == [49, 50, 199, 1000, 5000, None, None]
+
+def test_headers_are_case_insensitive_and_name_falls_back():
+    df = _frame(**{"full name": ["Ann Lee"], "EMAIL": [" a@x.io "], "company name": ["Acme"], "title": ["CTO"]})
+    records, counts = normalize_records(df)
+    assert sum(counts.values()) == 0
+    assert records[0]["full_name"] == "Ann Lee"
+    assert records[0]["email"] == "a@x.io"
+    assert records[0]["company"] == "Acme"
+    assert records[0]["title"] == "CTO"
+
+def test_country_default_fills_blanks_only():
+    df = _frame(**{"Full Name": ["a", "b"], "Email": ["e", "e"], "Company": ["c", "c"], "Country": ["", "Germany"]})
+    records, _ = normalize_records(df, country_default="India")
+    assert [r["country"] for r in records] == ["India", "Germany"]
+
+def test_missing_optional_columns_become_none():
+    records, _ = normalize_records(_frame(**{"Full Name": ["a"], "Email": ["e"], "Company": ["c"]}))
+    assert records[0]["industry"] is None
+    assert records[0]["website"] is None
+    assert records[0]["employee_count"] is None
+
+def test_import_keeps_row_country_over_file_default(db, tmp_path):
+    from app.services.import_service import import_vault_excel
+
+    path = tmp_path / "vault_india.csv"
+    path.write_text("Full Name,Email,Company,Country\nAnn Lee,ann@acme.io,Acme,\nBo Chan,bo@acme.io,Acme,Germany\n")
+    import_vault_excel(str(path), country_default="India")
+    assert {p["full_name"]: p["country"] for p in db.people.find()} == {"Ann Lee": "India", "Bo Chan": "Germany"}
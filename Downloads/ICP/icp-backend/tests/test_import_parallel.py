@@ -0,0 +1,69 @@
+import queue
+from app.services.import_reader import plan_units
+from app.services.import_service import import_vault_files
+from app.services.import_worker import process_unit
+
+CSV = "Full Name,Email,Company,Title,Country\n" + "".join(
+    f"Person {i},p{i}@acme.io,Acme {i % 3},Engineer,USA\n" for i in range(7)
+)
+
+def test_worker_streams_one_chunk_at_a_time(tmp_path):
+    path = tmp_path / "people.csv"
+    path.write_text(CSV)
+    (unit,) = plan_units(str(path), parts=1)
+
+    chunks = queue.Queue()
+    timings = process_unit(unit, None, 3, chunks)
+
+    sizes = []
+    while (chunk := chunks.get_nowait()) is not None:
+        sizes.append(chunk["rows"])
+    assert sizes == [3, 3, 1]
+    assert set(timings) == {"parse_seconds", "normalize_seconds"}
+
+def test_parallel_import_writes_every_row(db, tmp_path):
+    path = tmp_path / "people.csv"
+    path.write_text(CSV)
+
+    summary = import_vault_files([(str(path), None)], workers=2)
+
+    assert (summary["companies_added"], summary["people_added"]) == (3, 7)
+    assert db.people.count_documents({}) == 7
+
+def _workbook(path, sheets):
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    wb.remove(wb.active)
+    for title, rows in sheets.items():
+        ws = wb.create_sheet(title)
+        for row in rows:
+            ws.append(row)
+    wb.save(path)
+
+HEADER = ["Full Name", "Email", "Company", "Title"]
+
+def test_workbooks_import_their_data_sheets_only(db, tmp_path):
+    from app.services.import_reader import count_rows, iter_chunks
+
+    path = tmp_path / "regions.xlsx"
+    _workbook(path, {
+        "India": [HEADER, ["Ann Lee", "ann@acme.in", "Acme", "CTO"]],
+        "Notes": [["Exported from Vault"], ["Do not edit"]],
+        "USA": [HEADER, ["Bo Chan", "bo@acme.io", "Acme", "VP Sales"]],
+        "Lookup": [["Code", "Region"], ["IN", "South Asia"]],
+    })
+    assert [u["sheet"] for u in plan_units(str(path), parts=4)] == ["India", "USA"]
+    assert count_rows(str(path)) == 2
+    assert sum(len(df) for df in iter_chunks(str(path))) == 2
+
+    summary = import_vault_files([(str(path), None)])
+    assert (summary["people_added"], summary["skipped"]) == (2, 0)
+
+def test_workbook_without_data_sheets_reads_the_first_sheet(tmp_path):
+    from app.services.import_reader import iter_chunks
+
+    path = tmp_path / "odd.xlsx"
+    _workbook(path, {"Sheet A": [["Name", "Phone"], ["Ann", "1"]], "Sheet B": [["Name"], ["Bo"], ["Cy"]]})
+    assert [u["sheet"] for u in plan_units(str(path), parts=2)] == ["Sheet A"]
+    assert sum(len(df) for df in iter_chunks(str(path))) == 1
@@ -0,0 +1,59 @@
+from app.db.indexes import CANONICAL_QUERIES, INDEXES, check_query_plans
+
+def _fields(query):
+    if isinstance(query, dict):
+        for k, v in query.items():
+            if k in ("$and", "$or"):
+                for clause in v:
+                    yield from _fields(clause)
+            elif not k.startswith("$"):
+                yield k
+
+def test_every_scoped_filter_field_has_an_owner_index():
+    led_by_owner = {
+        coll: {list(m.document["key"])[1] for m in models
+               if len(m.document["key"]) > 1 and list(m.document["key"])[0] == "owner"}
+        for coll, models in INDEXES.items()
+    }
+    leading = {coll: {list(m.document["key"])[0] for m in models} for coll, models in INDEXES.items()}
+    for service, coll, query, _ in CANONICAL_QUERIES:
+        fields = set(_fields(query))
+        if "owner" in fields:
+            # some filter field is indexed, and every $or branch has an (owner, field) index
+            assert (fields - {"owner"}) & (led_by_owner[coll] | leading[coll]), (service, coll, query)
+            for clause in query.get("$and", []):
+                for branch in clause.get("$or", []):
+                    assert set(branch) <= led_by_owner[coll], (service, coll, branch)
+
+class _Cursor:
+    def __init__(self, plan):
+        self.plan = plan
+
+    def sort(self, _):
+        return self
+
+    def explain(self):
+        return {"queryPlanner": {"winningPlan": self.plan}}
+
+class _Database:
+    def __init__(self, plan):
+        self.plan = plan
+
+    def __getitem__(self, _):
+        return self
+
+    def find(self, _):
+        return _Cursor(self.plan)
+
+def _ixscan(**bounds):
+    return {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexBounds": bounds}}
+
+def test_check_query_plans_flags_owner_prefix_only_scans():
+    prefix_only = _ixscan(owner=['["global", "global"]'], industry_norm=["[MinKey, MaxKey]"])
+    problems = {f["problem"] for f in check_query_plans(_Database(prefix_only))}
+    assert problems == {"owner prefix only"}
+
+    selective = _ixscan(owner=['["global", "global"]'], role_ids=['["cto", "cto"]'])
+    assert check_query_plans(_Database(selective)) == []
+
+    assert {f["problem"] for f in check_query_plans(_Database({"stage": "COLLSCAN"}))} == {"COLLSCAN"}
@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+import numpy as np
+import pytest
+from app.services import relevance
+
+def test_top_k_is_best_first_with_stable_ties():
+    scores = np.array([0.5, 2.0, 1.0, 2.0, 0.1], dtype=np.float32)
+    assert relevance.top_k(scores, 3) == [1, 3, 2]
+    assert relevance.top_k(scores, 10) == [1, 3, 2, 0, 4]
+    assert relevance.top_k(scores, 0) == []
+    assert relevance.top_k(np.array([], dtype=np.float32), 3) == []
+
+def test_top_groups_scores_each_group_by_its_best_member():
+    scores = np.array([0.2, 0.9, 0.8, 0.7], dtype=np.float32)
+    keys = ["a", "b", "b", "c"]
+    assert relevance.top_groups(scores, keys, 2) == [(1, pytest.approx(0.9)), (3, pytest.approx(0.7))]
+
+def test_parse_weights():
+    weights = relevance.parse_weights("role=4, recency=0")
+    assert weights["role"] == 4 and weights["recency"] == 0
+    assert weights["seniority"] == relevance.DEFAULT_WEIGHTS["seniority"]
+    with pytest.raises(ValueError):
+        relevance.parse_weights("charisma=1")
+
+def test_features():
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    candidates = [
+        {"title": "Software Engineer", "role_ids": ["ic", "engineering", "ic:engineering"], "seniority": "ic",
+         "employee_count": 100, "email": "a@x.io", "linkedin_url": "li", "updated_ts": now.timestamp()},
+        {"title": "Senior Software Engineer", "role_ids": ["senior", "engineering", "senior:engineering"],
+         "seniority": "senior", "employee_count": 100000, "email": "b@x.io"},
+        {"title": "Barista", "role_ids": [], "employee_count": None},
+    ]
+    feats = relevance.features(candidates, {"roles": ["Software Engineer"], "company_size": "51-200"}, now)
+    assert feats["role"].tolist() == [1.0, 0.5, 0.0]
+    assert feats["size_fit"][0] == 1.0 and feats["size_fit"][1] < 0.01 and feats["size_fit"][2] == 0.25
+    assert feats["complete"].tolist() == [1.0, 0.5, 0.0]
+    assert feats["recency"][0] == 1.0 and feats["recency"][1] == pytest.approx(np.exp(-1))
+    assert feats["seniority"][1] > feats["seniority"][0]
+
+def test_score_is_the_weighted_sum():
+    feats = {name: np.array([1.0, 0.0], dtype=np.float32) for name in relevance.FEATURES}
+    weights = {name: 0.0 for name in relevance.FEATURES}
+    weights["role"] = 2.0
+    assert relevance.score(feats, weights).tolist() == [2.0, 0.0]
@@ -0,0 +1,74 @@
+import pytest
+from app.services.role_index import canonical_tokens, classify, role_exact_ids, role_query_ids, title_roles
+from app.services.prospect_view import prospect_docs
+from app.services.search_service import search_icp
+
+def _matches(role: str, title: str) -> bool:
+    return bool(set(role_query_ids(role)) & set(title_roles(title)["role_ids"]))
+
+@pytest.mark.parametrize("role, title", [
+    ("Software Engineer", "Software Engineer"),
+    ("Software Engineer", "Senior Software Engineer"),
+    ("Software Engineer", "Principal Software Engineer"),
+    ("Software Engineer", "Junior Developer"),
+    ("Engineering", "Chief Technology Officer"),
+    ("VP Sales", "Vice President, Sales"),
+    ("VP Sales", "SVP of Sales"),
+    ("CTO", "Chief Technology Officer"),
+    ("CTO", "Co-Founder & CTO"),
+    ("Founder", "Founder & CTO"),
+    ("Founder", "Co-founder"),
+    ("Head of Marketing", "Head of Marketing"),
+    ("President", "President & CEO"),
+    ("President", "Chairman"),
+])
+def test_role_matches_title(role, title):
+    assert _matches(role, title)
+
+@pytest.mark.parametrize("role, title", [
+    ("VP Sales", "Sales Manager"),
+    ("VP Sales", "VP Engineering"),
+    ("CTO", "CFO"),
+    ("Software Engineer", "Sales Director"),
+    ("Software Engineer", "CTO"),
+    ("Software Engineer", "Chief Technology Officer"),
+    ("Software Engineer", "IT Manager"),
+    ("Security Engineer", "Chief Information Security Officer"),
+    ("President", "Chief Financial Officer"),
+    ("President", "CEO"),
+])
+def test_role_does_not_match_title(role, title):
+    assert not _matches(role, title)
+
+def test_classify():
+    assert classify(canonical_tokens("Sr. Software Engineer")) == ("senior", "engineering", [])
+    assert classify(canonical_tokens("Chief Financial Officer")) == ("c_level", "finance", ["cfo"])
+    assert classify(canonical_tokens("Software Engineer")) == ("ic", "engineering", [])
+    assert classify(canonical_tokens("Barista")) == (None, None, [])
+
+def test_exact_ids_keep_the_seniority():
+    assert role_exact_ids("Software Engineer") == ("ic:engineering",)
+    assert role_query_ids("Software Engineer") == ("entry:engineering", "ic:engineering", "senior:engineering", "lead:engineering")
+    assert role_query_ids("Engineering") == ("engineering",)
+    assert role_query_ids("President") == ("president",)
+    assert role_query_ids("VP Sales") == ("vp:sales",)
+    assert role_query_ids("Barista") == ()
+
+COMPANY = {"company_id": "c1", "name": "Acme", "industry": "Software", "country": "United States", "employee_count": 80}
+
+def _person(person_id: str, title: str) -> dict:
+    return {"person_id": person_id, "owner": "global", "full_name": title,
+            "employment": [{"company_id": "c1", "title": title}]}
+
+@pytest.mark.parametrize("mode", ["prospects", "scored"])
+def test_search_finds_senior_titles(db, mode):
+    for i, title in enumerate(["Senior Software Engineer", "Vice President, Sales", "Chief Technology Officer"]):
+        db.prospects.insert_many(prospect_docs(_person(f"p{i}", title), {"c1": {**COMPANY, "owner": "global"}}))
+
+    def names(role):
+        return {p["full_name"] for p in search_icp({"roles": [role]}, None, mode=mode)["people"]}
+
+    # A plain role matches its family's IC ladder, not its executives
+    assert names("Software Engineer") == {"Senior Software Engineer"}
+    assert names("VP Sales") == {"Vice President, Sales"}
+    assert names("CTO") == {"Chief Technology Officer"}
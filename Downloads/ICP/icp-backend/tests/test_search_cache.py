@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import pytest
+from app.core.config import settings
+from app.services import search_cache
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_CACHE_DB", "")
+    monkeypatch.setattr(settings, "SEARCH_CACHE_SIZE", 3)
+    monkeypatch.setattr(settings, "SEARCH_CACHE_TTL", 60)
+    monkeypatch.setattr(search_cache, "_versions", {})
+    search_cache.clear()
+    yield
+    search_cache.clear()
+
+def test_equivalent_filters_share_a_key():
+    a = search_cache.cache_key({"industry": ["Software", "fintech"], "roles": "CTO", "chat": "x"}, "u1", limit=20)
+    b = search_cache.cache_key({"roles": [" cto "], "industry": ["FinTech", "software"]}, "u1", limit=20)
+    assert a == b
+    assert a != search_cache.cache_key({"roles": "CTO", "industry": ["Software", "fintech"]}, "u2", limit=20)
+    assert a != search_cache.cache_key({"roles": "CTO", "industry": ["Software", "fintech"]}, "u1", limit=50)
+
+def test_lru_evicts_least_recently_used():
+    versions = search_cache.data_versions(None)
+    for key in ("a", "b", "c"):
+        search_cache.put(key, versions, {"key": key})
+    assert search_cache.get("a", versions) == {"key": "a"}
+    search_cache.put("d", versions, {"key": "d"})
+    assert search_cache.get("b", versions) is None
+    assert [search_cache.get(k, versions) is not None for k in ("a", "c", "d")] == [True, True, True]
+
+def test_entries_expire_after_ttl(monkeypatch):
+    versions = search_cache.data_versions(None)
+    search_cache.put("k", versions, [1])
+    now = search_cache.time.time()
+    monkeypatch.setattr(search_cache.time, "time", lambda: now + 61)
+    assert search_cache.get("k", versions) is None
+
+def test_cached_values_are_copies():
+    versions = search_cache.data_versions(None)
+    value = {"people": [1]}
+    search_cache.put("k", versions, value)
+    value["people"].append(2)
+    search_cache.get("k", versions)["people"].append(3)
+    assert search_cache.get("k", versions) == {"people": [1]}
+
+def test_imports_invalidate_their_scope_only():
+    v1, v2 = search_cache.data_versions("u1"), search_cache.data_versions("u2")
+    search_cache.put("u1", v1, "one")
+    search_cache.put("u2", v2, "two")
+
+    search_cache.bump_data_version("u1")
+    assert search_cache.get("u1", search_cache.data_versions("u1")) is None
+    assert search_cache.get("u2", search_cache.data_versions("u2")) == "two"
+
+    # A Vault import invalidates everyone's searches
+    search_cache.bump_data_version(None)
+    assert search_cache.get("u2", search_cache.data_versions("u2")) is None
+
+def test_shared_store_carries_entries_and_versions(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "SEARCH_CACHE_DB", str(tmp_path / "cache.db"))
+    versions = search_cache.data_versions(None)
+    search_cache.put("k", versions, {"n": 1})
+
+    # Another worker: nothing in process, same SQLite file
+    monkeypatch.setattr(search_cache, "_entries", search_cache.OrderedDict())
+    assert search_cache.get("k", versions) == {"n": 1}
+    assert search_cache.stats()["shared_hits"] >= 1
+
+    search_cache.bump_data_version(None)
+    assert search_cache.data_versions(None) != versions
+
+def test_async_search_reads_the_cache_off_the_event_loop(monkeypatch):
+    from app.services import search_service
+
+    filters = {"roles": "CTO"}
+    key = search_cache.cache_key(filters, None, limit=20, mode="filter")
+    search_cache.put(key, search_cache.data_versions(None), {"people": [], "companies": []})
+
+    threads = []
+    real_versions = search_cache.data_versions
+    monkeypatch.setattr(search_cache, "data_versions", lambda u: threads.append(threading.get_ident()) or real_versions(u))
+
+    async def run():
+        return threading.get_ident(), await search_service.search_icp_async(filters)
+
+    loop_thread, results = asyncio.run(run())
+    assert results == {"people": [], "companies": []}
+    assert threads and loop_thread not in threads
@@ -0,0 +1,61 @@
+import importlib.util
+from pathlib import Path
+from app.services.search_fields import person_search_fields
+
+def _script(name):
+    path = Path(__file__).resolve().parents[1] / "scripts" / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_title_roles_are_stored_under_their_own_keys():
+    fields = person_search_fields({"employment": [{"title": "VP Sales"}]})
+    assert (fields["title_seniority"], fields["title_department"]) == ("vp", "sales")
+    assert "vp:sales" in fields["role_ids"]
+    assert "seniority" not in fields and "department" not in fields
+
+def test_backfill_keeps_explicit_seniority(db):
+    db.people.insert_one({
+        "person_id": "p1", "full_name": "Ann", "employment": [{"title": "Engineer"}],
+        "seniority": "director", "department": "platform",
+    })
+    _script("backfill_search_fields").backfill_people({})
+
+    person = db.people.find_one({"person_id": "p1"})
+    assert (person["seniority"], person["department"]) == ("director", "platform")
+    assert (person["title_seniority"], person["title_department"]) == ("ic", "engineering")
+
+def test_reimport_keeps_explicit_seniority(db, tmp_path):
+    from app.services.import_service import import_vault_files
+
+    path = tmp_path / "people.csv"
+    path.write_text("Full Name,Email,Company,Title,Country\nAnn Lee,ann@acme.io,Acme,Engineer,USA\n")
+    import_vault_files([(str(path), None)])
+    db.people.update_one({"full_name": "Ann Lee"}, {"$set": {"seniority": "director"}})
+
+    path.write_text(path.read_text().replace("Engineer", "Senior Engineer"))
+    import_vault_files([(str(path), None)])
+    person = db.people.find_one({"full_name": "Ann Lee"})
+    assert (person["seniority"], person["title_seniority"]) == ("director", "senior")
+
+def test_created_records_get_search_fields_and_invalidate_searches(db):
+    from app.models.company import Company
+    from app.models.people import People
+    from app.services import search_cache
+    from app.services.company_service import create_company
+    from app.services.people_service import create_person
+
+    before = search_cache.data_versions("u1")
+    create_company(Company(company_id="c1", name="Acme Inc.", industry="Software",
+                           size="51-200", location="USA", user_id="u1"))
+    create_person(People(person_id="p1", full_name="Ann Lee", user_id="u1",
+                         employment=[{"company_id": "c1", "title": "VP Sales"}]))
+    assert search_cache.data_versions("u1")[1] == before[1] + 2
+
+    company = db.companies.find_one({"company_id": "c1"})
+    assert (company["industry_norm"], company["country_code"]) == ("software", "US")
+    assert (company["employee_count"], company["employee_count_estimated"]) == (51, True)
+    person = db.people.find_one({"person_id": "p1"})
+    assert "vp:sales" in person["role_ids"] and person["title_tokens"] == ["vp", "sales"]
+    assert person["company_name_norm"] == db.companies.find_one({"company_id": "c1"})["company_name_norm"]
@@ -0,0 +1,62 @@
+from app.services.search_service import _company_conditions, _roles_cond, build_search_pipeline
+
+def _stages(pipeline):
+    return [next(iter(stage)) for stage in pipeline]
+
+def test_company_only_filters_drive_from_companies():
+    conds = _company_conditions({"industry": "Software", "geography": "India"})
+    source, pipeline = build_search_pipeline(conds, [], "u1", 20)
+    assert source == "companies"
+    assert _stages(pipeline) == ["$match", "$lookup", "$unwind", "$limit", "$replaceWith", "$set", "$unionWith"]
+    lookup = pipeline[1]["$lookup"]
+    assert (lookup["localField"], lookup["foreignField"]) == ("company_id", "employment.company_id")
+    assert {"owner": {"$in": ["global", "u1"]}} in pipeline[0]["$match"]["$and"]
+
+def test_role_filters_drive_from_people():
+    conds = _company_conditions({"industry": "Software"})
+    source, pipeline = build_search_pipeline(conds, [_roles_cond("CTO")], None, 20)
+    assert source == "people"
+    assert _stages(pipeline)[:2] == ["$match", "$lookup"]
+    assert pipeline[1]["$lookup"]["from"] == "companies"
+
+def test_no_filters_scan_people_by_scope():
+    source, pipeline = build_search_pipeline([], [], None, 5)
+    assert source == "people"
+    assert _stages(pipeline) == ["$match", "$limit", "$project", "$set", "$unionWith"]
+
+def test_company_only_people_pages_drive_from_companies():
+    from bson import ObjectId
+    from app.services.search_service import _people_by_company
+
+    conds = _company_conditions({"industry": "Software"})
+    after = (ObjectId(), ObjectId())
+    pipeline = _people_by_company(conds, "u1", after, 50, {"full_name": 1, "_id": 1})
+    assert _stages(pipeline) == ["$match", "$sort", "$lookup", "$unwind", "$replaceWith", "$limit"]
+    assert {"_id": {"$gte": after[0]}} in pipeline[0]["$match"]["$and"]
+    lookup = pipeline[2]["$lookup"]
+    assert (lookup["from"], lookup["foreignField"]) == ("people", "employment.company_id")
+    # Only the company the cursor stopped in skips people up to the cursor's person
+    assert lookup["pipeline"][1] == {"$match": {"$expr": {"$or": [
+        {"$ne": ["$$company_oid", after[0]]}, {"$gt": ["$_id", after[1]]},
+    ]}}}
+
+def test_page_cursor_round_trips_composite_keys():
+    from bson import ObjectId
+    from app.services.search_service import _decode_cursor, _encode_cursor, _last_key
+
+    company_oid, person_oid = ObjectId(), ObjectId()
+    key = _last_key({"_id": person_oid, "_company_oid": company_oid})
+    assert _decode_cursor(_encode_cursor("q", key), "q") == (company_oid, person_oid)
+    assert _decode_cursor(_encode_cursor("q", _last_key({"_id": person_oid})), "q") == (person_oid,)
+
+def test_company_pages_follow_the_cursor(db):
+    from app.services.search_service import search_page
+
+    db.companies.insert_many([
+        {"company_id": f"c{i}", "name": f"Acme {i}", "owner": "global", "industry_norm": "software"}
+        for i in range(3)
+    ])
+    first = search_page({"industry": "Software"}, kind="companies", limit=2)
+    assert [c["name"] for c in first["companies"]] == ["Acme 0", "Acme 1"]
+    rest = search_page({"industry": "Software"}, kind="companies", limit=2, cursor=first["next_cursor"])
+    assert [c["name"] for c in rest["companies"]] == ["Acme 2"] and rest["next_cursor"] is None
@@ -0,0 +1,80 @@
+import pytest
+from app.services import search_cache, text_index
+from app.services.text_index import BM25Index, company_tokens, query_tokens
+
+def test_bm25_prefers_rarer_and_more_frequent_terms():
+    index = BM25Index()
+    index.add("a", ["t:cto", "t:cto", "i:software"], "global")
+    index.add("b", ["t:cto", "i:software", "i:fintech", "l:india"], "global")
+    index.add("c", ["t:cfo", "i:software"], "global")
+    ranked = index.search(["t:cto", "i:software"], ["global"], 10)
+    assert [k for k, _ in ranked] == ["a", "b", "c"]
+    assert ranked[0][1] > ranked[1][1] > ranked[2][1] > 0
+
+def test_bm25_scopes_top_k_and_reindexing():
+    index = BM25Index()
+    for i in range(5):
+        index.add(f"g{i}", ["t:cto"] * (i + 1), "global")
+    index.add("u", ["t:cto"] * 9, "u1")
+    assert [k for k, _ in index.search(["t:cto"], ["global"], 2)] == ["g4", "g3"]
+    assert index.search(["t:cto"], ["global", "u1"], 1)[0][0] == "u"
+
+    # Re-adding a key replaces it; dropping a scope tombstones its documents
+    index.add("g4", ["t:cfo"], "global")
+    assert "g4" not in [k for k, _ in index.search(["t:cto"], ["global"], 10)]
+    index.drop_scope("u1")
+    assert index.search(["t:cto"], ["u1"], 10) == []
+    assert len(index) == 5 and index.dead == 2
+
+def test_location_tokens_include_iso_codes():
+    assert "g:us" in company_tokens("Acme", "Software", "United States")
+    people, companies = query_tokens({"geography": "USA", "roles": "CTO"})
+    assert "g:us" in companies
+    assert "r:cto" in people
+
+def _company(db, company_id, name, owner):
+    db.companies.insert_one({"company_id": company_id, "name": name, "industry": "Software",
+                             "location": "India", "owner": owner})
+
+def _person(db, person_id, title, company_id, owner):
+    db.people.insert_one({"person_id": person_id, "owner": owner,
+                          "employment": [{"company_id": company_id, "title": title}]})
+
+@pytest.fixture
+def index(db):
+    text_index.rebuild()
+    yield
+    if text_index._refresh_thread is not None:
+        text_index._refresh_thread.join()
+
+def _refresh_in_background(user_id):
+    text_index.ensure_current(user_id)
+    if text_index._refresh_thread is not None:
+        text_index._refresh_thread.join()
+
+def test_stale_user_scope_is_reloaded_alone(db, index):
+    _company(db, "g", "Globex", "global")
+    _person(db, "pg", "CTO", "g", "global")
+    text_index.rebuild()
+    text_index.ensure_current("u1")
+
+    # Another worker imports into u1: only that scope is reloaded, the global rows stay as built
+    _company(db, "u", "Umbrella", "u1")
+    _person(db, "pu", "CTO", "u", "u1")
+    db.people.delete_one({"person_id": "pg"})
+    search_cache.bump_data_version("u1")
+    _refresh_in_background("u1")
+
+    ranked = [k for k, _ in text_index.rank_people({"roles": "CTO"}, "u1", 10)]
+    assert sorted(ranked) == ["pg", "pu"]
+
+def test_stale_global_scope_rebuilds_in_background(db, index):
+    text_index.ensure_current(None)
+    _company(db, "g", "Globex", "global")
+    _person(db, "pg", "CTO", "g", "global")
+    search_cache.bump_data_version(None)
+
+    # The request that notices keeps the current (empty) index; the refresh catches up
+    text_index.ensure_current(None)
+    text_index._refresh_thread.join()
+    assert [k for k, _ in text_index.rank_people({"roles": "CTO"}, None, 10)] == ["pg"]